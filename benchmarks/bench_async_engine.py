@@ -0,0 +1,111 @@
+"""
+Threaded vs async scraping engine over local portal stand-ins.
+
+    python benchmarks/bench_async_engine.py --sites 40 --slow-sites 4
+
+Each site is its own local server (its own domain for the per-domain
+semaphores). `--slow-sites` of them answer with `--slow-latency`, the rest
+with `--latency`, so the run shows whether one slow portal holds workers
+the other sites could use. Both engines parse on threads, so with low
+latency or large pages the run is GIL-bound and the engines converge.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_session
+import scraper
+from fixtures import site_responder
+from local_server import LocalServer
+
+
+class ThreadSampler:
+    """Tracks the peak number of live client threads (server threads excluded)"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            live = sum(1 for t in threading.enumerate() if "process_request_thread" not in t.name)
+            self.peak = max(self.peak, live)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def timed(name, func, servers):
+    for srv in servers:
+        srv.reset_counters()
+    with ThreadSampler() as sampler, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = func()
+        elapsed = time.perf_counter() - start
+    fetches = sum(srv.requests for srv in servers)
+    rows = sum(len(v) for v in results.values())
+    return name, elapsed, fetches, rows, sampler.peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sites", type=int, default=40)
+    ap.add_argument("--slow-sites", type=int, default=4)
+    ap.add_argument("--listings", type=int, default=12, help="listing cards per search page")
+    ap.add_argument("--details", type=int, default=10, help="DESC_AND_IMAGE_FETCH_LIMIT")
+    ap.add_argument("--latency", type=float, default=1.0)
+    ap.add_argument("--slow-latency", type=float, default=3.0)
+    ap.add_argument("--threads", type=int, default=scraper.MAX_THREADS, help="outer executor size (threaded)")
+    ap.add_argument("--concurrency", type=int, default=scraper.ASYNC_MAX_CONCURRENCY, help="global budget (async)")
+    ap.add_argument("--per-domain", type=int, default=scraper.ASYNC_PER_DOMAIN)
+    args = ap.parse_args()
+
+    scraper.DESC_AND_IMAGE_FETCH_LIMIT = args.details
+    responder = site_responder(args.listings)
+
+    with contextlib.ExitStack() as stack:
+        servers = [
+            stack.enter_context(LocalServer(
+                responder,
+                latency=args.slow_latency if n < args.slow_sites else args.latency,
+            ))
+            for n in range(args.sites)
+        ]
+        sites = [srv.base_url for srv in servers]
+
+        http_session.configure(pool_connections=args.threads, pool_maxsize=scraper.DETAIL_WORKERS)
+        threaded = timed(
+            "threaded",
+            lambda: scraper.scrape_sites_threaded(sites, max_threads=args.threads),
+            servers,
+        )
+
+        http_session.configure(pool_connections=args.concurrency, pool_maxsize=args.per_domain)
+        asynced = timed(
+            "async",
+            lambda: scraper.scrape_sites_async(sites, max_concurrency=args.concurrency, per_domain=args.per_domain),
+            servers,
+        )
+        http_session.close()
+
+    print(f"{'engine':<10}{'seconds':>10}{'fetches':>10}{'fetches/s':>12}{'rows':>8}{'peak threads':>14}")
+    for name, elapsed, fetches, rows, peak in (threaded, asynced):
+        print(f"{name:<10}{elapsed:>10.2f}{fetches:>10}{fetches / elapsed:>12.1f}{rows:>8}{peak:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Reference vs compiled detail-page extractor, pages/sec on one core.
+
+    python benchmarks/bench_detail_extractor.py --pages 300
+    python benchmarks/bench_detail_extractor.py --corpus saved_pages/
+
+With `--corpus`, every *.html file in the directory is used instead of the
+synthetic fixtures. Both extractors run on the same parsed soups, and any
+page where their output dicts differ is reported.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import scraper
+from fixtures import detail_page
+
+
+def load_pages(args):
+    if args.corpus:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.corpus, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+        return pages
+    return [detail_page(i) for i in range(args.pages)]
+
+
+def bench(func, soups, url, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for soup in soups:
+            func(soup, url)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=300)
+    ap.add_argument("--corpus", help="directory of saved detail pages (*.html)")
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        sys.exit("no pages to benchmark")
+    url = "https://www.example-portal.co.uk/property/1"
+    soups = [BeautifulSoup(html, "html.parser") for html in pages]
+
+    mismatches = sum(
+        scraper.extract_details_from_soup(soup, url) != scraper.extract_details_compiled(soup, url)
+        for soup in soups
+    )
+
+    reference = bench(scraper.extract_details_from_soup, soups, url, args.rounds)
+    compiled = bench(scraper.extract_details_compiled, soups, url, args.rounds)
+
+    n = len(soups)
+    print(f"{n} pages, {sum(map(len, pages)) / n / 1024:.1f} KB avg, extraction only (parse excluded)")
+    print(f"{'extractor':<12}{'seconds':>10}{'pages/s/core':>15}")
+    print(f"{'reference':<12}{reference:>10.3f}{n / reference:>15.1f}")
+    print(f"{'compiled':<12}{compiled:>10.3f}{n / compiled:>15.1f}")
+    print(f"speed-up: {reference / compiled:.2f}x, output mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Pooled vs unpooled detail fetches against a local HTTP stand-in.
+
+    python benchmarks/bench_http_pool.py --fetches 1200 --connect-delay 0.03
+
+`--connect-delay` is charged once per new connection, so the unpooled run
+pays it on every fetch while the pooled run pays it once per socket.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_session
+from local_server import LocalServer, static_responder
+
+PAGE = "<html><body>" + "<div class='property-description'>Two bedroom flat. </div>" * 400 + "</body></html>"
+
+
+def run(fetch, urls, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for r in ex.map(lambda u: fetch(u, timeout=10), urls):
+            r.content
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fetches", type=int, default=1200)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--connect-delay", type=float, default=0.03, help="seconds per new connection")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    args = ap.parse_args()
+
+    with LocalServer(static_responder(PAGE), connect_delay=args.connect_delay, latency=args.latency) as srv:
+        urls = [f"{srv.base_url}property/{i}" for i in range(args.fetches)]
+        results = []
+
+        srv.reset_counters()
+        elapsed = run(requests.get, urls, args.workers)
+        results.append(("requests.get", elapsed, srv.connections))
+
+        http_session.configure(pool_maxsize=args.workers)
+        srv.reset_counters()
+        elapsed = run(http_session.fetch, urls, args.workers)
+        results.append(("http_session.fetch", elapsed, srv.connections))
+        http_session.close()
+
+    print(f"{'mode':<22}{'seconds':>10}{'fetches/s':>12}{'connections':>13}")
+    for name, elapsed, conns in results:
+        print(f"{name:<22}{elapsed:>10.2f}{args.fetches / elapsed:>12.1f}{conns:>13}")
+    print(f"speed-up: {results[0][1] / results[1][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
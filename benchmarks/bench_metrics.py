@@ -0,0 +1,132 @@
+"""
+Investment-metric time: the same price parsing and yield arithmetic done
+one listing at a time (a Python loop over records) vs
+investment_metrics.compute_metrics over the whole frame.
+
+    python benchmarks/bench_metrics.py --rows 1000000
+    python benchmarks/bench_metrics.py --rows 200000 --baseline-rows 200000 --check
+
+Listings are synthetic: every city in CITY_YIELDS plus unknown ones, 0-7
+bedrooms or "N/A", sale prices rounded to £5k and pcm/pw rents as the
+portals print them, with some "POA" prices. The per-row baseline is
+slow, so it runs on the first `--baseline-rows` listings and is reported per
+row; `--check` compares every value it produced with the vectorised result
+and exits non-zero on any difference.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import investment_metrics as im
+
+
+def synthetic_listings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = np.array(list(im.CITY_YIELDS) + ["Hinckley", "Stoke Golding", "N/A"], dtype=object)
+    kind = rng.choice(["sale", "pcm", "pw", "poa"], n, p=[0.7, 0.2, 0.07, 0.03])
+    sale = rng.integers(20, 400, n) * 5000
+    pcm = rng.integers(20, 160, n) * 25
+    pw = rng.integers(20, 160, n) * 5
+    price = np.where(kind == "sale", [f"£{p:,}" for p in sale], "POA").astype(object)
+    price[kind == "pcm"] = [f"£{p:,} pcm" for p in pcm[kind == "pcm"]]
+    price[kind == "pw"] = [f"£{p:,} pw" for p in pw[kind == "pw"]]
+    bedrooms = rng.choice([str(b) for b in range(8)] + ["N/A"], n)
+    return pd.DataFrame({
+        "price": price,
+        "category": np.where(kind == "sale", "For Sale", np.where(kind == "poa", "Unknown", "For Rent")),
+        "city": rng.choice(cities, n),
+        "bedrooms": bedrooms,
+    })
+
+
+def row_metrics(row):
+    """compute_metrics for one listing, the way a row-at-a-time step would do it"""
+    amount, frequency = im.parse_price(row["price"])
+    if amount <= 0:
+        amount = math.nan
+    if math.isnan(amount):
+        return {
+            "price_numeric": math.nan, "price_frequency": "N/A", "estimated_property_value": math.nan,
+            "annual_rental_income": math.nan, "gross_rental_yield": "N/A", "roi_percentage": "N/A",
+            "metric_status": "N/A", "estimated_monthly_rent": math.nan,
+        }
+    if frequency is None:
+        frequency = "pcm" if row["category"] == "For Rent" and amount <= im.MAX_MONTHLY_RENT else "sale"
+
+    city = row["city"] if isinstance(row["city"], str) and row["city"].strip() else "N/A"
+    city_yield = im.CITY_YIELDS.get(city)
+    gross_yield = (im.DEFAULT_YIELD if city_yield is None else city_yield) + im.bedroom_adjustment(
+        pd.to_numeric(row["bedrooms"], errors="coerce"))
+    rate = gross_yield / 100
+
+    if frequency == "sale":
+        monthly = amount * rate / 12
+        annual = monthly * 12
+        value = amount
+    else:
+        monthly = amount * im.PAYMENTS_PER_MONTH[frequency]
+        annual = monthly * 12
+        value = annual / rate
+    roi = annual * (1 - im.ANNUAL_COSTS_PERCENT / 100) / value * 100
+
+    return {
+        "price_numeric": amount,
+        "price_frequency": frequency,
+        "estimated_property_value": round(value, 2),
+        "annual_rental_income": round(annual, 2),
+        "gross_rental_yield": f"{gross_yield:.2f}%",
+        "roi_percentage": f"{round(roi, 2):.2f}%",
+        "metric_status": f"City-based ({city})" if city_yield is not None else f"Default yield ({city})",
+        "estimated_monthly_rent": round(monthly, 2),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1000000)
+    ap.add_argument("--baseline-rows", type=int, default=50000, help="listings the per-row baseline runs on")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any baseline value differs from the vectorised one")
+    args = ap.parse_args()
+
+    df = synthetic_listings(args.rows)
+    sample = df.head(args.baseline_rows)
+
+    row_s, by_row = timed(lambda: pd.DataFrame([row_metrics(row) for row in sample.to_dict("records")]))
+    vector_s, metrics = timed(lambda: im.compute_metrics(df))
+
+    print(f"{len(df)} listings ({df['price'].nunique()} distinct prices)")
+    print(f"{'metrics':<28}{'rows':>9}{'seconds':>9}{'us / row':>10}{'speed-up':>10}")
+    row_us = row_s / len(sample) * 1e6
+    for name, rows, elapsed in (("per row (Python loop)", len(sample), row_s), ("vectorised compute_metrics", len(df), vector_s)):
+        us = elapsed / rows * 1e6
+        print(f"{name:<28}{rows:>9}{elapsed:>9.2f}{us:>10.2f}{row_us / us:>9.1f}x")
+
+    if args.check:
+        head = metrics.head(len(sample))
+        diffs = 0
+        for col in im.METRIC_COLUMNS:
+            a, b = by_row[col].to_numpy(), head[col].to_numpy()
+            if pd.api.types.is_numeric_dtype(head[col]):
+                diffs += int((~np.isclose(a, b, equal_nan=True, rtol=0, atol=1e-9)).sum())
+            else:
+                diffs += int((a != b).sum())
+        print(f"{diffs} differing values in {len(sample)} listings")
+        if diffs:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Parse throughput on fetch threads vs the parse_pool process stage.
+
+    python benchmarks/bench_parse_pool.py --pages 200 --kb 150
+
+Pages are pre-encoded bytes, so only the CPU stage (decode, parse, extract)
+is measured. The same number of fetch threads hands pages to 0 (parse
+in-thread), 1, 2, ... up to --max-workers processes.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parse_pool
+import scraper
+from fixtures import detail_page, padded
+
+URL = "https://www.example-portal.co.uk/property/1"
+
+
+def run(bodies, threads):
+    options = scraper.parse_options()
+    if parse_pool.enabled():
+        parse = lambda body: parse_pool.parse_detail(body, "utf-8", URL, options)
+    else:
+        parse = lambda body: scraper.parse_detail_page(body, "utf-8", URL)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(parse, bodies))
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=200)
+    ap.add_argument("--kb", type=int, default=150)
+    ap.add_argument("--threads", type=int, default=scraper.DETAIL_WORKERS)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    bodies = [padded(detail_page(i), args.kb).encode("utf-8") for i in range(args.pages)]
+
+    counts = [0] + sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+    rows = []
+    for workers in counts:
+        parse_pool.configure(workers)
+        rows.append((workers, run(bodies, args.threads)))
+    parse_pool.shutdown()
+
+    single = dict(rows).get(1)
+    print(f"{args.pages} pages x ~{args.kb} KB, {args.threads} fetch threads, {os.cpu_count()} cores")
+    print(f"{'processes':<11}{'seconds':>10}{'pages/s':>10}{'vs 1 proc':>11}")
+    for workers, elapsed in rows:
+        scale = f"{single / elapsed:.2f}x" if single and workers else "-"
+        label = workers if workers else "0 (threads)"
+        print(f"{label!s:<11}{elapsed:>10.2f}{args.pages / elapsed:>10.1f}{scale:>11}")
+
+
+if __name__ == "__main__":
+    main()
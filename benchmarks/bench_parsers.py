@@ -0,0 +1,84 @@
+"""
+Parse time and listing parity for each installed BeautifulSoup backend.
+
+    python benchmarks/bench_parsers.py --pages 100 --kb 300
+    python benchmarks/bench_parsers.py --corpus saved_pages/ --check
+
+Every page is parsed by each backend; detail pages go through
+extract_details_compiled and search pages through extract_listings_from_soup,
+and the output is compared with html.parser's. `--check` exits non-zero if
+any backend's output differs, so it can gate a backend change.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parsers
+import scraper
+from fixtures import detail_page, padded, search_page
+
+URL = "https://www.example-portal.co.uk/"
+
+
+def load_corpus(args):
+    """[(kind, html)] where kind is "detail" or "search" """
+    if args.corpus:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.corpus, "*.html"))):
+            kind = "search" if os.path.basename(path).startswith("search") else "detail"
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((kind, f.read()))
+        return pages
+    pages = [("detail", padded(detail_page(i), args.kb)) for i in range(args.pages)]
+    pages += [("search", padded(search_page(60, offset=i * 60), args.kb)) for i in range(max(1, args.pages // 10))]
+    return pages
+
+
+def extract(kind, soup):
+    if kind == "search":
+        return scraper.extract_listings_from_soup(soup, URL)
+    return scraper.extract_details_compiled(soup, URL + "property/1")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--kb", type=int, default=300, help="pad synthetic pages to this size")
+    ap.add_argument("--corpus", help="directory of saved pages (search*.html are search pages)")
+    ap.add_argument("--check", action="store_true", help="exit 1 on any parity difference")
+    args = ap.parse_args()
+
+    pages = load_corpus(args)
+    if not pages:
+        sys.exit("no pages to benchmark")
+    total_mb = sum(len(html) for _, html in pages) / (1024 * 1024)
+
+    baseline = [extract(kind, html_parsers.make_soup(html, "html.parser")) for kind, html in pages]
+
+    print(f"{len(pages)} pages, {total_mb:.1f} MB")
+    print(f"{'backend':<14}{'parse s':>10}{'pages/s':>10}{'MB/s':>8}{'mismatches':>12}")
+    failed = False
+    for backend in html_parsers.available_backends():
+        start = time.perf_counter()
+        soups = [html_parsers.make_soup(html, backend) for _, html in pages]
+        elapsed = time.perf_counter() - start
+
+        mismatches = [
+            i for i, ((kind, _), soup) in enumerate(zip(pages, soups))
+            if extract(kind, soup) != baseline[i]
+        ]
+        failed = failed or bool(mismatches)
+        print(f"{backend:<14}{elapsed:>10.2f}{len(pages) / elapsed:>10.1f}{total_mb / elapsed:>8.2f}{len(mismatches):>12}")
+        if mismatches:
+            print(f"    differing pages: {mismatches[:10]}{' ...' if len(mismatches) > 10 else ''}")
+
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Upload preprocessing time: cleaning values, building ACF fields and
+formatting currency one row at a time (as the uploader did) vs the
+vectorised uploader.prepare_listings.
+
+    python benchmarks/bench_prepare.py --rows 100000
+    python benchmarks/bench_prepare.py --rows 5000 --check
+
+The CSV is written from fixtures.csv_row and read back with
+uploader.load_listings, like a full property_listings_all.csv export. The
+per-row baseline does the same work once per row over df.iterrows();
+`--check` compares every prepared value with it and exits non-zero on any
+difference.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uploader
+from fixtures import csv_row
+from uploader import ACF_FIELDS, clean_value, format_financial_value
+
+
+def legacy_build_acf_data(row):
+    """build_acf_data before prepare_listings, verbatim"""
+    acf_data = {}
+
+    for acf_field_name, csv_column in ACF_FIELDS.items():
+        value = row.get(csv_column, "")
+
+        # Handle special formatting for specific fields
+        if csv_column in ["gross_rental_yield", "roi_percentage"]:
+            # These might already be formatted with %, extract numeric value
+            clean_val = clean_value(value)
+            if clean_val:
+                try:
+                    numeric_val = float(clean_val.replace("%", "").strip())
+                    acf_data[acf_field_name] = numeric_val
+                except:
+                    acf_data[acf_field_name] = clean_val
+            else:
+                acf_data[acf_field_name] = ""
+
+        elif csv_column in ["price_numeric", "estimated_property_value", "annual_rental_income", "estimated_monthly_rent"]:
+            # Numeric financial fields
+            clean_val = clean_value(value)
+            if clean_val:
+                try:
+                    acf_data[acf_field_name] = float(clean_val)
+                except:
+                    acf_data[acf_field_name] = clean_val
+            else:
+                acf_data[acf_field_name] = ""
+        else:
+            # Regular text fields
+            acf_data[acf_field_name] = clean_value(value)
+
+    return acf_data
+
+
+def legacy_prepare(df):
+    """The per-row equivalent of prepare_listings"""
+    listings = []
+    for _, row in df.iterrows():
+        listing = {col: clean_value(row.get(col, "")) for col in uploader.EXPECTED_COLUMNS}
+        for field, value in legacy_build_acf_data(row).items():
+            listing[f"acf.{field}"] = value
+        for col in uploader.CURRENCY_COLUMNS:
+            listing[f"display.{col}"] = format_financial_value(row.get(col))
+        listings.append(listing)
+    return listings
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--check", action="store_true", help="exit 1 if any prepared value differs from the per-row path")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "property_listings_all.csv")
+        pd.DataFrame([csv_row(i) for i in range(args.rows)]).to_csv(csv_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_s, df = timed(lambda: uploader.load_listings(csv_path))
+
+    legacy_s, legacy = timed(lambda: legacy_prepare(df))
+    vector_s, prepared = timed(lambda: uploader.prepare_listings(df))
+
+    print(f"{len(df)} rows (load_listings {load_s:.2f}s)")
+    print(f"{'preprocessing':<28}{'seconds':>9}{'us / row':>10}{'speed-up':>10}")
+    for name, elapsed in (("per row (iterrows)", legacy_s), ("vectorised prepare_listings", vector_s)):
+        print(f"{name:<28}{elapsed:>9.2f}{elapsed / len(df) * 1e6:>10.1f}{legacy_s / elapsed:>9.2f}x")
+
+    if args.check:
+        diffs = sum(
+            a[key] != b[key] or type(a[key]) is not type(b[key])
+            for a, b in zip(legacy, prepared) for key in a
+        )
+        print(f"{diffs} differing values in {len(df)} rows")
+        if diffs:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
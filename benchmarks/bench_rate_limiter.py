@@ -0,0 +1,128 @@
+"""
+Scrape with and without the per-domain rate limiter (rate_limiter.py) over
+local portal stand-ins that misbehave the way real portals do.
+
+    python benchmarks/bench_rate_limiter.py --timeout 2 --hang 5 --portal-rate 5
+
+Three kinds of site, each its own local server (so its own domain):
+healthy ones; `--hanging` ones whose detail pages never answer within the
+request timeout (an erroring portal); and `--throttling` ones that allow
+`--portal-rate` requests per second and answer the rest with
+429 + Retry-After (a big portal's bot protection). Reported per mode:
+wall time, detail pages fetched, requests left waiting out the timeout,
+429s received, and the limiter's own summary.
+"""
+import argparse
+import collections
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_session
+import scraper
+from fixtures import site_responder
+from local_server import LocalServer
+
+
+def hanging_responder(listings, hang):
+    """Search page answers, detail pages take `hang` seconds"""
+    respond = site_responder(listings)
+
+    def hanging(handler):
+        if handler.path.startswith("/property/"):
+            time.sleep(hang)
+        return respond(handler)
+
+    return hanging
+
+
+def throttling_responder(listings, rate, retry_after, counts):
+    """At most `rate` requests per second are answered; the rest get a 429"""
+    respond = site_responder(listings)
+    recent = collections.deque()
+    lock = threading.Lock()
+
+    def throttled(handler):
+        now = time.monotonic()
+        with lock:
+            while recent and now - recent[0] > 1.0:
+                recent.popleft()
+            if len(recent) >= rate:
+                counts["429"] += 1
+                return 429, {"Content-Type": "text/plain", "Retry-After": str(retry_after)}, b"slow down"
+            recent.append(now)
+        return respond(handler)
+
+    return throttled
+
+
+def run(name, sites, servers, counts, hanging):
+    for srv in servers:
+        srv.reset_counters()
+    counts["429"] = 0
+    if scraper.RATE_LIMITING:
+        scraper._rate_limiter = None  # Learned rates and open circuits would carry over between modes
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = scraper.scrape_sites_threaded(sites)
+        elapsed = time.perf_counter() - start
+    fetched = sum(
+        1 for rows in results.values() for r in rows
+        if not r["description"].startswith(("Pending", "Not fetched", "No description"))
+    )
+    timed_out = sum(srv.requests for srv in hanging) - len(hanging)  # Less the search pages
+    limiter = scraper.get_rate_limiter().summary() if scraper.RATE_LIMITING else "-"
+    return name, elapsed, fetched, timed_out, counts["429"], limiter
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--healthy", type=int, default=6)
+    ap.add_argument("--hanging", type=int, default=2)
+    ap.add_argument("--throttling", type=int, default=2)
+    ap.add_argument("--listings", type=int, default=30, help="listing cards per search page")
+    ap.add_argument("--details", type=int, default=30, help="DESC_AND_IMAGE_FETCH_LIMIT")
+    ap.add_argument("--latency", type=float, default=0.05, help="seconds per request on every server")
+    ap.add_argument("--timeout", type=float, default=2.0, help="REQUEST_TIMEOUT")
+    ap.add_argument("--hang", type=float, default=5.0, help="seconds a hanging portal takes per detail page")
+    ap.add_argument("--portal-rate", type=int, default=5, help="requests/s a throttling portal allows")
+    ap.add_argument("--retry-after", type=int, default=1, help="Retry-After a throttling portal sends")
+    args = ap.parse_args()
+
+    scraper.DESC_AND_IMAGE_FETCH_LIMIT = args.details
+    scraper.REQUEST_TIMEOUT = args.timeout
+    scraper.HTTP_CACHE_ENABLED = False
+    scraper.INCREMENTAL_SCRAPING = False
+    counts = {"429": 0}
+
+    with contextlib.ExitStack() as stack:
+        serve = lambda responder: stack.enter_context(LocalServer(responder, latency=args.latency))
+        healthy = [serve(site_responder(args.listings)) for _ in range(args.healthy)]
+        hanging = [serve(hanging_responder(args.listings, args.hang)) for _ in range(args.hanging)]
+        throttling = [serve(throttling_responder(args.listings, args.portal_rate, args.retry_after, counts))
+                      for _ in range(args.throttling)]
+        servers = healthy + hanging + throttling
+        sites = [srv.base_url for srv in servers]
+
+        rows = []
+        for name, enabled in (("no rate limiter", False), ("rate limiter", True)):
+            scraper.RATE_LIMITING = enabled
+            http_session.configure(pool_connections=scraper.MAX_THREADS, pool_maxsize=scraper.DETAIL_WORKERS)
+            rows.append(run(name, sites, servers, counts, hanging))
+            time.sleep(args.hang)  # Let hung server threads finish before the next mode
+        http_session.close()
+
+    print(f"{args.healthy} healthy, {args.hanging} hanging, {args.throttling} throttling sites; "
+          f"timeout {args.timeout}s, portal rate {args.portal_rate}/s")
+    print(f"{'mode':<18}{'seconds':>9}{'details':>9}{'timeouts':>10}{'429s':>7}  limiter")
+    for name, elapsed, fetched, timed_out, throttled, limiter in rows:
+        print(f"{name:<18}{elapsed:>9.2f}{fetched:>9}{timed_out:>10}{throttled:>7}  {limiter}")
+
+
+if __name__ == "__main__":
+    main()
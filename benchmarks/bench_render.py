@@ -0,0 +1,93 @@
+"""
+Post-body render time per 10k listings: the old f-string/concatenation
+builders (legacy_render.py) vs the escaping template functions in post_templates.py.
+
+    python benchmarks/bench_render.py --rows 10000 --images 6
+    python benchmarks/bench_render.py --check
+
+Rows come from fixtures.csv_row, so every section (table, metrics,
+gallery, description) is rendered. The per-row template timing renders
+listings already cleaned by uploader.prepare_listings (bench_prepare.py
+times that step); the "+ prepare_listings" timing adds it, as an upload
+run pays it. That step also builds every ACF value the upload sends,
+which the legacy timing leaves out, so it is an upper bound rather than a
+like-for-like comparison. "KB in memory" is the size
+of each rendered str: the templates write emoji as character references,
+so posts stay 1 byte per character instead of 4.
+`--check` compares the outputs with whitespace collapsed (and the template
+output unescaped) and exits non-zero on any difference; the fixtures contain
+no characters that need escaping, so escaping alone can't make them differ.
+"""
+import argparse
+import os
+import sys
+import time
+from html import unescape
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import legacy_render
+import uploader
+from fixtures import csv_row
+
+
+def make_rows(n, images):
+    rows = [csv_row(i, images) for i in range(n)]
+    galleries = [[{"id": k, "url": f"https://wp.example/uploads/{i}-{k}.webp"} for k in range(images)] for i in range(n)]
+    return rows, galleries
+
+
+def timed(fn, repeat):
+    """Best of `repeat` runs; the previous run's output is freed first so every run allocates alike"""
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        out = None
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--images", type=int, default=6, help="uploaded images per listing")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per renderer (best is reported)")
+    ap.add_argument("--check", action="store_true", help="exit 1 if the outputs differ beyond whitespace")
+    args = ap.parse_args()
+
+    rows, galleries = make_rows(args.rows, args.images)
+    df = pd.DataFrame(rows).astype(str)  # As load_listings leaves it
+    rows = df.to_dict("records")
+    listings = uploader.prepare_listings(df)
+    per_10k = 10000 / args.rows
+
+    renderers = [
+        ("legacy f-strings", lambda: [legacy_render.build_content_html(r, g) for r, g in zip(rows, galleries)]),
+        ("templates, per row", lambda: [uploader.build_content_html(r, g) for r, g in zip(listings, galleries)]),
+        ("templates + prepare_listings", lambda: [
+            uploader.build_content_html(r, g) for r, g in zip(uploader.prepare_listings(df), galleries)
+        ]),
+    ]
+    results = [(name, *timed(fn, args.repeat)) for name, fn in renderers]
+
+    base = results[0][1]
+    print(f"{args.rows} listings x {args.images} images")
+    print(f"{'renderer':<30}{'s / 10k rows':>14}{'KB in memory':>14}{'speed-up':>10}")
+    for name, elapsed, out in results:
+        kb = sum(sys.getsizeof(html) for html in out) / len(out) / 1024
+        print(f"{name:<30}{elapsed * per_10k:>14.3f}{kb:>14.1f}{base / elapsed:>9.2f}x")
+
+    if args.check:
+        legacy = results[0][2]
+        for name, _, out in results[1:]:
+            diffs = sum(" ".join(a.split()) != " ".join(unescape(b).split()) for a, b in zip(legacy, out))
+            print(f"{name}: {diffs} of {len(out)} posts differ from legacy")
+            if diffs:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+End-to-end scraper benchmark against a replayed run, no internet needed.
+
+    python benchmarks/bench_scraper.py --sites 20 --listings 40 --latency 0.1 --jitter 0.05
+    python benchmarks/bench_scraper.py --archive scrape_replay.sqlite3 --recorded-latency
+
+Without `--archive`, a synthetic run (fixtures.search_page/detail_page on
+`--sites` made-up portals) is recorded into a temporary archive first. A
+real run is recorded by setting scraper.RECORD_ARCHIVE before scraping;
+its sites are the search pages in the archive.
+
+Each mode runs in a fresh process against the same replay servers:
+process_site one site at a time, then the threaded and async site loops
+over every site. Reported per mode: wall time, listings, fetches and
+fetches/sec (as seen by the servers), parse CPU time (decode + parse +
+extract, summed over threads) and the process's peak RSS. The HTTP cache
+and listing index are off so every run fetches everything; per-domain rate
+limits stay on unless `--no-rate-limit`.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_session
+import replay_archive
+import scraper
+from fixtures import detail_page, padded, search_page
+from replay_server import ReplayServers, install
+
+MODES = ["process_site (one by one)", "threaded site loop", "async site loop"]
+
+
+def record_synthetic(path, sites, listings, kb):
+    """Archive of `sites` made-up portals, each a search page and its detail pages"""
+    archive = replay_archive.ReplayArchive(path)
+    urls = []
+    for n in range(sites):
+        site = f"https://www.portal-{n}.example/"
+        urls.append(site)
+        offset = n * listings
+        archive.record(site, 200, padded(search_page(listings, offset), kb).encode("utf-8"), "utf-8", kind="search")
+        for i in range(offset, offset + listings):
+            archive.record(f"{site}property/{i}", 200, padded(detail_page(i), kb).encode("utf-8"), "utf-8", kind="detail")
+    archive.close()
+    return urls
+
+
+def run_mode(mode, sites, hosts, details, rate_limit=True):
+    """One mode in a fresh process; returns (seconds, listings, parse CPU seconds, peak RSS MB)"""
+    scraper.HTTP_CACHE_ENABLED = False
+    scraper.INCREMENTAL_SCRAPING = False
+    scraper.DYNAMIC_DOMAINS = set()  # Rendered pages were recorded; never start Chrome
+    scraper.DESC_AND_IMAGE_FETCH_LIMIT = details
+    scraper.RATE_LIMITING = rate_limit
+
+    parse_seconds = [0.0]
+    lock = threading.Lock()
+
+    def timed(parse):
+        @functools.wraps(parse)
+        def wrapper(*args, **kwargs):
+            start = time.thread_time()  # CPU time, so threads waiting on the GIL don't count
+            try:
+                return parse(*args, **kwargs)
+            finally:
+                with lock:
+                    parse_seconds[0] += time.thread_time() - start
+        return wrapper
+
+    scraper.parse_search_page = timed(scraper.parse_search_page)
+    scraper.parse_detail_page = timed(scraper.parse_detail_page)
+
+    if mode == MODES[2]:
+        http_session.configure(pool_connections=scraper.ASYNC_MAX_CONCURRENCY, pool_maxsize=scraper.ASYNC_PER_DOMAIN)
+    else:
+        http_session.configure(pool_connections=scraper.MAX_THREADS, pool_maxsize=scraper.DETAIL_WORKERS)
+    install(hosts)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if mode == MODES[0]:
+            rows = sum(len(scraper.process_site(site)) for site in sites)
+        elif mode == MODES[1]:
+            rows = sum(len(r) for r in scraper.scrape_sites_threaded(sites).values())
+        else:
+            rows = sum(len(r) for r in scraper.scrape_sites_async(sites).values())
+        elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else float("nan")
+    return elapsed, rows, parse_seconds[0], peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--archive", help="replay archive recorded with scraper.RECORD_ARCHIVE (default: synthetic run)")
+    ap.add_argument("--sites", type=int, default=20, help="synthetic portals")
+    ap.add_argument("--listings", type=int, default=40, help="listing cards per synthetic search page")
+    ap.add_argument("--kb", type=int, default=100, help="approximate size of each synthetic page")
+    ap.add_argument("--details", type=int, default=30, help="DESC_AND_IMAGE_FETCH_LIMIT")
+    ap.add_argument("--latency", type=float, default=0.1, help="seconds per request")
+    ap.add_argument("--jitter", type=float, default=0.05, help="+/- seconds of random latency per request")
+    ap.add_argument("--recorded-latency", action="store_true", help="replay each response's recorded time instead")
+    ap.add_argument("--no-rate-limit", action="store_true", help="fetch without per-domain rate limits")
+    ap.add_argument("--modes", default=",".join(str(i) for i in range(len(MODES))),
+                    help="comma-separated mode numbers: " + ", ".join(f"{i} = {m}" for i, m in enumerate(MODES)))
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.archive:
+            archive = replay_archive.ReplayArchive(args.archive)
+            sites = archive.sites()
+        else:
+            sites = record_synthetic(os.path.join(tmp, "synthetic.sqlite3"), args.sites, args.listings, args.kb)
+            archive = replay_archive.ReplayArchive(os.path.join(tmp, "synthetic.sqlite3"))
+        print(f"{len(sites)} sites, archive: {archive.summary()}")
+
+        rows = []
+        with ReplayServers(archive, args.latency, args.jitter, recorded_latency=args.recorded_latency) as servers:
+            for i in map(int, args.modes.split(",")):
+                servers.reset_counters()
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    elapsed, listings, parse_s, peak = pool.submit(run_mode, MODES[i], sites, servers.hosts, args.details, not args.no_rate_limit).result()
+                rows.append((MODES[i], elapsed, listings, servers.requests, servers.misses, parse_s, peak))
+        archive.close()
+
+    latency = "recorded" if args.recorded_latency else f"{args.latency}s +/- {args.jitter}s"
+    print(f"latency {latency}, details per site {args.details}")
+    print(f"{'mode':<28}{'seconds':>9}{'listings':>10}{'fetches':>9}{'fetch/s':>9}{'misses':>8}{'parse CPU':>11}{'peak MB':>9}")
+    for name, elapsed, listings, fetches, misses, parse_s, peak in rows:
+        print(f"{name:<28}{elapsed:>9.2f}{listings:>10}{fetches:>9}{fetches / elapsed:>9.1f}{misses:>8}{parse_s:>11.2f}{peak:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
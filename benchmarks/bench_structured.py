@@ -0,0 +1,108 @@
+"""
+Embedded-data fast path (structured_data.py) vs the DOM heuristics, pages/sec
+on one core for detail and search pages.
+
+    python benchmarks/bench_structured.py --pages 300 --check
+    python benchmarks/bench_structured.py --corpus saved_pages/
+
+Synthetic pages are the same fixtures with their data also embedded as
+JSON-LD or __NEXT_DATA__ (and, as the miss case, not embedded at all). Each
+page goes through scraper.parse_detail_page / parse_search_page from raw
+bytes, so decoding and, on the DOM path, tree building are included.
+`--check` compares the fields both paths should agree on. With `--corpus`,
+every *.html file is parsed as a detail page and the hit rate is reported;
+the page URL is taken as the file name, so a blob whose listing links to
+another path counts as a miss unless the file is named after it.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper
+import structured_data
+from fixtures import detail_page, search_page
+
+URL = "https://www.example-portal.co.uk/"
+BLOBS = [None, "json-ld", "next-data"]
+CHECKED = {
+    "detail": ["description", "image_urls", "bedrooms", "bathrooms", "city"],
+    "search": ["title", "price", "link"],
+}
+
+
+def best_of(rounds, func, pages, urls):
+    best, results = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = [func(page, url) for page, url in zip(pages, urls)]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def parse_all(parse, pages, urls, structured, rounds):
+    """Each page is parsed as fetched from its own URL, so detail blobs match their page"""
+    scraper.STRUCTURED_DATA = structured
+    return best_of(rounds, lambda page, url: parse(page, "utf-8", url), pages, urls)
+
+
+def compare(fast, slow, fields):
+    """Field -> number of records where the two paths disagree"""
+    diffs = {}
+    for a, b in zip(fast, slow):
+        for field in fields:
+            if a[field] != b[field]:
+                diffs[field] = diffs.get(field, 0) + 1
+    return diffs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=300, help="detail pages per blob kind")
+    ap.add_argument("--search-pages", type=int, default=30, help="search pages (40 cards each) per blob kind")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--corpus", help="directory of saved detail pages (*.html) instead of the fixtures")
+    ap.add_argument("--check", action="store_true", help="report fields where the two paths disagree")
+    args = ap.parse_args()
+    print(f"JSON parser: {'orjson' if structured_data.orjson else 'json (stdlib)'}")
+
+    if args.corpus:
+        paths = sorted(glob.glob(os.path.join(args.corpus, "*.html")))
+        pages = [open(path, "rb").read() for path in paths]
+        urls = [URL + os.path.basename(path) for path in paths]
+        dom_s, _ = parse_all(scraper.parse_detail_page, pages, urls, False, args.rounds)
+        fast_s, results = parse_all(scraper.parse_detail_page, pages, urls, True, args.rounds)
+        hits = sum(1 for r in results if r.get("_extracted"))
+        print(f"{len(pages)} pages, {hits} from embedded data ({hits / max(len(pages), 1):.0%})")
+        print(f"DOM {len(pages) / dom_s:.1f} pages/s, with fast path {len(pages) / fast_s:.1f} pages/s")
+        return
+
+    print(f"{'page':<8}{'embedded':<11}{'DOM p/s':>9}{'fast p/s':>10}{'speed-up':>10}{'hits':>7}" + ("  diffs" if args.check else ""))
+    for kind, make, count, parse in (
+        ("detail", detail_page, args.pages, scraper.parse_detail_page),
+        ("search", lambda i, blob: search_page(40, i * 40, blob), args.search_pages, scraper.parse_search_page),
+    ):
+        for blob in BLOBS:
+            pages = [make(i, blob).encode("utf-8") for i in range(count)]
+            urls = [URL + f"property/{i}" if kind == "detail" else URL for i in range(count)]
+            dom_s, slow = parse_all(parse, pages, urls, False, args.rounds)
+            fast_s, fast = parse_all(parse, pages, urls, True, args.rounds)
+            if kind == "detail":
+                hits = sum(1 for r in fast if r.get("_extracted"))
+                diffs = compare(fast, slow, CHECKED[kind])
+            else:
+                hits = sum(1 for r in fast if r and r[0].get("_extracted"))
+                diffs = compare([l for r in fast for l in r], [l for r in slow for l in r], CHECKED[kind])
+                if any(len(a) != len(b) for a, b in zip(fast, slow)):
+                    diffs["listing count"] = sum(1 for a, b in zip(fast, slow) if len(a) != len(b))
+            line = f"{kind:<8}{blob or 'none':<11}{count / dom_s:>9.1f}{count / fast_s:>10.1f}{dom_s / fast_s:>9.1f}x{hits:>7}"
+            if args.check:
+                line += "  " + (", ".join(f"{field} {n}" for field, n in diffs.items()) or "none")
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
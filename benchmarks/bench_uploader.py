@@ -0,0 +1,115 @@
+"""
+WordPress upload time: one image at a time vs the concurrent image pipeline,
+with and without /batch/v1 post batching.
+
+    python benchmarks/bench_uploader.py --listings 50 --images 5 --wp-latency 0.15
+
+Runs uploader.upload_listings against a local mock of the WP REST API and
+an image host, each with its own per-request latency. The sequential row is
+1 post worker / 1 image worker with no rate limit; the old uploader also
+slept 0.5 s per image and 2 s per post on top of that. Image transforms and
+the media cache are off so only transfer and request scheduling are timed;
+post-index and journal writes go to temporary files. `--throttle` makes
+the mock answer that share of requests with 429 to exercise the backoff.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import post_index
+import upload_journal
+import uploader
+from fixtures import listing
+from local_server import LocalServer
+from mock_wp import API, MockWordPress, image_responder
+
+
+def write_csv(path, listings, images, image_base):
+    rows = []
+    for i in range(listings):
+        l = listing(i)
+        rows.append({
+            "title": f"{l['beds']} bed {l['type']} {'to rent' if l['rent'] else 'for sale'}, {l['street']} #{i}",
+            "price": l["price"],
+            "link": f"https://www.example-portal.co.uk/property/{i}",
+            "source": "https://www.example-portal.co.uk/",
+            "category": "For Rent" if l["rent"] else "For Sale",
+            "description": f"A {l['beds']} bedroom {l['type']} in {l['town']}.\n\nMarketed by {l['agent']}.",
+            "address": f"{l['street']}, {l['town']}",
+            "agent": l["agent"],
+            "bedrooms": l["beds"],
+            "bathrooms": l["baths"],
+            "city": l["town"],
+            "image_urls_str": "|".join(f"{image_base}img/{i * images + k}.jpg" for k in range(images)),
+        })
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def run(csv_path, wp_base, post_workers, image_workers, rate, batch=False):
+    uploader.WP_URL = f"{wp_base}{API.lstrip('/')}/property"
+    uploader.MEDIA_URL = f"{wp_base}{API.lstrip('/')}/media"
+    uploader.POST_WORKERS = post_workers
+    uploader.IMAGE_WORKERS = image_workers
+    uploader.WP_RATE_LIMIT = rate
+    uploader.WP_MAX_CONCURRENT = max(post_workers, image_workers)
+    uploader.BATCH_MODE = batch
+    uploader.MEDIA_CACHE_ENABLED = False
+    uploader.TRANSFORM_IMAGES = False
+    uploader.UPSERT_MODE = False
+    uploader._post_index = post_index.PostIndex(os.path.join(os.path.dirname(csv_path), f"index-{time.monotonic()}.sqlite3"))
+    uploader._journal = upload_journal.UploadJournal(os.path.join(os.path.dirname(csv_path), f"journal-{time.monotonic()}.jsonl"))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = uploader.load_listings(csv_path)
+        start = time.perf_counter()
+        stats = uploader.upload_listings(df, {}, {})
+    return time.perf_counter() - start, stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--listings", type=int, default=50)
+    ap.add_argument("--images", type=int, default=5, help="images per listing")
+    ap.add_argument("--wp-latency", type=float, default=0.15, help="seconds per WP REST request")
+    ap.add_argument("--image-latency", type=float, default=0.1, help="seconds per image download")
+    ap.add_argument("--rate", type=float, default=0, help="WP requests/second for the pipeline rows (0 = unlimited)")
+    ap.add_argument("--throttle", type=float, default=0.0, help="share of WP requests answered 429")
+    args = ap.parse_args()
+
+    uploader.MAX_UPLOADS = args.listings
+    configs = [
+        ("sequential", 1, 1, False),
+        ("pipeline 2/4", 2, 4, False),
+        ("pipeline 4/8", 4, 8, False),
+        ("pipeline 8/16", 8, 16, False),
+        ("pipeline 4/8 + batch", 4, 8, True),
+    ]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, \
+            LocalServer(image_responder(), latency=args.image_latency) as images, \
+            LocalServer(None, latency=args.wp_latency) as wp:
+        csv_path = os.path.join(tmp, "listings.csv")
+        write_csv(csv_path, args.listings, args.images, images.base_url)
+        for name, posts, workers, batch in configs:
+            mock = MockWordPress(throttle=args.throttle)
+            wp.httpd.responder = mock.respond
+            elapsed, stats = run(csv_path, wp.base_url, posts, workers, 0 if name == "sequential" else args.rate, batch)
+            rows.append((name, elapsed, stats, len(mock.media), sum(mock.calls.values()), mock.calls.get("429", 0)))
+
+    base = rows[0][1]
+    print(f"{args.listings} listings x {args.images} images, WP latency {args.wp_latency}s, image latency {args.image_latency}s")
+    print(f"{'mode (posts/images)':<24}{'seconds':>9}{'posts':>7}{'media':>7}{'WP reqs':>9}{'429s':>6}{'speed-up':>10}")
+    for name, elapsed, stats, media, calls, throttled in rows:
+        print(f"{name:<24}{elapsed:>9.2f}{stats['success']:>7}{media:>7}{calls:>9}{throttled:>6}{base / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Synthetic portal pages for benchmarks.
+
+Pages are deterministic for a given index and shaped like the portals in
+AGENT_SITES: class-named listing cards on search pages, and detail pages
+with navigation chrome, a description block, key features, an address
+heading, an agent panel and a photo gallery.
+"""
+import json
+import random
+
+STREETS = ["Higham Lane", "Blackbird Drive", "Camden High Street", "Kew Road", "Albert Square", "Mill Lane"]
+TOWNS = ["London", "Manchester", "Bristol", "Leeds", "Bath", "Brighton", "Stoke Golding", "Bury St Edmunds"]
+AGENTS = ["Belvoir", "Foxtons", "Connells", "Hunters", "Winkworth", "Hamptons"]
+TYPES = ["flat", "house", "apartment", "studio", "maisonette"]
+
+SENTENCES = [
+    "This spacious and well-presented home is offered with no onward chain.",
+    "The accommodation comprises an entrance hall, open-plan kitchen and a bright reception room.",
+    "Upstairs there are generous bedrooms served by a modern family bathroom.",
+    "Outside the property benefits from a private rear garden and allocated parking.",
+    "Local shops, schools and transport links are all within easy walking distance.",
+    "Early viewing is highly recommended to appreciate the space on offer.",
+]
+
+
+def _rng(i):
+    return random.Random(i * 7919 + 17)
+
+
+def listing(i):
+    r = _rng(i)
+    rent = r.random() < 0.4
+    beds = r.randint(1, 5)
+    price = r.randrange(700, 3500, 25) if rent else r.randrange(120000, 1500000, 5000)
+    return {
+        "beds": beds,
+        "baths": r.randint(1, 3),
+        "type": r.choice(TYPES),
+        "street": r.choice(STREETS),
+        "town": r.choice(TOWNS),
+        "agent": r.choice(AGENTS),
+        "rent": rent,
+        "price": f"£{price:,}" + (" pcm" if rent else ""),
+        "images": r.randint(3, 12),
+    }
+
+
+def csv_row(i, images=5, image_base="https://cdn.example-portal.co.uk/"):
+    """
+    A row of the scraper's output CSV for listing i, financial metrics
+    included; some metrics are "N/A" as they are for listings the scraper
+    couldn't price.
+    """
+    l = listing(i)
+    price = int(l["price"].lstrip("£").split()[0].replace(",", ""))
+    monthly = price if l["rent"] else round(price * 0.004)
+    known = i % 7 != 0
+    return {
+        "title": f"{l['beds']} bed {l['type']} {'to rent' if l['rent'] else 'for sale'}, {l['street']} #{i}",
+        "price": l["price"],
+        "link": f"https://www.example-portal.co.uk/property/{i}",
+        "source": "https://www.example-portal.co.uk/",
+        "published": "2026-10-01",
+        "category": "For Rent" if l["rent"] else "For Sale",
+        "image_urls_str": "|".join(f"{image_base}img/{i * images + k}.jpg" for k in range(images)),
+        "description": "\n\n".join(SENTENCES[(i + k) % len(SENTENCES)] for k in range(4)),
+        "address": f"{l['street']}, {l['town']}",
+        "agent": l["agent"],
+        "bedrooms": l["beds"],
+        "bathrooms": l["baths"],
+        "city": l["town"],
+        "price_numeric": price,
+        "price_frequency": "monthly" if l["rent"] else "once",
+        "estimated_property_value": monthly * 250 if l["rent"] else price,
+        "annual_rental_income": monthly * 12 if known else "N/A",
+        "gross_rental_yield": f"{monthly * 1200 / (monthly * 250 if l['rent'] else price):.2f}%" if known else "N/A",
+        "roi_percentage": f"{(i % 40) / 10 + 1:.2f}%" if i % 3 else "N/A",
+        "estimated_monthly_rent": monthly if known else "N/A",
+        "metric_status": "Estimated from area averages" if known else "N/A",
+    }
+
+
+def _chrome(body, title):
+    nav = "".join(f'<li class="nav-item"><a href="/section/{n}">Section {n}</a></li>' for n in range(40))
+    footer = "".join(f'<p class="footer-link"><a href="/info/{n}">Info {n}</a></p>' for n in range(30))
+    scripts = '<script>window.dataLayer=[];function gtag(){dataLayer.push(arguments)}</script>' * 5
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title>"
+        f'<meta name="viewport" content="width=device-width">{scripts}</head>'
+        f'<body><header class="site-header"><img class="logo" src="/static/logo.png"><ul class="nav">{nav}</ul></header>'
+        f"<main>{body}</main><footer>{footer}</footer></body></html>"
+    )
+
+
+def _price_amount(d):
+    return int(d["price"].lstrip("£").split()[0].replace(",", ""))
+
+
+def _json_ld_listing(i, d, description=None, images=()):
+    """schema.org RealEstateListing for listing `i`, shaped like the portals' JSON-LD"""
+    offer = {"@type": "Offer", "price": _price_amount(d), "priceCurrency": "GBP"}
+    if d["rent"]:
+        offer["priceSpecification"] = {"@type": "UnitPriceSpecification", "unitText": "MONTH"}
+    item = {
+        "@type": "RealEstateListing",
+        "name": f"{d['beds']} bed {d['type']} {'to rent' if d['rent'] else 'for sale'}",
+        "url": f"/property/{i}",
+        "offers": offer,
+        "mainEntity": {
+            "@type": "House" if d["type"] == "house" else "Apartment",
+            "numberOfBedrooms": d["beds"],
+            "numberOfBathroomsTotal": d["baths"],
+            "address": {"@type": "PostalAddress", "streetAddress": d["street"], "addressLocality": d["town"]},
+        },
+        "offeredBy": {"@type": "RealEstateAgent", "name": f"{d['agent']} Estate Agents"},
+    }
+    if description:
+        item["description"] = description
+    if images:
+        item["image"] = list(images)
+    return item
+
+
+def _next_data_listing(i, d, description=None, images=()):
+    """A listing as a Next.js portal keeps it in its page props"""
+    item = {
+        "id": i,
+        "propertyUrl": f"/property/{i}",
+        "title": f"{d['beds']} bed {d['type']} {'to rent' if d['rent'] else 'for sale'}",
+        "displayAddress": f"{d['street']}, {d['town']}",
+        "bedrooms": d["beds"],
+        "bathrooms": d["baths"],
+        "price": {
+            "amount": _price_amount(d),
+            "frequency": "monthly" if d["rent"] else "not_specified",
+            "displayPrices": [{"displayPrice": d["price"]}],
+        },
+        "customer": {"branchDisplayName": f"{d['agent']} Estate Agents"},
+    }
+    if description:
+        item["description"] = description
+    if images:
+        item["images"] = [{"url": url, "caption": f"Photo {k}"} for k, url in enumerate(images)]
+    return item
+
+
+def _blob_script(blob, data):
+    if blob == "json-ld":
+        return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+    return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps({"props": {"pageProps": data}, "page": "/"})}</script>'
+
+
+def search_page(n, offset=0, blob=None):
+    """
+    Search results page with `n` listing cards linking to /property/<i>;
+    `blob` ("json-ld" or "next-data") also embeds the cards' data as JSON.
+    """
+    cards = []
+    for i in range(offset, offset + n):
+        d = listing(i)
+        verb = "to rent" if d["rent"] else "for sale"
+        cards.append(
+            f'<div class="property-card search-result">'
+            f'<img class="property-image" src="/img/{i}/0.jpg">'
+            f'<a href="/property/{i}">{d["beds"]} bed {d["type"]} {verb}</a>'
+            f'<p class="address">{d["street"]}, {d["town"]}</p>'
+            f'<span class="price">{d["price"]}</span>'
+            f'<span class="agent-name">{d["agent"]}</span></div>'
+        )
+    body = f'<section class="results">{"".join(cards)}</section>'
+    if blob == "json-ld":
+        items = [{"@type": "ListItem", "position": k + 1, "item": _json_ld_listing(i, listing(i))}
+                 for k, i in enumerate(range(offset, offset + n))]
+        body += _blob_script(blob, {"@context": "https://schema.org", "@type": "ItemList", "itemListElement": items})
+    elif blob == "next-data":
+        body += _blob_script(blob, {"searchResults": {"listings": [_next_data_listing(i, listing(i)) for i in range(offset, offset + n)]}})
+    return _chrome(body, "Property search")
+
+
+def detail_page(i, blob=None):
+    """Detail page for listing `i`; `blob` ("json-ld" or "next-data") also embeds its data as JSON"""
+    d = listing(i)
+    r = _rng(i + 1)
+    paras = " ".join(r.choice(SENTENCES) for _ in range(r.randint(4, 9)))
+    features = "".join(f"<li>Feature {k}: {r.choice(SENTENCES)[:40]}</li>" for k in range(6))
+    gallery = "".join(
+        f'<li><img class="gallery-photo" data-src="https://media.example-cdn.co.uk/{i}/{k}.jpg?w=1024" '
+        f'src="/static/placeholder.gif"></li>'
+        for k in range(d["images"])
+    )
+    verb = "to rent" if d["rent"] else "for sale"
+    body = (
+        f'<div class="breadcrumbs"><a href="/">Home</a> &gt; <a href="/search">Search</a></div>'
+        f'<h1 class="property-title">{d["beds"]} bedroom {d["type"]} {verb}</h1>'
+        f'<h2 class="property-address">{d["street"]}, {d["town"]}</h2>'
+        f'<p class="price">{d["price"]}</p>'
+        f'<ul class="property-gallery">{gallery}</ul>'
+        f'<div class="key-facts"><span>{d["beds"]} bedrooms</span> <span>{d["baths"]} bathrooms</span></div>'
+        f'<div class="property-description"><h3>Description</h3><p>{paras}</p></div>'
+        f'<ul class="features-list">{features}</ul>'
+        f'<div class="agent-panel"><p class="agent-name">{d["agent"]} Estate Agents</p><p>Call 01234 567890</p></div>'
+        f'<p>Cookie notice: we use cookies to improve your experience on this website and search.</p>'
+    )
+    images = [f"https://media.example-cdn.co.uk/{i}/{k}.jpg?w=1024" for k in range(d["images"])]
+    if blob == "json-ld":
+        body += _blob_script(blob, dict(_json_ld_listing(i, d, paras, images), **{"@context": "https://schema.org"}))
+    elif blob == "next-data":
+        body += _blob_script(blob, {"property": _next_data_listing(i, d, paras, images)})
+    return _chrome(body, f"{d['beds']} bed {d['type']} {verb}")
+
+
+def site_responder(listings_per_site=40):
+    """
+    Responder for benchmarks.local_server.LocalServer: "/" is a search page,
+    "/property/<i>" is a detail page, anything else is 404.
+    """
+    search = search_page(listings_per_site).encode("utf-8")
+
+    def respond(handler):
+        path = handler.path.split("?")[0]
+        if path in ("/", ""):
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, search
+        if path.startswith("/property/"):
+            try:
+                i = int(path.rsplit("/", 1)[1])
+            except ValueError:
+                return 404, {}, b""
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, detail_page(i).encode("utf-8")
+        return 404, {"Content-Type": "text/plain"}, b"not found"
+
+    return respond
+
+
+def padded(html, kb):
+    """Grow a page to roughly `kb` kilobytes with footer-style link blocks"""
+    block = '<div class="footer-col"><a href="/area/{n}">Homes in area {n}</a><span>Popular searches</span></div>'
+    parts = []
+    size, n = len(html), 0
+    while size < kb * 1024:
+        chunk = block.format(n=n)
+        parts.append(chunk)
+        size += len(chunk)
+        n += 1
+    return html.replace("</body>", "".join(parts) + "</body>", 1)
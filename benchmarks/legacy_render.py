@@ -0,0 +1,221 @@
+"""
+Post-body rendering as it was before post_templates.py: string
+concatenation with f-strings and no escaping. Kept only as the baseline
+(and parity reference) for bench_render.py.
+"""
+from uploader import clean_value, format_financial_value
+
+
+def build_image_gallery_html(images):
+    """Build HTML gallery for additional images (after featured image)"""
+    if len(images) <= 1:
+        return ""
+    
+    gallery_html = '<div class="property-gallery" style="margin: 20px 0;">\n'
+    gallery_html += '<h3>📸 Property Gallery</h3>\n'
+    gallery_html += '<div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(250px, 1fr)); gap: 15px; margin-top: 15px;">\n'
+    
+    # Skip first image (it's the featured image)
+    for img in images[1:]:
+        gallery_html += f'''
+        <div style="border: 1px solid #ddd; border-radius: 5px; overflow: hidden;">
+            <img src="{img["url"]}" alt="Property Image" style="width: 100%; height: 200px; object-fit: cover;" loading="lazy" />
+        </div>\n'''
+    
+    gallery_html += '</div>\n</div>\n'
+    return gallery_html
+
+
+def format_description_for_display(description):
+    """Format description with proper paragraph breaks"""
+    if not description or description.lower() in ["n/a", "no description available", "not fetched (limit reached)", "pending"]:
+        return "No description available for this property."
+    
+    description = str(description).strip()
+    
+    # If description already has paragraph breaks (from enhanced scraper), wrap in paragraph tags
+    if "\n\n" in description:
+        # Split into paragraphs and wrap each
+        paragraphs = description.split("\n\n")
+        formatted = ""
+        for para in paragraphs:
+            para = para.strip()
+            if para:
+                formatted += f"<p>{para}</p>\n"
+        return formatted
+    else:
+        # Single block - wrap in paragraph tag
+        return f"<p>{description}</p>"
+
+
+def build_financial_metrics_html(row):
+    """Build HTML section for financial metrics"""
+    category = row.get("category", "Unknown")
+    
+    # Extract values
+    price = clean_value(row.get("price", "N/A"))
+    estimated_value = format_financial_value(row.get("estimated_property_value"))
+    annual_rent = format_financial_value(row.get("annual_rental_income"))
+    rental_yield = clean_value(row.get("gross_rental_yield", "N/A"))
+    roi = clean_value(row.get("roi_percentage", "N/A"))
+    monthly_rent = format_financial_value(row.get("estimated_monthly_rent"))
+    metric_status = clean_value(row.get("metric_status", "N/A"))
+    
+    # Don't show section if no meaningful data
+    if not any([estimated_value, annual_rent, rental_yield, roi, monthly_rent]):
+        return ""
+    
+    html = '<div class="property-financials" style="background: #f9f9f9; padding: 20px; border-radius: 5px; margin: 20px 0;">\n'
+    html += '<h3>💰 Investment Metrics</h3>\n'
+    html += '<table style="width:100%; border-collapse: collapse;">\n'
+    
+    if category == "For Rent":
+        html += f'''
+        <tr style="border: 1px solid #ddd;">
+            <td style="padding: 8px; font-weight: bold; width: 40%;">Monthly Rent:</td>
+            <td style="padding: 8px;">{price}</td>
+        </tr>
+        '''
+        if annual_rent:
+            html += f'''
+            <tr style="border: 1px solid #ddd; background-color: #fff;">
+                <td style="padding: 8px; font-weight: bold;">Annual Rental Income:</td>
+                <td style="padding: 8px;">{annual_rent}</td>
+            </tr>
+            '''
+        if estimated_value:
+            html += f'''
+            <tr style="border: 1px solid #ddd;">
+                <td style="padding: 8px; font-weight: bold;">Estimated Property Value:</td>
+                <td style="padding: 8px;">{estimated_value}</td>
+            </tr>
+            '''
+    else:  # For Sale
+        html += f'''
+        <tr style="border: 1px solid #ddd;">
+            <td style="padding: 8px; font-weight: bold; width: 40%;">Asking Price:</td>
+            <td style="padding: 8px;">{price}</td>
+        </tr>
+        '''
+        if monthly_rent:
+            html += f'''
+            <tr style="border: 1px solid #ddd; background-color: #fff;">
+                <td style="padding: 8px; font-weight: bold;">Estimated Monthly Rent:</td>
+                <td style="padding: 8px;">{monthly_rent}</td>
+            </tr>
+            '''
+        if annual_rent:
+            html += f'''
+            <tr style="border: 1px solid #ddd;">
+                <td style="padding: 8px; font-weight: bold;">Estimated Annual Income:</td>
+                <td style="padding: 8px;">{annual_rent}</td>
+            </tr>
+            '''
+    
+    if rental_yield and rental_yield != "N/A":
+        html += f'''
+        <tr style="border: 1px solid #ddd; background-color: #fff;">
+            <td style="padding: 8px; font-weight: bold;">Gross Rental Yield:</td>
+            <td style="padding: 8px; color: #28a745; font-weight: bold;">{rental_yield}</td>
+        </tr>
+        '''
+    
+    if roi and roi != "N/A":
+        html += f'''
+        <tr style="border: 1px solid #ddd;">
+            <td style="padding: 8px; font-weight: bold;">ROI:</td>
+            <td style="padding: 8px; color: #28a745; font-weight: bold;">{roi}</td>
+        </tr>
+        '''
+    
+    if metric_status and metric_status != "N/A":
+        html += f'''
+        <tr style="border: 1px solid #ddd; background-color: #fff;">
+            <td style="padding: 8px; font-weight: bold;">Calculation Method:</td>
+            <td style="padding: 8px; font-size: 0.9em; color: #666;">{metric_status}</td>
+        </tr>
+        '''
+    
+    html += '</table>\n'
+    html += '<p style="margin-top: 15px; font-size: 0.85em; color: #666;"><em>💡 Note: Investment metrics are estimates based on market averages and should be verified independently.</em></p>\n'
+    html += '</div>\n'
+    
+    return html
+
+# -------------------------------
+# POST LISTINGS TO WORDPRESS
+# -------------------------------
+
+
+def build_content_html(row, uploaded_images):
+    """Full post body for a listing; the gallery holds every image after the featured one"""
+    price = clean_value(row.get("price", ""))
+    link = clean_value(row.get("link", ""))
+    source = clean_value(row.get("source", ""))
+    category = clean_value(row.get("category", "Unknown"))
+    description = clean_value(row.get("description", "No description available"))
+    address = clean_value(row.get("address", ""))
+    agent = clean_value(row.get("agent", ""))
+    bedrooms = clean_value(row.get("bedrooms", ""))
+    bathrooms = clean_value(row.get("bathrooms", ""))
+    city = clean_value(row.get("city", ""))
+
+    # Build image gallery HTML (for images after the first one)
+    gallery_html = build_image_gallery_html(uploaded_images)
+
+    # Format description properly
+    formatted_description = format_description_for_display(description)
+    
+    # Build financial metrics HTML
+    financial_html = build_financial_metrics_html(row)
+
+    # Build full content HTML
+    content_html = f"""
+        <div class="property-details">
+            <h3>📋 Property Information</h3>
+            <table style="width:100%; border-collapse: collapse;">
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold; width: 30%;">Price:</td>
+                    <td style="padding: 8px;">{price if price else 'Contact for price'}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
+                    <td style="padding: 8px; font-weight: bold;">Category:</td>
+                    <td style="padding: 8px;"><span style="background: #007bff; color: white; padding: 3px 10px; border-radius: 3px;">{category}</span></td>
+                </tr>
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold;">Location:</td>
+                    <td style="padding: 8px;">{city if city else 'Not specified'}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
+                    <td style="padding: 8px; font-weight: bold;">Address:</td>
+                    <td style="padding: 8px;">{address if address else 'Not available'}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold;">Bedrooms:</td>
+                    <td style="padding: 8px;">{bedrooms if bedrooms else 'Not specified'}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
+                    <td style="padding: 8px; font-weight: bold;">Bathrooms:</td>
+                    <td style="padding: 8px;">{bathrooms if bathrooms else 'Not specified'}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold;">Agent/Publisher:</td>
+                    <td style="padding: 8px;">{agent if agent else 'Not specified'}</td>
+                </tr>
+            </table>
+            
+            {financial_html}
+            
+            {gallery_html}
+            
+            <hr style="margin: 20px 0;">
+            
+            <h3>🏠 Property Description</h3>
+            {formatted_description}
+            
+            <hr style="margin: 20px 0;">
+            
+            <p><strong>🔗 Original Listing:</strong> <a href="{link}" target="_blank" rel="noopener">View on {source.split('//')[1].split('/')[0] if '//' in source else source}</a></p>
+        </div>
+    """
+    return content_html
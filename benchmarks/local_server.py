@@ -0,0 +1,97 @@
+"""
+Local HTTP stand-in for benchmarks.
+
+Serves canned responses over HTTP/1.1 keep-alive from a background thread.
+`connect_delay` is paid once per new TCP connection (a stand-in for the
+TCP+TLS handshake to a real portal); `latency` is paid on every request.
+"""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+        if self.server.connect_delay:
+            time.sleep(self.server.connect_delay)
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        if self.server.latency or self.server.jitter:
+            time.sleep(max(0.0, self.server.latency + random.uniform(-self.server.jitter, self.server.jitter)))
+        self.server.requests += 1
+        status, headers, body = self.server.responder(self)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """
+    Context manager running a ThreadingHTTPServer on 127.0.0.1.
+
+    `responder(handler)` returns (status, headers, body_bytes) for a request;
+    `handler.command`, `handler.path` and `handler.body` describe it.
+    """
+
+    def __init__(self, responder, connect_delay=0.0, latency=0.0, jitter=0.0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.responder = responder
+        self.httpd.connect_delay = connect_delay
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def connections(self):
+        return self.httpd.connections
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def reset_counters(self):
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def static_responder(body, content_type="text/html; charset=utf-8"):
+    """Responder that returns the same body for every path"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    def respond(handler):
+        return 200, {"Content-Type": content_type}, body
+
+    return respond
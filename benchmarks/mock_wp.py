@@ -0,0 +1,175 @@
+"""
+In-memory stand-in for the WordPress REST API used by uploader.py, plus an
+image host serving real JPEGs.
+
+`MockWordPress.respond` is a LocalServer responder handling:
+    GET  /wp-json/wp/v2/property           paged posts (modified_after, orderby=modified, _fields)
+    POST /wp-json/wp/v2/property           create a post (201)
+    POST /wp-json/wp/v2/property/<id>      update a post (200)
+    GET  /wp-json/wp/v2/media?include=...  existing media items
+    POST /wp-json/wp/v2/media              create a media item (201)
+    DELETE /wp-json/wp/v2/media/<id>       delete a media item
+    POST /wp-json/batch/v1                 any of the JSON routes above, batched (207)
+
+`batch=False` makes the batch route 404 like a site without it; `throttle`
+is the probability of answering any request with 429.
+"""
+import json
+import random
+import re
+import threading
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+API = "/wp-json/wp/v2"
+
+
+def jpeg(width=800, height=600, seed=0):
+    """A noisy JPEG of the given size (noise keeps it from compressing to nothing)"""
+    img = Image.effect_noise((width, height), 40 + seed % 20).convert("RGB")
+    buf = BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def image_responder(width=800, height=600, variants=8):
+    """Serve /img/<n>.jpg from a small set of pre-encoded JPEGs"""
+    bodies = [jpeg(width, height, seed) for seed in range(variants)]
+
+    def respond(handler):
+        m = re.search(r"/img/(\d+)", handler.path)
+        if not m:
+            return 404, {}, b""
+        return 200, {"Content-Type": "image/jpeg"}, bodies[int(m.group(1)) % variants]
+
+    return respond
+
+
+class MockWordPress:
+    def __init__(self, batch=True, throttle=0.0, seed=0):
+        self.batch = batch
+        self.throttle = throttle
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.posts = {}
+        self.media = {}
+        self.calls = {}
+        self._next_id = 1
+        self.clock = datetime(2024, 1, 1)
+
+    def _id(self):
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _count(self, key):
+        self.calls[key] = self.calls.get(key, 0) + 1
+
+    def respond(self, handler):
+        parts = urlsplit(handler.path)
+        with self.lock:
+            self._count(handler.command + " " + re.sub(r"/\d+$", "/<id>", parts.path))
+            if self.throttle and self.random.random() < self.throttle:
+                self._count("429")
+                return self._json(429, {"code": "rest_too_many_requests"})
+
+            if parts.path == "/wp-json/batch/v1" and handler.command == "POST" and self.batch:
+                responses = []
+                for sub in json.loads(handler.body)["requests"]:
+                    sub_parts = urlsplit(sub["path"])
+                    status, _, body = self._route(
+                        sub.get("method", "POST"), "/wp-json" + sub_parts.path, sub_parts.query,
+                        json.dumps(sub.get("body", {})).encode("utf-8"),
+                    )
+                    responses.append({"status": status, "headers": {}, "body": json.loads(body)})
+                return self._json(207, {"responses": responses})
+
+            return self._route(handler.command, parts.path, parts.query, handler.body)
+
+    def _route(self, method, path, query_string, body):
+        if path == f"{API}/media" and method == "POST":
+            media_id = self._id()
+            self.media[media_id] = len(body)
+            return self._json(201, {"id": media_id, "source_url": f"http://wp.test/uploads/{media_id}.jpg"})
+
+        if path == f"{API}/media" and method == "GET":
+            include = parse_qs(query_string).get("include", [""])[0]
+            ids = [int(i) for i in include.split(",") if i] or list(self.media)
+            return self._json(200, [{"id": i} for i in ids if i in self.media])
+
+        m = re.fullmatch(rf"{API}/media/(\d+)", path)
+        if m and method == "DELETE":
+            deleted = self.media.pop(int(m.group(1)), None)
+            return self._json(200 if deleted is not None else 404, {"deleted": deleted is not None})
+
+        if path == f"{API}/property" and method == "GET":
+            query = parse_qs(query_string)
+            per_page = int(query.get("per_page", ["10"])[0])
+            page = int(query.get("page", ["1"])[0])
+            posts = list(self.posts.values())
+            if "modified_after" in query:
+                posts = [p for p in posts if p["modified"] > query["modified_after"][0]]
+            if query.get("orderby") == ["modified"]:
+                posts.sort(key=lambda p: (p["modified"], p["id"]))
+            pages = max(1, -(-len(posts) // per_page))
+            posts = posts[(page - 1) * per_page:page * per_page]
+            if not posts and page > 1:
+                return self._json(400, {"code": "rest_post_invalid_page_number"})
+            if "_fields" in query:
+                posts = [self._fields(p, query["_fields"][0].split(",")) for p in posts]
+            return self._json(200, posts, {"X-WP-TotalPages": str(pages)})
+
+        if path == f"{API}/property" and method == "POST":
+            post_id = self._id()
+            self.posts[post_id] = self._post(post_id, json.loads(body))
+            self.posts[post_id]["modified"] = self._tick()
+            return self._json(201, self.posts[post_id])
+
+        m = re.fullmatch(rf"{API}/property/(\d+)", path)
+        if m and method in ("POST", "PUT", "PATCH"):
+            post_id = int(m.group(1))
+            if post_id not in self.posts:
+                return self._json(404, {"code": "rest_post_invalid_id"})
+            self.posts[post_id].update(self._post(post_id, json.loads(body), self.posts[post_id]))
+            self.posts[post_id]["modified"] = self._tick()
+            return self._json(200, self.posts[post_id])
+
+        return self._json(404, {"code": "rest_no_route"})
+
+    def _tick(self):
+        self.clock += timedelta(seconds=1)
+        return self.clock.isoformat()
+
+    @staticmethod
+    def _fields(post, fields):
+        out = {}
+        for field in fields:
+            top, _, sub = field.partition(".")
+            if top not in post:
+                continue
+            if sub:
+                if isinstance(post[top], dict) and sub in post[top]:
+                    out.setdefault(top, {})[sub] = post[top][sub]
+            else:
+                out[top] = post[top]
+        return out
+
+    @staticmethod
+    def _post(post_id, data, current=None):
+        post = dict(current or {"id": post_id, "acf": {}})
+        if "title" in data:
+            post["title"] = {"rendered": data["title"]}
+        if "content" in data:
+            post["content"] = {"rendered": data["content"]}
+        for key in ("status", "featured_media"):
+            if key in data:
+                post[key] = data[key]
+        if "acf" in data:
+            post["acf"] = dict(post.get("acf") or {}, **data["acf"])
+        return post
+
+    @staticmethod
+    def _json(status, payload, headers=None):
+        return status, dict({"Content-Type": "application/json"}, **(headers or {})), json.dumps(payload).encode("utf-8")
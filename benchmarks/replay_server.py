@@ -0,0 +1,116 @@
+"""
+Serves a replay archive (replay_archive.py) back to the scraper offline.
+
+Every recorded host gets its own LocalServer, so per-host connection pools
+and per-domain limits behave as they did against the real portals.
+ReplayAdapter, mounted on http_session's session, sends each request to its
+host's server instead of the internet; hosts that were never recorded get a
+404 without any network access. Latency and jitter are per request, or
+`recorded_latency` replays each response's recorded time.
+"""
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_session
+from local_server import LocalServer
+from replay_archive import split_url
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that sends requests for recorded hosts to their local servers"""
+
+    def __init__(self, hosts, **kwargs):
+        self.hosts = hosts
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        base = self.hosts.get(parts.netloc.lower())
+        if base is None:
+            resp = requests.Response()
+            resp.status_code, resp.url, resp.request = 404, request.url, request
+            resp._content = b""
+            return resp
+        local = request.copy()
+        local.url = base + request.path_url.lstrip("/")
+        resp = super().send(local, **kwargs)
+        resp.url, resp.request = request.url, request  # Relative links and redirects resolve against the portal
+        return resp
+
+
+class ReplayServers:
+    """
+    Context manager serving an archive: `hosts` maps each recorded host to
+    its server's base URL, `install()` routes http_session through them.
+    """
+
+    def __init__(self, archive, latency=0.0, jitter=0.0, connect_delay=0.0, recorded_latency=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.connect_delay = connect_delay
+        self.recorded_latency = recorded_latency
+        self.hosts = {}
+        self.servers = []
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Bodies are decompressed up front so serving costs the client's CPU as little as possible
+        self._pages = {}
+        for response in archive.responses():
+            self._pages.setdefault(response["host"], {})[response["target"]] = response
+
+    def _responder(self, host):
+        pages = self._pages[host]
+
+        def respond(handler):
+            page = pages.get(split_url(handler.path)[1])
+            if page is None:
+                with self._lock:
+                    self.misses += 1
+                return 404, {"Content-Type": "text/plain"}, b"not recorded"
+            if self.recorded_latency and page["elapsed"]:
+                time.sleep(page["elapsed"])
+            return page["status"], {"Content-Type": page["content_type"]}, page["body"]
+
+        return respond
+
+    def __enter__(self):
+        for host in self._pages:
+            server = LocalServer(self._responder(host), self.connect_delay, self.latency, self.jitter).__enter__()
+            self.servers.append(server)
+            self.hosts[host] = server.base_url
+        return self
+
+    def __exit__(self, *exc):
+        for server in self.servers:
+            server.__exit__(*exc)
+
+    @property
+    def requests(self):
+        return sum(server.requests for server in self.servers)
+
+    def reset_counters(self):
+        self.misses = 0
+        for server in self.servers:
+            server.reset_counters()
+
+
+def install(hosts, session=None):
+    """Mount a ReplayAdapter for `hosts` on the shared session (after http_session.configure)"""
+    session = session or http_session.get_session()
+    adapter = ReplayAdapter(
+        hosts,
+        pool_connections=http_session.POOL_CONNECTIONS,
+        pool_maxsize=http_session.POOL_MAXSIZE,
+        pool_block=http_session.POOL_BLOCK,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,172 @@
+import os
+import time
+
+import pandas as pd
+import streamlit as st
+
+import output_sink
+import scrape_worker
+
+# Dashboard over the last scrape. Results are loaded once per finished run
+# (cached on the run summary's mtime), so widgets and filters never re-fetch.
+# A scrape can be started from the sidebar: it runs on a background worker
+# shared by every session, and its progress streams into the page. Headless
+# runs from the CLI are picked up as soon as they finish:
+#     python scraper.py once            (or: python scraper.py every 60)
+#     streamlit run dashboard.py
+
+# ------------------------------- SETTINGS -------------------------------
+PROGRESS_REFRESH = "2s"  # How often the live progress panel polls the worker
+PROGRESS_SITES_SHOWN = 10
+
+# ------------------------------- DATA -------------------------------
+@st.cache_resource
+def get_worker():
+    return scrape_worker.ScrapeWorker()
+
+def results_version():
+    """mtime of the run summary; changes whenever a run (dashboard or CLI) finishes"""
+    try:
+        return os.path.getmtime(output_sink.summary_path())
+    except OSError:
+        return None
+
+@st.cache_data(max_entries=2, show_spinner="Loading listings…")
+def load_listings(fmt, version):
+    """Every saved listing; `version` is only part of the cache key, so a new run invalidates it"""
+    return output_sink.read_view("all", fmt)
+
+def filter_listings(df, view, cities, query):
+    """The sale/rent views and the filters are masks over the cached frame"""
+    category = output_sink.VIEWS[view]
+    mask = pd.Series(True, index=df.index)
+    if category:
+        mask &= df["category"] == category
+    if cities:
+        mask &= df["city"].isin(cities)
+    if query:
+        mask &= (df["title"].str.contains(query, case=False, regex=False, na=False)
+                 | df["address"].str.contains(query, case=False, regex=False, na=False))
+    return df[mask]
+
+# ------------------------------- PAGE -------------------------------
+st.set_page_config(page_title="UK Property Dashboard (Enhanced Descriptions)", layout="wide", page_icon="🏠")
+st.title("🏠 UK Property Dashboard — v12 (Enhanced Descriptions & Multiple Images)")
+st.caption("Comprehensive descriptions formatted as paragraphs + up to 5 high-quality images per property")
+
+worker = get_worker()
+
+# ------------------------------- SIDEBAR -------------------------------
+with st.sidebar:
+    st.header("🔄 Scrape")
+    engine = st.radio("Engine", ["threaded", "async"], horizontal=True)
+    output_format = st.radio("Output", output_sink.formats(), horizontal=True)
+    details = st.slider("Detail pages per site", 0, 60, 30)
+    images = st.slider("Images per property", 1, 10, 5)
+    http_cache = st.checkbox("HTTP cache", value=True)
+    incremental = st.checkbox("Skip unchanged listings", value=True)
+    rate_limiting = st.checkbox("Per-site rate limits", value=True)
+    structured = st.checkbox("Read embedded listing data first", value=True)
+    if st.button("🚀 Scrape now", disabled=worker.running, use_container_width=True):
+        worker.start(
+            settings={
+                "DESC_AND_IMAGE_FETCH_LIMIT": details,
+                "MAX_IMAGES_PER_PROPERTY": images,
+                "HTTP_CACHE_ENABLED": http_cache,
+                "INCREMENTAL_SCRAPING": incremental,
+                "RATE_LIMITING": rate_limiting,
+                "STRUCTURED_DATA": structured,
+            },
+            engine=engine,
+            output_format=output_format,
+        )
+
+    st.header("🔎 Filter")
+    view = st.radio("Listings", list(output_sink.VIEWS), format_func={"all": "All", "sale": "For Sale", "rent": "For Rent"}.get, horizontal=True)
+    query = st.text_input("Search title or address")
+
+# ------------------------------- PROGRESS -------------------------------
+@st.fragment(run_every=PROGRESS_REFRESH)
+def live_progress():
+    """Polls the worker; only this panel reruns while a scrape is in flight"""
+    if worker.started is None:
+        return
+    if not worker.running:
+        # Rerun the whole page once per finished run so the cached results reload
+        if st.session_state.get("seen_run") != worker.finished:
+            st.session_state["seen_run"] = worker.finished
+            st.rerun()
+        if worker.error:
+            st.error(f"❌ Last scrape failed: {worker.error}")
+        return
+
+    events, rows = worker.snapshot()
+    elapsed = time.time() - worker.started
+    st.progress(len(events) / max(worker.total, 1), text=f"⏳ {len(events)}/{worker.total} sites — {len(rows)} listings so far ({elapsed:.0f}s)")
+    for event in reversed(events[-PROGRESS_SITES_SHOWN:]):
+        if event["error"]:
+            st.write(f"❌ {event['site']} — error: {event['error']}")
+        elif event["listings"]:
+            st.write(f"✅ {event['site']} — {event['listings']} listings")
+        else:
+            st.write(f"⚠ {event['site']} — no listings found")
+    if len(rows):
+        st.subheader("📥 Scraped so far")
+        st.dataframe(filter_listings(rows, view, [], query), use_container_width=True)
+
+live_progress()
+
+# ------------------------------- LAST RUN -------------------------------
+summary = output_sink.load_run_summary()
+if summary is None:
+    st.info("No property data retrieved yet. Press 🚀 Scrape now, or run `python scraper.py once`.")
+    st.stop()
+
+finished = time.strftime("%Y-%m-%d %H:%M", time.localtime(summary["finished"]))
+st.caption(f"🕒 Last run finished {finished} — {summary['engine']} engine, {summary['finished'] - summary['started']:.0f}s")
+
+sites = pd.DataFrame.from_dict(summary["sites"], orient="index")
+failed = sites[sites["error"].notna()]
+empty = sites[sites["error"].isna() & (sites["listings"] == 0)]
+st.success(f"✅ {len(sites) - len(failed) - len(empty)} sites returned listings")
+for site, row in failed.iterrows():
+    st.error(f"❌ {site} — error: {row['error']}")
+if len(empty):
+    st.warning(f"⚠ No listings found: {', '.join(empty.index)}")
+
+if summary.get("http_cache"):
+    st.caption(f"🗄 HTTP cache: {summary['http_cache']}")
+
+if summary.get("rate_limiter"):
+    st.caption(f"🚦 Rate limiter: {summary['rate_limiter']}")
+    tripped = [domain for domain, limits in summary["rate_limits"].items() if limits["trips"]]
+    if tripped:
+        st.warning(f"🔌 Detail fetches stopped after repeated failures: {', '.join(tripped)}")
+
+if summary.get("structured_data"):
+    st.caption(f"🧩 Structured data: {summary['structured_data']}")
+if summary.get("structured_hits"):  # Empty when no page was parsed
+    with st.expander("Embedded-data hit rate per site"):
+        hits = pd.DataFrame.from_dict(summary["structured_hits"], orient="index").fillna(0)
+        st.dataframe(hits.sort_values("hit_rate", ascending=False), use_container_width=True)
+
+if summary.get("changes"):
+    st.subheader("♻ Changes since last run")
+    st.dataframe(pd.DataFrame.from_dict(summary["changes"], orient="index"), use_container_width=True)
+
+# ------------------------------- LISTINGS -------------------------------
+stats = summary["stats"]
+if stats["listings"]:
+    with_images = stats["with_images"]
+    avg_images = stats["images"] / with_images if with_images > 0 else 0
+    st.info(f"📊 Stats: {with_images}/{stats['listings']} properties have images | {stats['images']} total images | {avg_images:.1f} avg per property")
+
+    listings = load_listings(summary["format"], results_version())
+    cities = st.multiselect("City", sorted(listings["city"].dropna().unique()))
+    shown = filter_listings(listings, view, cities, query)
+    st.subheader({"all": "📋 All Listings", "sale": "🏠 For Sale Listings", "rent": "🏡 For Rent Listings"}[view] + f" ({len(shown)})")
+    st.dataframe(shown, use_container_width=True)
+
+    st.success(f"💾 Saved {summary['format'].upper()} ({', '.join(summary['paths'])}) with comprehensive descriptions and multiple images per property (pipe-separated)!")
+else:
+    st.info("No property data retrieved yet.")
@@ -0,0 +1,95 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+# ------------------------------- SETTINGS -------------------------------
+POOL_SIZE = 2            # Warm Chrome instances shared by all dynamic sites
+MAX_PAGES_PER_DRIVER = 20  # Recycle a driver after this many leases
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def chromedriver_path():
+    """Resolve chromedriver through webdriver-manager once per process"""
+    global _driver_path
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+# ------------------------------- POOL -------------------------------
+class DriverPool:
+    """
+    Bounded pool of warm WebDriver instances.
+
+    Drivers are created lazily by `factory()` up to `size`, leased one URL at a
+    time, and quit/replaced after `max_pages` leases or when a lease raises a
+    WebDriverException (crashed or wedged browser).
+    """
+
+    def __init__(self, factory, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._uses = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _acquire_driver(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            driver = self.factory()
+            with self._lock:
+                self._uses[id(driver)] = 0
+            return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _release(self, driver):
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            worn_out = self._uses[id(driver)] >= self.max_pages
+        if worn_out:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def lease(self):
+        """Borrow a driver for one page; blocks while all `size` drivers are busy"""
+        self._slots.acquire()
+        driver = None
+        try:
+            driver = self._acquire_driver()
+            yield driver
+        except WebDriverException:
+            if driver is not None:
+                self._discard(driver)
+                driver = None
+            raise
+        finally:
+            if driver is not None:
+                self._release(driver)
+            self._slots.release()
+
+    def close(self):
+        """Quit idle drivers; the pool stays usable and relaunches on demand"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
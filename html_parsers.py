@@ -0,0 +1,46 @@
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from requests.compat import chardet
+
+# ------------------------------- SETTINGS -------------------------------
+DEFAULT_BACKEND = "lxml"      # Fast C tree builder when installed
+FALLBACK_BACKEND = "html.parser"  # Pure-Python builder, always available
+
+_resolved = {}
+
+# ------------------------------- BACKENDS -------------------------------
+def available_backends():
+    """BeautifulSoup tree builders installed in this environment"""
+    return [name for name in ("lxml", "html5lib", "html.parser") if builder_registry.lookup(name)]
+
+def resolve_backend(name=None):
+    """
+    Map a configured backend name to one that is installed, falling back to
+    html.parser (once per name, with a notice) when its library is missing.
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in _resolved:
+        if builder_registry.lookup(name):
+            _resolved[name] = name
+        else:
+            print(f"⚠ HTML parser '{name}' not installed, using {FALLBACK_BACKEND}")
+            _resolved[name] = FALLBACK_BACKEND
+    return _resolved[name]
+
+def make_soup(markup, backend=None):
+    """Parse markup with the configured backend"""
+    return BeautifulSoup(markup, resolve_backend(backend))
+
+def decode_body(content, encoding=None):
+    """
+    Decode a response body the way requests' Response.text does (header
+    charset, else detected), so it can happen off the fetching thread.
+    """
+    if not content:
+        return ""
+    if not encoding:
+        encoding = chardet.detect(content)["encoding"]
+    try:
+        return str(content, encoding, errors="replace")
+    except (LookupError, TypeError):
+        return str(content, errors="replace")
@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+# ------------------------------- SETTINGS -------------------------------
+CACHE_PATH = ".http_cache.sqlite3"
+CACHE_TTL = 7 * 24 * 3600          # Drop entries not revalidated for a week
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Evict least recently validated entries above this
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    encoding TEXT,
+    body BLOB,
+    record_key TEXT,
+    record TEXT,
+    size INTEGER NOT NULL,
+    validated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_validated_at ON entries (validated_at);
+"""
+
+# ------------------------------- CACHE -------------------------------
+class HttpCache:
+    """
+    On-disk conditional-GET cache (SQLite, one row per URL).
+
+    Stores the compressed body with its ETag/Last-Modified, plus the record
+    extracted from it so a 304 can skip parsing. Entries older than `ttl`
+    since their last validation are dropped; above `max_bytes` the least
+    recently validated entries are evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.execute("DELETE FROM entries WHERE validated_at < ?", (time.time() - ttl,))
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.stats = {"hits": 0, "misses": 0, "changed": 0, "uncacheable": 0, "evicted": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, url):
+        """Cached entry for `url` as a dict, or None (expired entries are dropped)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, encoding, body, record_key, record, validated_at FROM entries WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row and row[6] < time.time() - self.ttl:
+                self._delete(url)
+                row = None
+        if not row:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "encoding": row[2],
+            "body": row[3],
+            "record_key": row[4],
+            "record": row[5],
+        }
+
+    def body(self, entry):
+        return zlib.decompress(entry["body"]) if entry["body"] else b""
+
+    def record(self, entry, record_key):
+        """The stored extracted record if it was built with the same settings"""
+        if entry["record"] is None or entry["record_key"] != record_key:
+            return None
+        return json.loads(entry["record"])
+
+    def revalidated(self, url):
+        """Server answered 304: the entry is current again"""
+        self._count("hits")
+        with self._lock:
+            self._db.execute("UPDATE entries SET validated_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def store(self, url, resp, revalidating=False):
+        """Keep a 200 response if it carries a validator; returns True if stored"""
+        self._count("changed" if revalidating else "misses")
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified) or "no-store" in resp.headers.get("Cache-Control", ""):
+            self._count("uncacheable")
+            return False
+
+        body = zlib.compress(resp.content)
+        with self._lock:
+            self._delete(url)
+            self._db.execute(
+                "INSERT INTO entries (url, etag, last_modified, encoding, body, size, validated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, resp.encoding, body, len(body), time.time()),
+            )
+            self._total += len(body)
+            self._evict()
+            self._db.commit()
+        return True
+
+    def store_record(self, url, record_key, record):
+        data = json.dumps(record)
+        with self._lock:
+            updated = self._db.execute(
+                "UPDATE entries SET record_key = ?, record = ?, size = size + ? WHERE url = ?",
+                (record_key, data, len(data), url),
+            ).rowcount
+            if updated:
+                self._total += len(data)
+            self._db.commit()
+
+    def _delete(self, url):
+        row = self._db.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._total -= row[0]
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT url, size FROM entries ORDER BY validated_at").fetchall()
+        for url, size in rows:
+            if self._total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._total -= size
+            self.stats["evicted"] += 1
+
+    def summary(self):
+        s = self.stats
+        lookups = s["hits"] + s["misses"] + s["changed"]
+        rate = s["hits"] / lookups * 100 if lookups else 0
+        return (
+            f"{s['hits']} hits (304) / {s['misses']} misses / {s['changed']} changed "
+            f"({rate:.0f}% hit rate), {s['uncacheable']} uncacheable, {s['evicted']} evicted, "
+            f"{self._total / (1024 * 1024):.1f} MB on disk"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since for a cached entry"""
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
@@ -0,0 +1,61 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# ------------------------------- SETTINGS -------------------------------
+POOL_CONNECTIONS = 10  # Host pools kept warm at once (one per concurrent site)
+POOL_MAXSIZE = 8       # Keep-alive sockets per host (matches the detail executor)
+POOL_BLOCK = True      # Wait for a free socket instead of opening extra ones per host
+
+_session = None
+_lock = threading.Lock()
+
+# ------------------------------- SESSION -------------------------------
+def _build_session(pool_connections, pool_maxsize, headers=None):
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=POOL_BLOCK,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+def configure(pool_connections=None, pool_maxsize=None, headers=None):
+    """
+    (Re)build the shared session. Call before a run so pool sizes follow the
+    number of concurrent sites and detail workers.
+    """
+    global _session, POOL_CONNECTIONS, POOL_MAXSIZE
+    with _lock:
+        if pool_connections:
+            POOL_CONNECTIONS = pool_connections
+        if pool_maxsize:
+            POOL_MAXSIZE = pool_maxsize
+        if _session is not None:
+            _session.close()
+        _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE, headers)
+    return _session
+
+def get_session():
+    """Return the shared keep-alive session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE)
+    return _session
+
+def fetch(url, **kwargs):
+    """GET through the pooled session (drop-in for requests.get)"""
+    return get_session().get(url, **kwargs)
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,91 @@
+import struct
+
+# ------------------------------- SETTINGS -------------------------------
+PROBE_BYTES = 64 * 1024  # Give up on header parsing after this much (JPEG EXIF can push SOF far in)
+CHUNK_SIZE = 16 * 1024
+
+# SOF markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) share the range but don't
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+class ImageTooLarge(Exception):
+    pass
+
+# ------------------------------- HEADER PARSING -------------------------------
+def _jpeg(data):
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+        elif marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+        elif marker in _JPEG_SOF:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        else:
+            i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+def _png(data):
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+def _webp(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        b0, b1, b2, b3 = data[21:25]
+        return 1 + (((b1 & 0x3F) << 8) | b0), 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+    if chunk == b"VP8X" and len(data) >= 30:
+        return 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+    return None
+
+def _gif(data):
+    return struct.unpack("<HH", data[6:10]) if len(data) >= 10 else None
+
+def dimensions(data):
+    """
+    (width, height) from the first bytes of a JPEG, PNG, WebP or GIF, or None
+    if the header isn't complete yet (or the format isn't one of these).
+    """
+    if data[:2] == b"\xff\xd8":
+        return _jpeg(data)
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return _png(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _webp(data)
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return _gif(data)
+    return None
+
+# ------------------------------- STREAMING -------------------------------
+def read_head(response, probe_bytes=PROBE_BYTES):
+    """
+    Read a streamed response just far enough to learn the image size.
+    Returns (chunks read so far, (width, height) or None, the chunk iterator).
+    """
+    chunks, head = [], b""
+    stream = response.iter_content(CHUNK_SIZE)
+    for chunk in stream:
+        chunks.append(chunk)
+        head += chunk
+        size = dimensions(head)
+        if size or len(head) >= probe_bytes:
+            return chunks, size, stream
+    return chunks, None, stream
+
+def read_rest(chunks, stream, max_bytes):
+    """Finish a download started by read_head; the body is joined once, at the end"""
+    total = sum(len(c) for c in chunks)
+    for chunk in stream:
+        total += len(chunk)
+        if total > max_bytes:
+            raise ImageTooLarge(f"more than {max_bytes / (1024 * 1024):.0f} MB")
+        chunks.append(chunk)
+    return b"".join(chunks)
@@ -0,0 +1,102 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# ------------------------------- SETTINGS -------------------------------
+TRANSFORM_WORKERS = 0  # Transform processes; 0 transforms on the calling thread
+
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+_pool = None
+_lock = threading.Lock()
+stats = {"images": 0, "kept": 0, "bytes_in": 0, "bytes_out": 0}
+
+# ------------------------------- TRANSFORM -------------------------------
+def transform(content, max_width, max_height, fmt="webp", quality=80):
+    """
+    Downsize to fit max_width x max_height and re-encode as WebP or JPEG at
+    `quality`. EXIF orientation is applied first; EXIF/XMP metadata is not
+    carried over. Returns (bytes, mime type).
+    """
+    pil_format, mime = FORMATS[fmt]
+    img = Image.open(BytesIO(content))
+    img.draft("RGB", (max_width, max_height))  # JPEG: decode at the smallest scale still >= target
+    icc_profile = img.info.get("icc_profile")
+    img = ImageOps.exif_transpose(img)
+
+    if pil_format == "JPEG" or img.mode not in ("RGB", "RGBA"):
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            img = img.convert("RGBA")
+            if pil_format == "JPEG":
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+        else:
+            img = img.convert("RGB")
+
+    img.thumbnail((max_width, max_height), Image.LANCZOS)
+
+    out = BytesIO()
+    options = {"quality": quality}
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    if pil_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    else:
+        options["method"] = 4
+    img.save(out, pil_format, **options)
+    return out.getvalue(), mime
+
+# ------------------------------- POOL -------------------------------
+def configure(workers):
+    """(Re)start the pool with `workers` processes (0 disables it); spawned, as in parse_pool"""
+    global _pool, TRANSFORM_WORKERS
+    with _lock:
+        if workers == TRANSFORM_WORKERS and (_pool is not None) == bool(workers):
+            return
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+        TRANSFORM_WORKERS = workers
+        if workers:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def enabled():
+    return _pool is not None
+
+def shrink(content, mime, max_width, max_height, fmt="webp", quality=80):
+    """
+    Transform in the pool (or inline) and keep whichever of the original and
+    the result is smaller. Returns (bytes, mime type).
+    """
+    if _pool is not None:
+        data, new_mime = _pool.submit(transform, content, max_width, max_height, fmt, quality).result()
+    else:
+        data, new_mime = transform(content, max_width, max_height, fmt, quality)
+
+    kept = len(data) >= len(content)
+    with _lock:
+        stats["images"] += 1
+        stats["kept"] += kept
+        stats["bytes_in"] += len(content)
+        stats["bytes_out"] += len(content) if kept else len(data)
+    return (content, mime) if kept else (data, new_mime)
+
+def reset_stats():
+    with _lock:
+        stats.update(images=0, kept=0, bytes_in=0, bytes_out=0)
+
+def summary():
+    saved = stats["bytes_in"] - stats["bytes_out"]
+    pct = saved / stats["bytes_in"] * 100 if stats["bytes_in"] else 0
+    return (
+        f"{stats['images']} images, {stats['bytes_in'] / (1024 * 1024):.1f} MB -> "
+        f"{stats['bytes_out'] / (1024 * 1024):.1f} MB (saved {saved / (1024 * 1024):.1f} MB, {pct:.0f}%), "
+        f"{stats['kept']} kept as original"
+    )
+
+def shutdown():
+    configure(0)
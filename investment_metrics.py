@@ -0,0 +1,139 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------- SETTINGS -------------------------------
+# Gross rental yield (% of property value earned as rent per year) by city
+CITY_YIELDS = {
+    "London": 4.5, "Kew": 3.9, "Windsor": 4.2, "Surrey": 4.0, "Oxford": 4.4,
+    "Cambridge": 4.6, "Sussex": 4.6, "Bath": 4.8, "Kent": 4.9, "Brighton": 5.0,
+    "Essex": 5.0, "Bristol": 5.2, "Canterbury": 5.2, "York": 5.4, "Edinburgh": 5.5,
+    "Birmingham": 6.3, "Leeds": 6.4, "Manchester": 6.5, "Sheffield": 6.6,
+    "Glasgow": 6.9, "Newcastle": 7.0, "Liverpool": 7.2,
+}
+DEFAULT_YIELD = 6.0  # Cities not in CITY_YIELDS (or unknown)
+
+# Percentage points added to the city yield by bedroom count; larger homes use the largest key
+BEDROOM_YIELD_ADJUSTMENTS = {0: 0.5, 1: 0.5, 2: 0.0, 3: 0.0, 4: -0.25, 5: -0.5}
+
+MAX_MONTHLY_RENT = 25000  # A "For Rent" price above this without pcm/pw is an asking price
+
+ANNUAL_COSTS_PERCENT = 0.0  # Share of rent lost to fees, upkeep and voids; 0 makes ROI the gross yield
+
+# Frequency words after a price, as price_frequency values
+FREQUENCIES = {
+    "pcm": "pcm", "p/m": "pcm", "per month": "pcm", "a month": "pcm",
+    "pw": "pw", "p/w": "pw", "per week": "pw", "a week": "pw",
+    "pa": "pa", "p/a": "pa", "per annum": "pa", "a year": "pa",
+}
+PAYMENTS_PER_MONTH = {"pcm": 1.0, "pw": 52 / 12, "pa": 1 / 12}
+
+PRICE_PATTERN = re.compile(
+    r"£\s?(\d[\d,]*(?:\.\d+)?)(?:\s*(" + "|".join(re.escape(word) for word in FREQUENCIES) + r")\b)?",
+    re.IGNORECASE,
+)
+
+METRIC_COLUMNS = [
+    "price_numeric", "price_frequency", "estimated_property_value", "annual_rental_income",
+    "gross_rental_yield", "roi_percentage", "metric_status", "estimated_monthly_rent",
+]
+
+# ------------------------------- LOOKUPS -------------------------------
+def parse_price(text):
+    """(amount, frequency) from a price string like "£1,250 pcm"; frequency is None without one"""
+    match = PRICE_PATTERN.search(text) if isinstance(text, str) else None
+    if not match:
+        return np.nan, None
+    frequency = match.group(2)
+    return float(match.group(1).replace(",", "")), FREQUENCIES[frequency.lower()] if frequency else None
+
+def bedroom_adjustment(bedrooms):
+    """BEDROOM_YIELD_ADJUSTMENTS entry for a bedroom count (0 when unknown)"""
+    if not BEDROOM_YIELD_ADJUSTMENTS or np.isnan(bedrooms):
+        return 0.0
+    return BEDROOM_YIELD_ADJUSTMENTS.get(min(int(bedrooms), max(BEDROOM_YIELD_ADJUSTMENTS)), 0.0)
+
+def _by_value(values, lookup):
+    """
+    Apply `lookup` to each distinct value of a column and broadcast the
+    results back: scraped columns repeat heavily (cities, bedroom counts,
+    round asking prices), so the Python work is per distinct value.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    results = [lookup(value) for value in uniques]
+    return codes, results
+
+def _column(values, n):
+    return pd.Series(values) if values is not None else pd.Series(["N/A"] * n)
+
+def _percent_strings(values):
+    """"4.80%" strings for a float array ("N/A" for NaN), formatting each distinct value once"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return np.array([f"{v:.2f}%" if not np.isnan(v) else "N/A" for v in uniques], dtype=object)[codes]
+
+# ------------------------------- METRICS -------------------------------
+def compute_metrics(df):
+    """
+    Investment metrics for every listing in `df` (price, category, city and
+    bedrooms columns), as a DataFrame of METRIC_COLUMNS on the same index.
+
+    Sale prices are the property value; rent is estimated from the city's
+    gross yield (CITY_YIELDS, adjusted by BEDROOM_YIELD_ADJUSTMENTS). Rents
+    (a pcm/pw/pa price, or a plausible "For Rent" one) are normalised to monthly
+    and the value is estimated from the same yield. Numbers are NaN and
+    text "N/A" where no price could be parsed.
+    """
+    n = len(df)
+    price = _column(df.get("price"), n)
+    for_rent = (_column(df.get("category"), n) == "For Rent").to_numpy(dtype=bool)
+    city = _column(df.get("city"), n)
+    bedrooms = _column(df.get("bedrooms"), n)
+
+    # Prices: parse each distinct string once
+    codes, parsed = _by_value(price, parse_price)
+    amounts = np.array([amount for amount, _ in parsed], dtype=float)[codes]
+    stated = np.array([frequency or "" for _, frequency in parsed], dtype=object)[codes]
+    stated_payments = np.array([PAYMENTS_PER_MONTH.get(frequency, np.nan) for _, frequency in parsed])[codes]
+    # Without a stated frequency a plausible "For Rent" price is pcm, anything else a sale
+    rent_listing = (stated == "") & for_rent & ~(amounts > MAX_MONTHLY_RENT)
+    frequency = np.where(stated != "", stated, np.where(rent_listing, "pcm", "sale")).astype(object)
+    payments = np.where(rent_listing, 1.0, stated_payments)
+    amounts[amounts <= 0] = np.nan
+    has_price = ~np.isnan(amounts)
+
+    # Yield per city, adjusted per bedroom count
+    city_codes, city_rows = _by_value(city, lambda c: (c, CITY_YIELDS.get(c)) if isinstance(c, str) and c.strip() else ("N/A", None))
+    base_yield = np.array([DEFAULT_YIELD if y is None else y for _, y in city_rows], dtype=float)[city_codes]
+    bed_codes, bed_adjust = _by_value(bedrooms, lambda b: bedroom_adjustment(pd.to_numeric(b, errors="coerce")))
+    gross_yield = base_yield + np.array(bed_adjust, dtype=float)[bed_codes]
+    rate = gross_yield / 100
+
+    # Rent listings: value from rent; sale listings: rent from value
+    is_rent = ~np.isnan(payments)
+    monthly_rent = np.where(is_rent, amounts * payments, amounts * rate / 12)
+    annual_rent = monthly_rent * 12
+    value = np.where(is_rent, annual_rent / rate, amounts)
+    roi = annual_rent * (1 - ANNUAL_COSTS_PERCENT / 100) / value * 100
+
+    statuses = np.array([
+        f"City-based ({name})" if y is not None else f"Default yield ({name})" for name, y in city_rows
+    ], dtype=object)[city_codes]
+    statuses[~has_price] = "N/A"
+    frequency[~has_price] = "N/A"
+    gross_yield[~has_price] = np.nan
+
+    return pd.DataFrame({
+        "price_numeric": amounts,
+        "price_frequency": frequency,
+        "estimated_property_value": np.round(value, 2),
+        "annual_rental_income": np.round(annual_rent, 2),
+        "gross_rental_yield": _percent_strings(gross_yield),
+        "roi_percentage": _percent_strings(np.round(roi, 2)),
+        "metric_status": statuses,
+        "estimated_monthly_rent": np.round(monthly_rent, 2),
+    }, index=df.index)
+
+def add_metrics(df):
+    """`df` with the METRIC_COLUMNS filled in (replacing any already there)"""
+    return df.assign(**compute_metrics(df))
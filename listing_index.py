@@ -0,0 +1,118 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ------------------------------- SETTINGS -------------------------------
+INDEX_PATH = ".listing_index.sqlite3"
+
+TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "gclid", "fbclid", "ref"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    link TEXT PRIMARY KEY,
+    site TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    details TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS listings_site ON listings (site);
+"""
+
+# ------------------------------- KEYS -------------------------------
+def normalize_link(link):
+    """Canonical form of a listing URL: lowercase host, no fragment, tracking params or trailing slash"""
+    parts = urlsplit(link.strip())
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if k.lower() not in TRACKING_PARAMS))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+def fingerprint(card_text, price):
+    """Content hash of a search card (whitespace-insensitive) and its price"""
+    text = re.sub(r"\s+", " ", card_text).strip().lower()
+    return hashlib.sha1(f"{price}\x00{text}".encode("utf-8")).hexdigest()
+
+# ------------------------------- INDEX -------------------------------
+class ListingIndex:
+    """
+    Persistent per-listing memory across runs (SQLite, keyed by normalised
+    link): the last search-card fingerprint and the detail record fetched
+    for it, so unchanged listings can skip their detail fetch.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self.site_counts = {}
+
+    def diff(self, site, listings):
+        """
+        Classify this run's listings for `site` against the index.
+
+        Returns ({normalised link: "new" | "changed" | "unchanged"}, {link: stored details})
+        where stored details are only given for unchanged listings (a listing whose
+        last detail fetch failed counts as changed). Listings the index holds for
+        `site` that are no longer on the search page are removed, unless
+        `listings` is empty: a failed search page must not wipe the site.
+        """
+        links = list({normalize_link(item["link"]) for item in listings})
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT link, site, fingerprint, details FROM listings WHERE site = ? OR link IN ({','.join('?' * len(links))})",
+                [site] + links,
+            ).fetchall()
+        known = {link: (fp, details) for link, _, fp, details in rows}
+        on_site = [link for link, row_site, _, _ in rows if row_site == site]
+
+        statuses, stored = {}, {}
+        for item in listings:
+            link = normalize_link(item["link"])
+            if link in statuses:
+                continue
+            previous = known.get(link)
+            if previous is None:
+                statuses[link] = "new"
+            elif previous[0] != item["fingerprint"] or previous[1] is None:
+                statuses[link] = "changed"
+            else:
+                statuses[link] = "unchanged"
+                stored[link] = json.loads(previous[1])
+
+        removed = [link for link in on_site if link not in statuses] if statuses else []
+        now = time.time()
+        with self._lock:
+            self._db.executemany("DELETE FROM listings WHERE link = ?", [(link,) for link in removed])
+            self._db.executemany(
+                "UPDATE listings SET last_seen = ? WHERE link = ?",
+                [(now, link) for link in stored],
+            )
+            self._db.commit()
+
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "removed": len(removed)}
+        for status in statuses.values():
+            counts[status] += 1
+        self.site_counts[site] = counts
+        return statuses, stored
+
+    def record(self, site, item, details):
+        """Remember the card fingerprint and fetched details for a listing (None when the fetch failed)"""
+        link = normalize_link(item["link"])
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO listings (link, site, fingerprint, details, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(link) DO UPDATE SET site = excluded.site, fingerprint = excluded.fingerprint, "
+                "details = excluded.details, last_seen = excluded.last_seen",
+                (link, site, item["fingerprint"], None if details is None else json.dumps(details), now, now),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
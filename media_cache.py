@@ -0,0 +1,150 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image
+
+# ------------------------------- SETTINGS -------------------------------
+CACHE_PATH = ".media_cache.sqlite3"
+PHASH_MAX_DISTANCE = 4  # Differing bits (of 64) for two images to count as the same photo (-1 = exact bytes only)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    media_id INTEGER PRIMARY KEY,
+    media_url TEXT NOT NULL,
+    sha256 TEXT,
+    phash INTEGER,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    url TEXT PRIMARY KEY,
+    media_id INTEGER NOT NULL REFERENCES media (media_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS media_sha256 ON media (sha256);
+CREATE INDEX IF NOT EXISTS sources_media ON sources (media_id);
+"""
+
+# ------------------------------- HASHES -------------------------------
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+def perceptual_hash(content):
+    """
+    64-bit difference hash: survives re-encoding, resizing and light
+    recompression, so CDN copies of one photo share (nearly) the same value.
+    """
+    img = Image.open(BytesIO(content))
+    img.draft("L", (64, 64))  # JPEG: decode at reduced scale, much cheaper than a full decode
+    pixels = list(img.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    # SQLite integers are signed 64-bit
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+def hamming(a, b):
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+# ------------------------------- CACHE -------------------------------
+class MediaCache:
+    """
+    Persistent map from images to the WordPress media items already created
+    for them (SQLite). Lookups go source URL -> content hash -> perceptual
+    hash, so a photo is uploaded once however many listings or runs use it.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_distance=PHASH_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self._phashes = dict(self._db.execute("SELECT media_id, phash FROM media WHERE phash IS NOT NULL"))
+        self.stats = {"url": 0, "content": 0, "perceptual": 0, "stored": 0, "removed": 0}
+
+    def _hit(self, kind, media_id, url):
+        row = self._db.execute("SELECT media_id, media_url FROM media WHERE media_id = ?", (media_id,)).fetchone()
+        if not row:
+            return None
+        self._db.execute("UPDATE media SET last_used = ? WHERE media_id = ?", (time.time(), media_id))
+        self._db.execute("INSERT OR REPLACE INTO sources (url, media_id) VALUES (?, ?)", (url, media_id))
+        self._db.commit()
+        self.stats[kind] += 1
+        return {"id": row[0], "url": row[1]}
+
+    def by_url(self, url):
+        """Media already uploaded from this exact URL; checked before downloading"""
+        with self._lock:
+            row = self._db.execute("SELECT media_id FROM sources WHERE url = ?", (url,)).fetchone()
+            return self._hit("url", row[0], url) if row else None
+
+    def by_content(self, url, sha256, phash=None):
+        """Media with identical bytes, else a perceptually matching one; remembers `url` as an alias"""
+        with self._lock:
+            row = self._db.execute("SELECT media_id FROM media WHERE sha256 = ?", (sha256,)).fetchone()
+            if row:
+                return self._hit("content", row[0], url)
+            if phash is None:
+                return None
+            for media_id, known in self._phashes.items():
+                if hamming(phash, known) <= self.max_distance:
+                    return self._hit("perceptual", media_id, url)
+        return None
+
+    def store(self, url, sha256, phash, media):
+        """Remember a freshly uploaded media item ({"id", "url"}) for its source URL and hashes"""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO media (media_id, media_url, sha256, phash, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(media_id) DO UPDATE SET media_url = excluded.media_url, sha256 = excluded.sha256, "
+                "phash = excluded.phash, last_used = excluded.last_used",
+                (media["id"], media["url"], sha256, phash, time.time()),
+            )
+            self._db.execute("INSERT OR REPLACE INTO sources (url, media_id) VALUES (?, ?)", (url, media["id"]))
+            self._db.commit()
+            if phash is not None:
+                self._phashes[media["id"]] = phash
+            self.stats["stored"] += 1
+
+    def media_ids(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT media_id FROM media ORDER BY media_id")]
+
+    def remove(self, media_ids):
+        """Forget media items (and their source URLs), e.g. ones deleted from WordPress"""
+        with self._lock:
+            self._db.executemany("DELETE FROM media WHERE media_id = ?", [(i,) for i in media_ids])
+            self._db.commit()
+            for media_id in media_ids:
+                self._phashes.pop(media_id, None)
+            self.stats["removed"] += len(media_ids)
+
+    def gc(self, existing_ids, batch=100):
+        """
+        Drop entries whose media item no longer exists. `existing_ids(ids)`
+        returns the subset of a batch of IDs still present on WordPress.
+        Returns the number of entries removed.
+        """
+        ids = self.media_ids()
+        missing = []
+        for start in range(0, len(ids), batch):
+            chunk = ids[start:start + batch]
+            present = set(existing_ids(chunk))
+            missing.extend(i for i in chunk if i not in present)
+        self.remove(missing)
+        return len(missing)
+
+    def summary(self):
+        s = self.stats
+        return (
+            f"{s['url'] + s['content'] + s['perceptual']} reused "
+            f"({s['url']} by URL, {s['content']} by content, {s['perceptual']} perceptual), {s['stored']} new"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
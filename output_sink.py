@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+import investment_metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pq = None
+
+# ------------------------------- SETTINGS -------------------------------
+OUTPUT_FORMAT = "csv"              # "csv" or "parquet"
+OUTPUT_PREFIX = "property_listings"  # property_listings_{all,sale,rent}.csv / property_listings/ dataset
+
+# Column order of the saved views (image_urls is flattened to a pipe-separated string)
+COLUMNS = [
+    "title", "price", "link", "description", "address", "agent", "bedrooms",
+    "bathrooms", "city", "source", "published", "category",
+    *investment_metrics.METRIC_COLUMNS, "image_urls_str",
+]
+
+VIEWS = {"all": None, "sale": "For Sale", "rent": "For Rent"}
+
+def formats():
+    """Output formats usable in this environment"""
+    return ["csv", "parquet"] if pq else ["csv"]
+
+def to_frame(rows):
+    """One site's listing dicts as a DataFrame in the saved column layout, investment metrics included"""
+    df = pd.DataFrame(rows)
+    df["image_urls_str"] = df["image_urls"].apply(lambda x: "|".join(x) if isinstance(x, list) else "")
+    return investment_metrics.add_metrics(df).reindex(columns=COLUMNS, fill_value="N/A")
+
+# ------------------------------- SINK -------------------------------
+class ListingSink:
+    """
+    Append-as-you-go writer for scraped listings. Each `write()` lands one
+    site's rows on disk immediately, so a crash only loses the site in flight
+    and memory stays bounded by the largest site rather than the whole run.
+
+    CSV appends to `<prefix>_{all,sale,rent}.csv.partial` and renames them on
+    `close()`. Parquet writes a hive-partitioned dataset under `<prefix>/`
+    (category=.../source=.../part-N.parquet); the sale/rent views are its
+    category partitions.
+    """
+
+    def __init__(self, fmt=OUTPUT_FORMAT, prefix=OUTPUT_PREFIX):
+        if fmt == "parquet" and pq is None:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.fmt = fmt
+        self.prefix = prefix
+        self.parts = 0
+        self.stats = {"listings": 0, "with_images": 0, "images": 0}
+
+        if fmt == "csv":
+            self._files = {view: open(self._csv_path(view) + ".partial", "w", newline="", encoding="utf-8") for view in VIEWS}
+            self._header = True
+        else:
+            shutil.rmtree(self._dataset_path(), ignore_errors=True)
+            os.makedirs(self._dataset_path())
+
+    def _csv_path(self, view):
+        return f"{self.prefix}_{view}.csv"
+
+    def _dataset_path(self):
+        return self.prefix
+
+    def write(self, rows):
+        """Persist one batch (normally one site) of listing dicts"""
+        if not rows:
+            return
+        for r in rows:
+            count = len(r.get("image_urls") or [])
+            self.stats["images"] += count
+            self.stats["with_images"] += count > 0
+        self.stats["listings"] += len(rows)
+
+        df = to_frame(rows)
+        if self.fmt == "csv":
+            for view, category in VIEWS.items():
+                part = df if category is None else df[df["category"] == category]
+                part.to_csv(self._files[view], index=False, header=self._header)
+                self._files[view].flush()
+            self._header = False
+        else:
+            self._write_parquet(df)
+
+    def _write_parquet(self, df):
+        self.parts += 1
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df.astype(str), preserve_index=False),
+            self._dataset_path(),
+            partition_cols=["category", "source"],
+            basename_template=f"part-{self.parts}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def close(self):
+        """Finalise the views; CSVs only replace the previous run's files here"""
+        if self.fmt != "csv":
+            return
+        for view, f in self._files.items():
+            f.close()
+            if self._header:  # Nothing written this run: keep the old files
+                os.remove(f.name)
+            else:
+                os.replace(f.name, self._csv_path(view))
+
+    def paths(self):
+        if self.fmt == "csv":
+            return [self._csv_path(view) for view in VIEWS]
+        return [self._dataset_path()]
+
+    def read(self, view="all"):
+        """Load a finalised view back (for display); only this view is held in memory"""
+        if self.fmt == "parquet" and not self.parts:
+            return pd.DataFrame(columns=COLUMNS)
+        return read_view(view, self.fmt, self.prefix)
+
+# ------------------------------- READERS -------------------------------
+def read_view(view="all", fmt=OUTPUT_FORMAT, prefix=OUTPUT_PREFIX):
+    """Load one saved view ("all", "sale" or "rent") without opening a sink; empty if nothing was saved"""
+    category = VIEWS[view]
+    if fmt == "csv":
+        path = f"{prefix}_{view}.csv"
+        return pd.read_csv(path, dtype=str, keep_default_na=False) if os.path.exists(path) else pd.DataFrame(columns=COLUMNS)
+    if not os.path.isdir(prefix):
+        return pd.DataFrame(columns=COLUMNS)
+    filters = [("category", "=", category)] if category else None
+    df = pd.read_parquet(prefix, filters=filters)
+    return df.astype({"category": str, "source": str}).reindex(columns=COLUMNS)
+
+def summary_path(prefix=OUTPUT_PREFIX):
+    return f"{prefix}_run.json"
+
+def save_run_summary(summary, prefix=OUTPUT_PREFIX):
+    """Write the finished run's summary next to its output (atomically, so readers never see half a file)"""
+    path = summary_path(prefix)
+    with open(path + ".partial", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=str)
+    os.replace(path + ".partial", path)
+
+def load_run_summary(prefix=OUTPUT_PREFIX):
+    """Summary of the last finished run, or None"""
+    try:
+        with open(summary_path(prefix), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
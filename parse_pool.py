@@ -0,0 +1,60 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# ------------------------------- SETTINGS -------------------------------
+PARSE_WORKERS = 0  # Parser processes; 0 parses on the fetching thread
+
+_pool = None
+_lock = threading.Lock()
+
+# ------------------------------- WORKER SIDE -------------------------------
+def _scraper(options):
+    # Imported by name so workers get the library, never the Streamlit script;
+    # options carry the parent's (possibly sidebar-edited) settings.
+    import scraper
+    for name, value in options.items():
+        setattr(scraper, name, value)
+    return scraper
+
+def _parse_detail(content, encoding, url, options):
+    return _scraper(options).parse_detail_page(content, encoding, url)
+
+def _parse_search(content, encoding, url, options):
+    return _scraper(options).parse_search_page(content, encoding, url)
+
+def _warm_up():
+    import scraper  # noqa: F401
+
+# ------------------------------- PARENT SIDE -------------------------------
+def configure(workers):
+    """
+    (Re)start the pool with `workers` processes (0 disables it). Workers are
+    spawned rather than forked: forking while fetch threads hold locks can deadlock.
+    """
+    global _pool, PARSE_WORKERS
+    with _lock:
+        if workers == PARSE_WORKERS and (_pool is not None) == bool(workers):
+            return
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+        PARSE_WORKERS = workers
+        if workers:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            for fut in [_pool.submit(_warm_up) for _ in range(workers)]:
+                fut.result()
+
+def enabled():
+    return _pool is not None
+
+def parse_detail(content, encoding, url, options):
+    """Decode, parse and extract a detail page in a worker; returns the details dict"""
+    return _pool.submit(_parse_detail, content, encoding, url, options).result()
+
+def parse_search(content, encoding, url, options):
+    """Decode, parse and extract a search page in a worker; returns the listings"""
+    return _pool.submit(_parse_search, content, encoding, url, options).result()
+
+def shutdown():
+    configure(0)
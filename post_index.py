@@ -0,0 +1,142 @@
+import html
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# ------------------------------- SETTINGS -------------------------------
+INDEX_PATH = ".post_index.sqlite3"
+SYNC_OVERLAP = timedelta(minutes=5)  # Re-read posts modified this close to the last sync (same-second edits, clock skew)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    modified TEXT,
+    hashes TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_title ON posts (title);
+CREATE INDEX IF NOT EXISTS posts_link ON posts (link);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def _key(value):
+    return (value or "").strip().lower()
+
+# ------------------------------- INDEX -------------------------------
+class PostIndex:
+    """
+    Local copy of the duplicate-detection keys of published properties
+    (SQLite): post ID, title and source URL. `sync` only asks WordPress for
+    posts modified since the previous sync; `rebuild` re-reads all of them.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(posts)")]
+        if "hashes" not in columns:  # Index created before upsert mode
+            self._db.execute("ALTER TABLE posts ADD COLUMN hashes TEXT")
+        self._db.commit()
+
+    def watermark(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'modified'").fetchone()
+        return row[0] if row else None
+
+    def _read(self, fetch_modified, since, latest):
+        """Every post `fetch_modified(since)` yields, as rows, plus the newest modified time seen"""
+        rows = []
+        for post in fetch_modified(since):
+            acf = post.get("acf")
+            link = acf.get("property_source_url", "") if isinstance(acf, dict) else ""
+            # Rendered titles are HTML (the uploader sends them escaped); the duplicate check compares plain text
+            title = html.unescape((post.get("title") or {}).get("rendered", ""))
+            rows.append((post["id"], _key(title), _key(link), post.get("modified")))
+            if post.get("modified") and (latest is None or post["modified"] > latest):
+                latest = post["modified"]
+        return rows, latest
+
+    def _store(self, rows, latest):
+        self._db.executemany(
+            "INSERT INTO posts (id, title, link, modified) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET title = excluded.title, link = excluded.link, modified = excluded.modified",
+            rows,
+        )
+        if latest:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('modified', ?)", (latest,))
+
+    def sync(self, fetch_modified):
+        """
+        Pull changes with `fetch_modified(modified_after)`, which yields post
+        dicts (id, title.rendered, modified, acf.property_source_url) modified
+        after the given local-time ISO timestamp, or all posts for None.
+        Returns the IDs of the posts fetched. Nothing is written unless every
+        page was fetched.
+        """
+        since = self.watermark()
+        if since:
+            since = (datetime.fromisoformat(since) - SYNC_OVERLAP).isoformat()
+
+        rows, latest = self._read(fetch_modified, since, self.watermark())
+        with self._lock:
+            self._store(rows, latest)
+            self._db.commit()
+        return [row[0] for row in rows]
+
+    def rebuild(self, fetch_modified):
+        """
+        Re-read all posts and drop the ones WordPress no longer has (e.g.
+        deleted by hand). Stored content hashes of surviving posts are kept.
+        Pruning only happens once every page was fetched; if fetching raises,
+        the index (and its sync watermark) stay as they were.
+        """
+        rows, latest = self._read(fetch_modified, None, None)
+        seen = {row[0] for row in rows}
+        with self._lock:
+            stale = [(row[0],) for row in self._db.execute("SELECT id FROM posts") if row[0] not in seen]
+            self._db.executemany("DELETE FROM posts WHERE id = ?", stale)
+            self._db.execute("DELETE FROM meta")
+            self._store(rows, latest)
+            self._db.commit()
+        return list(seen)
+
+    def add(self, post_id, title, link, modified=None, hashes=None):
+        """Record a post this run created, so it is a duplicate before the next sync sees it"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO posts (id, title, link, modified, hashes) VALUES (?, ?, ?, ?, ?)",
+                (post_id, _key(title), _key(link), modified, json.dumps(hashes) if hashes else None),
+            )
+            self._db.commit()
+
+    def hashes(self, post_id):
+        """Content hashes stored when the post was last written by the uploader, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT hashes FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def set_hashes(self, post_id, hashes):
+        with self._lock:
+            self._db.execute("UPDATE posts SET hashes = ? WHERE id = ?", (json.dumps(hashes), post_id))
+            self._db.commit()
+
+    def lookups(self):
+        """(title -> id, source url -> id) dicts, keys lowercased as the uploader compares them"""
+        with self._lock:
+            rows = self._db.execute("SELECT id, title, link FROM posts ORDER BY id").fetchall()
+        titles = {title: post_id for post_id, title, _ in rows if title}
+        links = {link: post_id for post_id, _, link in rows if link}
+        return titles, links
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
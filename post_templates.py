@@ -0,0 +1,144 @@
+from html import escape
+
+# Post-body HTML, one plain f-string function per section. Every listing
+# value (a str, as uploader.prepare_listings leaves them) is HTML-escaped;
+# `*_html` arguments are already-rendered sections and are inserted as-is.
+
+# ------------------------------- ESCAPING -------------------------------
+def title(text):
+    """
+    Post title as sent to WordPress, escaped like every other field: users
+    with unfiltered_html (admins, application passwords) get it stored verbatim.
+    """
+    return escape(str(text))
+
+def _known(value):
+    return bool(value) and value != "N/A"
+
+# ------------------------------- GALLERY -------------------------------
+def _gallery_image(url):
+    return f"""
+        <div style="border: 1px solid #ddd; border-radius: 5px; overflow: hidden;">
+            <img src="{escape(url)}" alt="Property Image" style="width: 100%; height: 200px; object-fit: cover;" loading="lazy" />
+        </div>
+"""
+
+def gallery(images):
+    """Gallery of every image after the first (the featured image); "" for one image or none"""
+    if len(images) <= 1:
+        return ""
+    images_html = "".join([_gallery_image(img["url"]) for img in images[1:]])
+    return f"""<div class="property-gallery" style="margin: 20px 0;">
+<h3>&#x1F4F8; Property Gallery</h3>
+<div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(250px, 1fr)); gap: 15px; margin-top: 15px;">
+{images_html}</div>
+</div>
+"""
+
+# ------------------------------- DESCRIPTION -------------------------------
+NO_DESCRIPTION = ["n/a", "no description available", "not fetched (limit reached)", "pending"]
+
+def description(text):
+    """Description as <p> paragraphs, split on the scraper's blank lines"""
+    if not text or text.lower() in NO_DESCRIPTION:
+        return "No description available for this property."
+    paragraphs = map(str.strip, escape(str(text).strip()).split("\n\n"))
+    return "".join([f"<p>{para}</p>\n" for para in paragraphs if para])
+
+# ------------------------------- FINANCIALS -------------------------------
+_HIGHLIGHT = " color: #28a745; font-weight: bold;"
+_MUTED = " font-size: 0.9em; color: #666;"
+
+def _financial_row(label, value, shaded=False, first=False, value_style=""):
+    background = " background-color: #fff;" if shaded else ""
+    width = " width: 40%;" if first else ""
+    return (
+        f'        <tr style="border: 1px solid #ddd;{background}">\n'
+        f'            <td style="padding: 8px; font-weight: bold;{width}">{label}</td>\n'
+        f'            <td style="padding: 8px;{value_style}">{escape(value)}</td>\n'
+        '        </tr>\n'
+    )
+
+def financials(category, price, estimated_value, annual_rent, monthly_rent, rental_yield, roi, metric_status):
+    """Investment metrics table; "" when none of the estimates are known"""
+    if not any([estimated_value, annual_rent, rental_yield, roi, monthly_rent]):
+        return ""
+
+    if category == "For Rent":
+        labels, values = ("Monthly Rent:", "Annual Rental Income:", "Estimated Property Value:"), (annual_rent, estimated_value)
+    else:  # For Sale
+        labels, values = ("Asking Price:", "Estimated Monthly Rent:", "Estimated Annual Income:"), (monthly_rent, annual_rent)
+    # The first row (the price) is always shown, the rest only when known
+    rows = [_financial_row(labels[0], price, first=True)]
+    if _known(values[0]):
+        rows.append(_financial_row(labels[1], values[0], shaded=True))
+    if _known(values[1]):
+        rows.append(_financial_row(labels[2], values[1]))
+    if _known(rental_yield):
+        rows.append(_financial_row("Gross Rental Yield:", rental_yield, shaded=True, value_style=_HIGHLIGHT))
+    if _known(roi):
+        rows.append(_financial_row("ROI:", roi, value_style=_HIGHLIGHT))
+    if _known(metric_status):
+        rows.append(_financial_row("Calculation Method:", metric_status, shaded=True, value_style=_MUTED))
+
+    return f"""<div class="property-financials" style="background: #f9f9f9; padding: 20px; border-radius: 5px; margin: 20px 0;">
+<h3>&#x1F4B0; Investment Metrics</h3>
+<table style="width:100%; border-collapse: collapse;">
+{"".join(rows)}</table>
+<p style="margin-top: 15px; font-size: 0.85em; color: #666;"><em>&#x1F4A1; Note: Investment metrics are estimates based on market averages and should be verified independently.</em></p>
+</div>
+"""
+
+# ------------------------------- POST BODY -------------------------------
+def content(price, category, city, address, bedrooms, bathrooms, agent, link, source,
+            description_html, financials_html="", gallery_html=""):
+    """Full post body from cleaned listing values and the rendered sections"""
+    site = source.split("//")[1].split("/")[0] if "//" in source else source
+    return f"""
+        <div class="property-details">
+            <h3>&#x1F4CB; Property Information</h3>
+            <table style="width:100%; border-collapse: collapse;">
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold; width: 30%;">Price:</td>
+                    <td style="padding: 8px;">{escape(price or "Contact for price")}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
+                    <td style="padding: 8px; font-weight: bold;">Category:</td>
+                    <td style="padding: 8px;"><span style="background: #007bff; color: white; padding: 3px 10px; border-radius: 3px;">{escape(category)}</span></td>
+                </tr>
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold;">Location:</td>
+                    <td style="padding: 8px;">{escape(city or "Not specified")}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
+                    <td style="padding: 8px; font-weight: bold;">Address:</td>
+                    <td style="padding: 8px;">{escape(address or "Not available")}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold;">Bedrooms:</td>
+                    <td style="padding: 8px;">{escape(bedrooms or "Not specified")}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
+                    <td style="padding: 8px; font-weight: bold;">Bathrooms:</td>
+                    <td style="padding: 8px;">{escape(bathrooms or "Not specified")}</td>
+                </tr>
+                <tr style="border: 1px solid #ddd;">
+                    <td style="padding: 8px; font-weight: bold;">Agent/Publisher:</td>
+                    <td style="padding: 8px;">{escape(agent or "Not specified")}</td>
+                </tr>
+            </table>
+
+            {financials_html}
+
+            {gallery_html}
+
+            <hr style="margin: 20px 0;">
+
+            <h3>&#x1F3E0; Property Description</h3>
+            {description_html}
+
+            <hr style="margin: 20px 0;">
+
+            <p><strong>&#x1F517; Original Listing:</strong> <a href="{escape(link)}" target="_blank" rel="noopener">View on {escape(site)}</a></p>
+        </div>
+    """
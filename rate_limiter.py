@@ -0,0 +1,211 @@
+import email.utils
+import threading
+import time
+from urllib.parse import urlsplit
+
+# ------------------------------- SETTINGS -------------------------------
+INITIAL_RATE = 5.0        # Requests per second a domain starts at
+MIN_RATE = 1.0
+MAX_RATE = 10.0
+BURST = 4                 # Requests a domain may get back to back
+ADJUST_INTERVAL = 1.0     # Seconds between rate adjustments for latency
+LATENCY_TARGET = 2.0      # Average response time above which a domain is slowed down
+LATENCY_SMOOTHING = 0.3   # Weight of the newest response in the average
+RATE_INCREASE = 1.0       # Requests/s added per interval while responses are fast
+SLOWDOWN_FACTOR = 0.9     # Rate multiplier per interval while responses are slow
+BACKOFF_FACTOR = 0.5      # Rate multiplier on 429/503
+DEFAULT_RETRY_AFTER = 5.0 # Pause after a 429/503 without a Retry-After header
+MAX_RETRY_AFTER = 30.0    # Longer pauses open the circuit instead of waiting them out
+BREAKER_FAILURES = 5      # Consecutive failures that open a domain's circuit
+BREAKER_COOLDOWN = 120.0  # Seconds until one trial request is let through again
+
+THROTTLE_STATUSES = {429, 503}
+FAILURE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a request to a domain whose circuit is open"""
+
+# ------------------------------- HELPERS -------------------------------
+def domain_of(url):
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def retry_after_seconds(value):
+    """A Retry-After header (seconds or an HTTP date) as seconds from now, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+# ------------------------------- LIMITER -------------------------------
+class _Domain:
+    def __init__(self, now):
+        self.rate = INITIAL_RATE
+        self.tokens = float(BURST)
+        self.updated = now        # Tokens are refilled from here on
+        self.paused_until = 0.0
+        self.adjusted = now
+        self.latency = None
+        self.failures = 0         # Consecutive
+        self.open_until = None    # Circuit closed while None
+        self.trial = False        # A half-open trial request is in flight
+        self.stats = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"requests": 0, "throttled": 0, "failures": 0, "trips": 0, "skipped": 0, "waited": 0.0}
+
+class RateLimiter:
+    """
+    Per-domain politeness and failure control shared by all fetch threads.
+
+    Each domain has a token bucket (`BURST` deep, refilled at its current
+    rate). The rate creeps up while responses are fast, is cut while their
+    average latency is above `LATENCY_TARGET`, and is halved on 429/503,
+    which also pause the domain for its Retry-After. `BREAKER_FAILURES`
+    failures in a row (errors, timeouts, 403/429/5xx) open the domain's
+    circuit: requests raise CircuitOpen until `BREAKER_COOLDOWN` has passed,
+    then a single trial request decides whether it closes again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._domains = {}
+
+    def _domain(self, url, now):
+        domain = domain_of(url)
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _Domain(now)
+        return domain, state
+
+    @staticmethod
+    def _refill(state, now):
+        if now > state.updated:
+            state.tokens = min(BURST, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+
+    def _take(self, domain, state, now):
+        """Take a token if one is free; otherwise the seconds until one may be"""
+        if state.open_until is not None:
+            if now < state.open_until or state.trial:
+                state.stats["skipped"] += 1
+                raise CircuitOpen(f"{domain}: circuit open after {state.failures} failures")
+        self._refill(state, now)
+        wait = max((1 - state.tokens) / state.rate, state.paused_until - now, 0.0)
+        if wait == 0.0:
+            state.tokens -= 1
+            state.stats["requests"] += 1
+            if state.open_until is not None:
+                state.trial = True  # Half-open: this request decides
+        return wait
+
+    def acquire(self, url):
+        """
+        Block until a request to `url` may be sent; raises CircuitOpen.
+        Waiters re-check when they wake, so a pause that starts meanwhile holds them too.
+        """
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                domain, state = self._domain(url, now)
+                wait = self._take(domain, state, now)
+                if wait == 0.0:
+                    state.stats["waited"] += waited
+                    return
+            time.sleep(wait)
+            waited += wait
+
+    def delay(self, url):
+        """Seconds until `url`'s domain has a token, without taking it (lets async callers wait off-thread)"""
+        now = time.monotonic()
+        with self._lock:
+            _, state = self._domain(url, now)
+            self._refill(state, now)
+            return max((1 - state.tokens) / state.rate, state.paused_until - now, 0.0)
+
+    def observe(self, url, status, elapsed, retry_after=None):
+        """Adapt `url`'s domain to a response: its status, seconds taken and Retry-After header"""
+        now = time.monotonic()
+        with self._lock:
+            _, state = self._domain(url, now)
+            if status in THROTTLE_STATUSES:
+                state.stats["throttled"] += 1
+                if now < state.paused_until:
+                    return  # Sent before the pause began: one backoff (and one failure) per pause
+                state.rate = max(MIN_RATE, state.rate * BACKOFF_FACTOR)
+                pause = retry_after_seconds(retry_after)
+                pause = DEFAULT_RETRY_AFTER if pause is None else pause
+                if pause > MAX_RETRY_AFTER:
+                    self._fail(state, now, cooldown=pause, trip=True)
+                    return
+                # Tokens only refill once the pause is over, so it doesn't end in a burst
+                state.paused_until = max(state.paused_until, now + pause)
+                state.tokens = min(state.tokens, 0.0)
+                state.updated = max(state.updated, state.paused_until)
+            if status in FAILURE_STATUSES:
+                self._fail(state, now)
+                return
+
+            state.failures, state.open_until, state.trial = 0, None, False
+            if state.latency is None:
+                state.latency = elapsed
+            else:
+                state.latency += LATENCY_SMOOTHING * (elapsed - state.latency)
+            if now - state.adjusted >= ADJUST_INTERVAL:
+                state.adjusted = now
+                self._refill(state, now)
+                if state.latency > LATENCY_TARGET:
+                    state.rate = max(MIN_RATE, state.rate * SLOWDOWN_FACTOR)
+                else:
+                    state.rate = min(MAX_RATE, state.rate + RATE_INCREASE)
+
+    def failure(self, url):
+        """Count a request to `url` that raised (timeout, connection error) as a failure"""
+        now = time.monotonic()
+        with self._lock:
+            self._fail(self._domain(url, now)[1], now)
+
+    @staticmethod
+    def _fail(state, now, cooldown=BREAKER_COOLDOWN, trip=False):
+        state.failures += 1
+        state.stats["failures"] += 1
+        if trip or state.trial or state.failures >= BREAKER_FAILURES:
+            if state.open_until is None or state.trial:
+                state.stats["trips"] += 1
+            state.open_until = now + cooldown
+            state.trial = False
+
+    def reset_stats(self):
+        """Start counting a new run; learned rates and open circuits are kept"""
+        with self._lock:
+            for state in self._domains.values():
+                state.reset_stats()
+
+    def domain_stats(self):
+        """Per-domain counters of the current run plus each domain's rate and circuit state"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                domain: dict(
+                    state.stats,
+                    waited=round(state.stats["waited"], 1),
+                    rate=round(state.rate, 2),
+                    circuit="open" if state.open_until is not None and now < state.open_until else "closed",
+                )
+                for domain, state in self._domains.items()
+            }
+
+    def summary(self):
+        stats = self.domain_stats()
+        total = lambda key: sum(s[key] for s in stats.values())
+        return (f"{len(stats)} domains, {total('requests')} requests, {total('throttled')} throttled (429/503), "
+                f"{total('failures')} failures, {total('trips')} circuits opened, {total('skipped')} requests skipped, "
+                f"{total('waited'):.0f}s waited")
@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import unquote, urlsplit
+
+# ------------------------------- SETTINGS -------------------------------
+ARCHIVE_PATH = "scrape_replay.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    host TEXT NOT NULL,
+    target TEXT NOT NULL,
+    url TEXT NOT NULL,
+    kind TEXT,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    body BLOB NOT NULL,
+    elapsed REAL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (host, target)
+);
+"""
+
+# ------------------------------- KEYS -------------------------------
+def split_url(url):
+    """(host, path?query) a response is stored under; percent-escapes are decoded so sent and recorded forms match"""
+    parts = urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    return parts.netloc.lower(), unquote(target)
+
+# ------------------------------- ARCHIVE -------------------------------
+class ReplayArchive:
+    """
+    Compact record of the pages a scrape fetched (SQLite, one zlib-compressed
+    body per URL), so the run can be served back offline by
+    benchmarks/replay_server.py. Recording a URL again replaces it; a
+    Selenium-rendered page replaces the static one it was rendered from.
+    """
+
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def record(self, url, status, body, encoding=None, content_type=None, elapsed=None, kind=None):
+        """Store a response; `kind` is "search" for a site's search page, "detail" for a listing page"""
+        host, target = split_url(url)
+        if not content_type:
+            content_type = f"text/html; charset={encoding}" if encoding else "text/html"
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (host, target, url, kind, status, content_type, body, elapsed, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (host, target, url, kind, status, content_type, zlib.compress(body or b""), elapsed, time.time()),
+            )
+            self._db.commit()
+
+    def responses(self):
+        """Every stored response as a dict (body decompressed), in recording order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT host, target, url, status, content_type, body, elapsed FROM responses ORDER BY recorded_at"
+            ).fetchall()
+        for host, target, url, status, content_type, body, elapsed in rows:
+            yield {
+                "host": host, "target": target, "url": url, "status": status,
+                "content_type": content_type, "body": zlib.decompress(body), "elapsed": elapsed,
+            }
+
+    def sites(self):
+        """Search-page URLs, i.e. the sites the recorded run scraped"""
+        with self._lock:
+            return [url for (url,) in self._db.execute("SELECT url FROM responses WHERE kind = 'search' ORDER BY recorded_at")]
+
+    def summary(self):
+        with self._lock:
+            count, hosts, size = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT host), COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+            ).fetchone()
+        return f"{count} responses from {hosts} hosts, {size / (1024 * 1024):.1f} MB compressed"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
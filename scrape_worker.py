@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pandas as pd
+
+import output_sink
+
+# ------------------------------- WORKER -------------------------------
+class ScrapeWorker:
+    """
+    Runs scraper.run_scrape() on a background thread, one run at a time, and
+    keeps what a dashboard streams while it runs: an event per finished site
+    and the rows scraped so far, in the saved column layout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.total = 0
+        self.events = []
+        self.frames = []
+        self.started = None
+        self.finished = None
+        self.summary = None
+        self.error = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, settings=None, **options):
+        """
+        Start a run unless one is in progress; returns True if it started.
+        `settings` are scraper module settings to apply first (e.g.
+        {"DESC_AND_IMAGE_FETCH_LIMIT": 20}); `options` go to run_scrape().
+        """
+        import scraper  # Only loaded once a run is asked for
+
+        with self._lock:
+            if self.running:
+                return False
+            options["sites"] = list(options.get("sites") or scraper.AGENT_SITES)
+            self.total = len(options["sites"])
+            self.events, self.frames = [], []
+            self.started, self.finished, self.summary, self.error = time.time(), None, None, None
+            self._thread = threading.Thread(target=self._run, args=(scraper, settings or {}, options), name="scrape-worker", daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self, scraper, settings, options):
+        for name, value in settings.items():
+            setattr(scraper, name, value)
+        summary = error = None
+        try:
+            summary = scraper.run_scrape(on_result=self._on_result, **options)
+        except Exception as e:
+            error = e
+        with self._lock:
+            self.summary, self.error, self.finished = summary, error, time.time()
+
+    def _on_result(self, site, rows, error):
+        frame = output_sink.to_frame(rows) if rows else None
+        with self._lock:
+            self.events.append({"site": site, "listings": len(rows), "error": str(error) if error else None})
+            if frame is not None:
+                self.frames.append(frame)
+
+    def snapshot(self):
+        """(site events, rows so far as one DataFrame); copies, safe to render while the run goes on"""
+        with self._lock:
+            events, frames = list(self.events), list(self.frames)
+        rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=output_sink.COLUMNS)
+        return events, rows
@@ -1,29 +1,42 @@
 import re
+import json
 import time
-import requests
-import pandas as pd
-import streamlit as st
-from bs4 import BeautifulSoup
+import argparse
+import threading
+import asyncio
+from bs4 import CData, NavigableString, Tag
 from urllib.parse import urljoin, urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import html_parsers
+import http_cache
+import http_session
+import listing_index
+import output_sink
+import parse_pool
+import rate_limiter
+import replay_archive
+import structured_data
+
 try:
     import feedparser
 except Exception:
     feedparser = None
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-
 # ------------------------------- SETTINGS -------------------------------
 HEADLESS = True
 REQUEST_TIMEOUT = 10
 MAX_THREADS = 10
+DETAIL_WORKERS = 8  # Detail fetches in flight per site (also the per-host socket cap)
 SITES_PER_PAGE_LIMIT = 60
 DESC_AND_IMAGE_FETCH_LIMIT = 30
 MAX_IMAGES_PER_PROPERTY = 5  # Number of images to fetch per property
+PARSE_WORKERS = 0            # Parser processes (0 = parse on the fetching threads)
+SELENIUM_POOL_SIZE = 2       # Warm Chrome instances shared by dynamic sites
+SELENIUM_MAX_PAGES = 20      # Pages per Chrome instance before it is recycled
+SELENIUM_WAIT_TIMEOUT = 10   # Max seconds to wait for listing containers
+
+HTML_PARSER = "lxml"  # BeautifulSoup backend; falls back to html.parser if lxml is missing
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 
@@ -343,12 +356,8 @@ def extract_multiple_images(soup, detail_url, max_images=5):
     return images
 
 # ------------------------------- DETAIL PAGE SCRAPER -------------------------------
-def extract_details_from_listing_page(detail_url):
-    """
-    Fetch comprehensive property description, MULTIPLE images, address, agent, bedrooms, bathrooms, and city
-    from the actual listing detail page.
-    """
-    result = {
+def empty_details():
+    return {
         "description": "No description available",
         "image_urls": [],  # Now a list of URLs
         "address": "N/A",
@@ -357,56 +366,530 @@ def extract_details_from_listing_page(detail_url):
         "bathrooms": "N/A",
         "city": "N/A"
     }
+
+def extract_details_from_soup(soup, detail_url, result=None):
+    """
+    Reference (multi-pass) detail extractor. Fills `result` in place so a
+    failure part-way keeps the fields found so far.
+    """
+    if result is None:
+        result = empty_details()
+
+    # ===== EXTRACT COMPREHENSIVE DESCRIPTION =====
+    result["description"] = extract_comprehensive_description(soup, detail_url)
+
+    # ===== EXTRACT ADDRESS =====
+    address_patterns = [
+        lambda s: s.find(["h1", "h2"], class_=lambda x: x and any(k in x.lower() for k in ["address", "title", "heading"])),
+        lambda s: s.find("span", class_=lambda x: x and "address" in x.lower()),
+        lambda s: s.find("div", class_=lambda x: x and "address" in x.lower()),
+    ]
+    
+    for pattern in address_patterns:
+        address_tag = pattern(soup)
+        if address_tag:
+            result["address"] = address_tag.get_text(strip=True)
+            break
+
+    # ===== EXTRACT AGENT/PUBLISHER =====
+    agent_patterns = [
+        lambda s: s.find("div", class_=lambda x: x and any(k in x.lower() for k in ["agent", "agency", "seller", "publisher"])),
+        lambda s: s.find("p", class_=lambda x: x and "agent" in x.lower()),
+        lambda s: s.find("span", class_=lambda x: x and "agent" in x.lower()),
+    ]
     
+    for pattern in agent_patterns:
+        agent_tag = pattern(soup)
+        if agent_tag:
+            result["agent"] = agent_tag.get_text(strip=True)[:150]
+            break
+
+    # ===== EXTRACT BEDROOM & BATHROOM COUNT =====
+    full_text = soup.get_text(" ", strip=True)
+    result["bedrooms"] = extract_bedrooms(full_text)
+    result["bathrooms"] = extract_bathrooms(full_text)
+
+    # ===== EXTRACT CITY/TOWN =====
+    if result["address"] != "N/A":
+        result["city"] = extract_city_from_text(result["address"])
+    if result["city"] == "N/A":
+        result["city"] = extract_city_from_text(full_text)
+
+    # ===== EXTRACT MULTIPLE HIGH-RES IMAGES =====
+    result["image_urls"] = extract_multiple_images(soup, detail_url, MAX_IMAGES_PER_PROPERTY)
+
+    return result
+
+# ------------------------------- COMPILED DETAIL EXTRACTOR -------------------------------
+COMPILED_DETAIL_EXTRACTOR = True  # False falls back to extract_details_from_soup
+
+def _class_matcher(keywords):
+    """Precompiled "any keyword in the lowercased class string" test"""
+    return re.compile("|".join(re.escape(k) for k in keywords)).search
+
+_DESCRIPTION_CLASS = _class_matcher([
+    "description", "property-description", "property-detail",
+    "details", "summary", "about", "property-text"
+])
+_FEATURE_CLASS = _class_matcher(["feature", "highlight", "specification", "spec"])
+_HEADING_ADDRESS_CLASS = _class_matcher(["address", "title", "heading"])
+_ADDRESS_CLASS = _class_matcher(["address"])
+_AGENCY_CLASS = _class_matcher(["agent", "agency", "seller", "publisher"])
+_AGENT_CLASS = _class_matcher(["agent"])
+_GALLERY_CLASS = _class_matcher([
+    "gallery", "carousel", "slider", "photos", "images",
+    "property-images", "image-gallery", "photo-gallery"
+])
+_PROPERTY_IMG_CLASS = _class_matcher(["property", "photo", "image", "picture"])
+_PARAGRAPH_SKIP = ["click here", "read more", "contact", "cookie", "javascript", "search"]
+_IMG_SKIP = ["logo", "icon", "avatar", "agent"]
+_IMG_SKIP_FALLBACK = _IMG_SKIP + ["banner"]
+
+class DetailPageScan:
+    """
+    Everything the detail extractor needs, collected in one walk of the tree:
+    first-match candidates for each field, fallback node lists, gallery
+    images and the page's stripped text.
+    """
+
+    def __init__(self, soup, max_images):
+        self.description_tag = None
+        self.meta_description = None
+        self.og_description = None
+        self.feature_lists = []
+        self.paragraphs = []
+        self.address_heading = None
+        self.address_span = None
+        self.address_div = None
+        self.agent_div = None
+        self.agent_p = None
+        self.agent_span = None
+        self.galleries = []
+        self.gallery_imgs = {}
+        self.property_imgs = []
+        self.src_imgs = []
+        self.strings = []
+        self._scan(soup, max_images * 2)
+
+    def _scan(self, soup, gallery_limit):
+        text_types = getattr(soup, "interesting_string_types", None) or (NavigableString, CData)
+        strings = self.strings
+        gallery_imgs = self.gallery_imgs
+
+        for node in soup.descendants:
+            node_type = type(node)
+            if node_type is not Tag:
+                if node_type in text_types:
+                    text = node.strip()
+                    if text:
+                        strings.append(text)
+                continue
+
+            name = node.name
+            classes = node.get("class")
+            if isinstance(classes, list):
+                cls = " ".join(classes).lower()
+            else:
+                cls = (classes or "").lower()
+
+            if name == "div":
+                if cls:
+                    if self.description_tag is None and _DESCRIPTION_CLASS(cls):
+                        self.description_tag = node
+                    if self.address_div is None and _ADDRESS_CLASS(cls):
+                        self.address_div = node
+                    if self.agent_div is None and _AGENCY_CLASS(cls):
+                        self.agent_div = node
+                    if _GALLERY_CLASS(cls):
+                        self.galleries.append(node)
+                        gallery_imgs[id(node)] = []
+            elif name == "p":
+                self.paragraphs.append(node)
+                if self.agent_p is None and cls and _AGENT_CLASS(cls):
+                    self.agent_p = node
+            elif name == "img":
+                if cls and _PROPERTY_IMG_CLASS(cls):
+                    self.property_imgs.append(node)
+                if node.get("src") is not None:
+                    self.src_imgs.append(node)
+                if gallery_imgs:
+                    for parent in node.parents:
+                        found = gallery_imgs.get(id(parent))
+                        if found is not None and len(found) < gallery_limit:
+                            found.append(node)
+            elif name == "span":
+                if cls:
+                    if self.address_span is None and _ADDRESS_CLASS(cls):
+                        self.address_span = node
+                    if self.agent_span is None and _AGENT_CLASS(cls):
+                        self.agent_span = node
+            elif name in ("ul", "ol"):
+                if cls and _FEATURE_CLASS(cls):
+                    self.feature_lists.append(node)
+                if name == "ul" and cls and _GALLERY_CLASS(cls):
+                    self.galleries.append(node)
+                    gallery_imgs[id(node)] = []
+            elif name in ("section", "article"):
+                if cls:
+                    if self.description_tag is None and _DESCRIPTION_CLASS(cls):
+                        self.description_tag = node
+                    if name == "section" and _GALLERY_CLASS(cls):
+                        self.galleries.append(node)
+                        gallery_imgs[id(node)] = []
+            elif name in ("h1", "h2"):
+                if self.address_heading is None and cls and _HEADING_ADDRESS_CLASS(cls):
+                    self.address_heading = node
+            elif name == "meta":
+                if self.meta_description is None and node.get("name") == "description":
+                    self.meta_description = node
+                if self.og_description is None and node.get("property") == "og:description":
+                    self.og_description = node
+
+    def description(self):
+        description_text = ""
+
+        for tag in (self.description_tag, self.meta_description, self.og_description):
+            if tag:
+                if tag.name == "meta":
+                    text = tag.get("content", "")
+                else:
+                    text = tag.get_text(" ", strip=True)
+                if len(text) > 50:
+                    description_text = text
+                    break
+
+        if not description_text or len(description_text) < 50:
+            features = []
+            for ul in self.feature_lists:
+                for li in ul.find_all("li", limit=10):
+                    text = li.get_text(strip=True)
+                    if text:
+                        features.append(text)
+            if features:
+                description_text = "Key Features: " + "; ".join(features)
+
+        if not description_text or len(description_text) < 50:
+            text_blocks = []
+            for p in self.paragraphs:
+                text = p.get_text(" ", strip=True)
+                if len(text) > 80 and not any(k in text.lower() for k in _PARAGRAPH_SKIP):
+                    text_blocks.append(text)
+            if text_blocks:
+                description_text = " ".join(text_blocks)
+
+        if description_text:
+            return clean_description_text(description_text[:5000])
+        return "No description available"
+
+    def images(self, detail_url, max_images):
+        images = []
+        seen_urls = set()
+
+        def take(img_tags, skip):
+            for img_tag in img_tags:
+                if len(images) >= max_images:
+                    return
+                img_url = extract_image_url_from_tag(img_tag, detail_url)
+                if img_url and img_url not in seen_urls:
+                    if any(k in img_url.lower() for k in skip):
+                        continue
+                    images.append(img_url)
+                    seen_urls.add(img_url)
+
+        for container in self.galleries:
+            take(self.gallery_imgs[id(container)], _IMG_SKIP)
+        if len(images) < max_images:
+            take(self.property_imgs, _IMG_SKIP)
+        if len(images) < max_images:
+            take(self.src_imgs, _IMG_SKIP_FALLBACK)
+        return images
+
+def extract_details_compiled(soup, detail_url, result=None):
+    """Single-pass equivalent of extract_details_from_soup (same output dict)"""
+    if result is None:
+        result = empty_details()
+
+    scan = DetailPageScan(soup, MAX_IMAGES_PER_PROPERTY)
+
+    result["description"] = scan.description()
+
+    for tag in (scan.address_heading, scan.address_span, scan.address_div):
+        if tag:
+            result["address"] = tag.get_text(strip=True)
+            break
+
+    for tag in (scan.agent_div, scan.agent_p, scan.agent_span):
+        if tag:
+            result["agent"] = tag.get_text(strip=True)[:150]
+            break
+
+    full_text = " ".join(scan.strings)
+    result["bedrooms"] = extract_bedrooms(full_text)
+    result["bathrooms"] = extract_bathrooms(full_text)
+
+    if result["address"] != "N/A":
+        result["city"] = extract_city_from_text(result["address"])
+    if result["city"] == "N/A":
+        result["city"] = extract_city_from_text(full_text)
+
+    result["image_urls"] = scan.images(detail_url, MAX_IMAGES_PER_PROPERTY)
+
+    return result
+
+# ------------------------------- STRUCTURED DATA -------------------------------
+STRUCTURED_DATA = True  # Read embedded JSON-LD / __NEXT_DATA__ / state blobs before the DOM heuristics (structured_data.py)
+
+_structured_hits = structured_data.HitCounter()
+
+# Detail fields a blob must have for the DOM to be skipped (the city is derived from the address)
+BLOB_DETAIL_FIELDS = ["description", "image_urls", "address", "agent", "bedrooms", "bathrooms"]
+
+def _city(record):
+    """A known city from the address, else the blob's own locality"""
+    city = extract_city_from_text(record["address"]) if record["address"] else "N/A"
+    if city == "N/A" and record["locality"]:
+        city = record["locality"]
+    return city
+
+def listings_from_structured(page, url):
+    """Search-page listings from the page's embedded data; [] when it has none"""
+    kind, records = structured_data.extract_records(page, url)
+    listings = []
+    for record in records:
+        title = record["title"] or "Property Listing"
+        price = record["price"] or "N/A"
+        if not record["link"] or not is_listing(f"{title} {price}", record["link"]):
+            continue
+        address = record["address"] or "N/A"
+        listings.append({
+            "title": title,
+            "price": price,
+            "link": record["link"],
+            "image_urls": [],  # Filled from the detail page
+            "description": "Pending",
+            "address": address,
+            "agent": record["agent"] or "N/A",
+            "bedrooms": record["bedrooms"] or "N/A",
+            "bathrooms": record["bathrooms"] or "N/A",
+            "city": _city(record),
+            "fingerprint": listing_index.fingerprint(f"{title} {address} {record['bedrooms']} {record['bathrooms']}", price),
+            "_extracted": kind,
+        })
+        if len(listings) >= SITES_PER_PAGE_LIMIT:
+            break
+    return listings
+
+def details_from_structured(page, detail_url):
+    """
+    (blob kind, {field: value}) with the detail fields this listing's
+    embedded data actually has; (None, {}) when no blob describes it.
+    Fields missing from the dict are left to the DOM heuristics.
+    """
+    kind, records = structured_data.extract_records(page, detail_url)
+    record = structured_data.best_record(records, detail_url)
+    if record is None:
+        return None, {}
+
+    text = f"{record['title']} {record['description']}"
+    images = [u for u in dict.fromkeys(record["image_urls"]) if not any(k in u.lower() for k in _IMG_SKIP)]
+    found = {
+        "description": clean_description_text(record["description"][:5000]) if record["description"] else "",
+        "image_urls": images[:MAX_IMAGES_PER_PROPERTY],
+        "address": record["address"],
+        "agent": record["agent"],
+        "bedrooms": record["bedrooms"] or extract_bedrooms(text),
+        "bathrooms": record["bathrooms"] or extract_bathrooms(text),
+        "city": _city(record),
+    }
+    found = {field: value for field, value in found.items() if value and value != "N/A"}
+    return (kind, found) if found else (None, {})
+
+def note_extraction(url, record):
+    """Count whether a parsed page came from embedded data (per domain) and drop the marker"""
+    if isinstance(record, list):
+        kind = "dom"
+        for item in record:
+            kind = item.pop("_extracted", kind)
+    else:
+        kind = record.pop("_extracted", "dom")
+    _structured_hits.count(url, kind)
+    return record
+
+# ------------------------------- PARSE STAGE -------------------------------
+def parse_options():
+    """Settings the parse stage reads, shipped to parse_pool workers with each page"""
+    return {
+        "HTML_PARSER": HTML_PARSER,
+        "COMPILED_DETAIL_EXTRACTOR": COMPILED_DETAIL_EXTRACTOR,
+        "MAX_IMAGES_PER_PROPERTY": MAX_IMAGES_PER_PROPERTY,
+        "SITES_PER_PAGE_LIMIT": SITES_PER_PAGE_LIMIT,
+        "STRUCTURED_DATA": STRUCTURED_DATA,
+    }
+
+def parse_detail_page(content, encoding, detail_url, result=None):
+    """
+    CPU half of a detail fetch: decode, parse and extract the raw body.
+    Embedded data wins field by field; the tree is only built when the blob
+    lacks some field, which then comes from the DOM heuristics.
+    """
+    if result is None:
+        result = empty_details()
     try:
-        resp = requests.get(detail_url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        # ===== EXTRACT COMPREHENSIVE DESCRIPTION =====
-        result["description"] = extract_comprehensive_description(soup, detail_url)
-
-        # ===== EXTRACT ADDRESS =====
-        address_patterns = [
-            lambda s: s.find(["h1", "h2"], class_=lambda x: x and any(k in x.lower() for k in ["address", "title", "heading"])),
-            lambda s: s.find("span", class_=lambda x: x and "address" in x.lower()),
-            lambda s: s.find("div", class_=lambda x: x and "address" in x.lower()),
-        ]
-        
-        for pattern in address_patterns:
-            address_tag = pattern(soup)
-            if address_tag:
-                result["address"] = address_tag.get_text(strip=True)
-                break
+        page = html_parsers.decode_body(content, encoding)
+        kind, found = details_from_structured(page, detail_url) if STRUCTURED_DATA else (None, {})
+        if not all(field in found for field in BLOB_DETAIL_FIELDS):
+            soup = html_parsers.make_soup(page, HTML_PARSER)
+            if COMPILED_DETAIL_EXTRACTOR:
+                extract_details_compiled(soup, detail_url, result)
+            else:
+                extract_details_from_soup(soup, detail_url, result)
+        if kind:
+            result.update(found, _extracted=kind)
+    except Exception as e:
+        # Keep whatever was extracted before the failure
+        print(f"    ⚠ Error parsing details from {detail_url}: {e}")
+    return result
 
-        # ===== EXTRACT AGENT/PUBLISHER =====
-        agent_patterns = [
-            lambda s: s.find("div", class_=lambda x: x and any(k in x.lower() for k in ["agent", "agency", "seller", "publisher"])),
-            lambda s: s.find("p", class_=lambda x: x and "agent" in x.lower()),
-            lambda s: s.find("span", class_=lambda x: x and "agent" in x.lower()),
-        ]
-        
-        for pattern in agent_patterns:
-            agent_tag = pattern(soup)
-            if agent_tag:
-                result["agent"] = agent_tag.get_text(strip=True)[:150]
-                break
+def parse_search_page(content, encoding, url):
+    """CPU half of a search-page fetch"""
+    page = html_parsers.decode_body(content, encoding)
+    listings = listings_from_structured(page, url) if STRUCTURED_DATA else []
+    if listings:
+        return listings
+    soup = html_parsers.make_soup(page, HTML_PARSER)
+    return extract_listings_from_soup(soup, url)
 
-        # ===== EXTRACT BEDROOM & BATHROOM COUNT =====
-        full_text = soup.get_text(" ", strip=True)
-        result["bedrooms"] = extract_bedrooms(full_text)
-        result["bathrooms"] = extract_bathrooms(full_text)
+def _parse_detail_record(content, encoding, url):
+    if parse_pool.enabled():
+        return parse_pool.parse_detail(content, encoding, url, parse_options())
+    return parse_detail_page(content, encoding, url)
 
-        # ===== EXTRACT CITY/TOWN =====
-        if result["address"] != "N/A":
-            result["city"] = extract_city_from_text(result["address"])
-        if result["city"] == "N/A":
-            result["city"] = extract_city_from_text(full_text)
+def _parse_search_record(content, encoding, url):
+    if parse_pool.enabled():
+        return parse_pool.parse_search(content, encoding, url, parse_options())
+    return parse_search_page(content, encoding, url)
 
-        # ===== EXTRACT MULTIPLE HIGH-RES IMAGES =====
-        result["image_urls"] = extract_multiple_images(soup, detail_url, MAX_IMAGES_PER_PROPERTY)
+# ------------------------------- HTTP CACHE -------------------------------
+HTTP_CACHE_ENABLED = True  # Conditional GETs against the on-disk cache (http_cache.py)
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+def get_http_cache():
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = http_cache.HttpCache()
+    return _http_cache
+
+# ------------------------------- REPLAY ARCHIVE -------------------------------
+RECORD_ARCHIVE = None  # Path to record every fetched page into (replay_archive.py) for offline benchmarks
+
+_replay_archive = None
+_replay_archive_lock = threading.Lock()
+
+def get_replay_archive():
+    """The archive responses are recorded into, or None when RECORD_ARCHIVE is off"""
+    global _replay_archive
+    if not RECORD_ARCHIVE:
+        return None
+    with _replay_archive_lock:
+        if _replay_archive is None:
+            _replay_archive = replay_archive.ReplayArchive(RECORD_ARCHIVE)
+    return _replay_archive
+
+# ------------------------------- RATE LIMITER -------------------------------
+RATE_LIMITING = True  # Per-domain adaptive rate limits and circuit breakers (rate_limiter.py)
+THROTTLE_RETRIES = 1  # Retries of a 429/503, after waiting out its Retry-After
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = rate_limiter.RateLimiter()
+    return _rate_limiter
+
+def polite_fetch(url, headers):
+    """
+    GET `url` within its domain's rate limit, feeding the response (or the
+    error) back to the limiter. Raises CircuitOpen once the domain keeps failing.
+    """
+    if not RATE_LIMITING:
+        return http_session.fetch(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    limiter = get_rate_limiter()
+    for attempt in range(THROTTLE_RETRIES + 1):
+        limiter.acquire(url)
+        try:
+            resp = http_session.fetch(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except Exception:
+            limiter.failure(url)
+            raise
+        limiter.observe(url, resp.status_code, resp.elapsed.total_seconds(), resp.headers.get("Retry-After"))
+        if resp.status_code not in rate_limiter.THROTTLE_STATUSES:
+            break
+    return resp
 
+class FetchFailed(Exception):
+    """Raised for a response other than 200/304: error pages are never parsed into records"""
+
+def fetch_record(url, parse):
+    """
+    GET `url` and return parse(content, encoding, url). Cached pages are
+    requested conditionally; on a 304 the record extracted last time (with
+    the same parse settings) is returned without parsing at all. Any other
+    status than 200/304 raises FetchFailed.
+    """
+    cache = get_http_cache() if HTTP_CACHE_ENABLED else None
+    entry = cache.lookup(url) if cache else None
+    record_key = f"{parse.__name__}:{json.dumps(parse_options(), sort_keys=True)}"
+
+    headers = dict(HEADERS, **http_cache.conditional_headers(entry))
+    resp = polite_fetch(url, headers)
+
+    recorder = get_replay_archive()
+    kind = "search" if parse is _parse_search_record else "detail"
+    stored = False
+    if resp.status_code == 304 and entry:
+        cache.revalidated(url)
+        if recorder:
+            recorder.record(url, 200, cache.body(entry), entry["encoding"], elapsed=resp.elapsed.total_seconds(), kind=kind)
+        record = cache.record(entry, record_key)
+        if record is not None:
+            return note_extraction(url, record)
+        content, encoding, stored = cache.body(entry), entry["encoding"], True
+    else:
+        content, encoding = resp.content, resp.encoding
+        if recorder:
+            recorder.record(url, resp.status_code, content, encoding, resp.headers.get("Content-Type"), resp.elapsed.total_seconds(), kind)
+        if resp.status_code != 200:
+            raise FetchFailed(f"HTTP {resp.status_code}")
+        if cache:
+            stored = cache.store(url, resp, revalidating=entry is not None)
+
+    record = parse(content, encoding, url)
+    if stored:
+        cache.store_record(url, record_key, record)
+    return note_extraction(url, record)
+
+def extract_details_from_listing_page(detail_url):
+    """
+    Fetch comprehensive property description, MULTIPLE images, address, agent, bedrooms, bathrooms, and city
+    from the actual listing detail page. When the fetch fails the placeholders
+    are returned with "_failed" set, so they are shown but never indexed.
+    """
+    result = empty_details()
+    
+    try:
+        result.update(fetch_record(detail_url, _parse_detail_record))
+
+    except rate_limiter.CircuitOpen:
+        raise
     except Exception as e:
         print(f"    ⚠ Error fetching details from {detail_url}: {e}")
+        result["_failed"] = True
     
     return result
 
@@ -448,7 +931,8 @@ def extract_listings_from_soup(soup, base_url):
             "agent": "N/A",
             "bedrooms": "N/A",
             "bathrooms": "N/A",
-            "city": "N/A"
+            "city": "N/A",
+            "fingerprint": listing_index.fingerprint(text, price),
         })
         
         if len(listings) >= SITES_PER_PAGE_LIMIT:
@@ -456,16 +940,37 @@ def extract_listings_from_soup(soup, base_url):
     
     return listings
 
+# ------------------------------- LISTING INDEX -------------------------------
+INCREMENTAL_SCRAPING = True  # Skip detail fetches for listings unchanged since the last run (listing_index.py)
+
+_listing_index = None
+_listing_index_lock = threading.Lock()
+
+def get_listing_index():
+    global _listing_index
+    with _listing_index_lock:
+        if _listing_index is None:
+            _listing_index = listing_index.ListingIndex()
+    return _listing_index
+
 # ------------------------------- SCRAPE HELPERS -------------------------------
 def fallback_scrape(url):
     try:
-        r = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-        soup = BeautifulSoup(r.text, "html.parser")
-        return extract_listings_from_soup(soup, url)
+        return fetch_record(url, _parse_search_record)
     except Exception:
         return []
 
+# Selenium (and driver_pool, which needs it) is imported on first use, so
+# runs that never meet a dynamic portal don't pay for it
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
 def make_driver():
+    import driver_pool
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     opts = Options()
     if HEADLESS:
         opts.add_argument("--headless=new")
@@ -475,136 +980,417 @@ def make_driver():
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(driver_pool.chromedriver_path())
     driver = webdriver.Chrome(service=service, options=opts)
     driver.set_page_load_timeout(25)
     return driver
 
+def get_driver_pool():
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            import driver_pool
+            _driver_pool = driver_pool.DriverPool(make_driver, size=SELENIUM_POOL_SIZE, max_pages=SELENIUM_MAX_PAGES)
+    return _driver_pool
+
+def close_driver_pool():
+    """Quit idle Chrome instances, if any were started"""
+    if _driver_pool is not None:
+        _driver_pool.close()
+
+# Same keywords extract_listings_from_soup matches on, as case-insensitive CSS
+LISTING_CONTAINER_CSS = ", ".join(
+    f'{tag}[class*="{k}" i]'
+    for tag in ("article", "div", "li")
+    for k in ("property", "listing", "result", "card")
+)
+
+def _listing_count(driver):
+    from selenium.webdriver.common.by import By
+    return len(driver.find_elements(By.CSS_SELECTOR, LISTING_CONTAINER_CSS))
+
+def wait_for_listings(driver, timeout=SELENIUM_WAIT_TIMEOUT):
+    """Wait until listing containers render, then until lazy-loaded ones stop appearing"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(lambda d: _listing_count(d) > 0)
+    except TimeoutException:
+        return
+
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    last = [-1]
+
+    def settled(d):
+        count = _listing_count(d)
+        done = count == last[0]
+        last[0] = count
+        return done
+
+    try:
+        WebDriverWait(driver, 3, poll_frequency=0.5).until(settled)
+    except TimeoutException:
+        pass
+
 def selenium_scrape(url):
     try:
-        driver = make_driver()
-        driver.get(url)
-        time.sleep(5)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        driver.quit()
-        return extract_listings_from_soup(soup, url)
+        with get_driver_pool().lease() as driver:
+            driver.get(url)
+            wait_for_listings(driver)
+            page_source = driver.page_source
+        recorder = get_replay_archive()
+        if recorder:  # Replays serve the rendered page, so no browser is needed
+            recorder.record(url, 200, page_source.encode("utf-8"), "utf-8", kind="search")
+        listings = listings_from_structured(page_source, url) if STRUCTURED_DATA else []
+        if not listings:
+            listings = extract_listings_from_soup(html_parsers.make_soup(page_source, HTML_PARSER), url)
+        return note_extraction(url, listings)
     except Exception as e:
         print(f"Selenium error: {e}")
         return []
 
 # ------------------------------- PROCESSOR -------------------------------
-def process_site(site):
+def scrape_search_page(site):
+    """Search-page stage: requests first, Selenium for dynamic portals"""
     domain = urlparse(site).netloc.replace("www.", "")
-    print(f"\n🔍 Processing: {site}")
-    
     listings = fallback_scrape(site)
     if not listings and domain in DYNAMIC_DOMAINS:
         print(f"  ⚙ Using Selenium for {domain}...")
         listings = selenium_scrape(site)
+    return listings
+
+def copy_details(item, details):
+    """Copy detail-page fields onto a search-page listing"""
+    item["description"] = details["description"]
+    item["image_urls"] = details["image_urls"]
+    item["address"] = details["address"]
+    item["agent"] = details["agent"]
+    item["bedrooms"] = details["bedrooms"]
+    item["bathrooms"] = details["bathrooms"]
+    item["city"] = details["city"]
+
+def apply_details(site, item, details):
+    """
+    Copy freshly fetched details onto a listing and remember them in the
+    index; failed fetches are indexed without details, so the next run fetches again.
+    """
+    failed = details.pop("_failed", False)
+    copy_details(item, details)
+    if INCREMENTAL_SCRAPING:
+        get_listing_index().record(site, item, None if failed else details)
+
+    img_count = len(details["image_urls"])
+    desc_len = len(details["description"]) if details["description"] else 0
+    if img_count > 0:
+        print(f"    ✅ {item['title'][:35]} - {img_count} images, {desc_len} chars, {details['bedrooms']}bd {details['bathrooms']}ba")
+    else:
+        print(f"    ⚠ {item['title'][:35]} - No images, {desc_len} chars")
+
+def plan_detail_fetches(site, listings):
+    """
+    Pick the listings whose detail pages are fetched this run; the rest are
+    marked as not fetched. With the listing index on, unchanged listings get
+    their stored details instead and don't count against the fetch limit.
+    An empty (or failed) search page leaves the index untouched.
+    """
+    if INCREMENTAL_SCRAPING and listings:
+        index = get_listing_index()
+        _, stored = index.diff(site, listings)
+        pending = []
+        for item in listings:
+            link = listing_index.normalize_link(item["link"])
+            if link in stored:
+                copy_details(item, stored[link])
+            else:
+                pending.append(item)
+        counts = index.site_counts[site]
+        print(f"  ♻ {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, {counts['removed']} removed")
+    else:
+        pending = listings
+
+    for i in pending[DESC_AND_IMAGE_FETCH_LIMIT:]:
+        i["description"] = "Not fetched (limit reached)"
+    return pending[:DESC_AND_IMAGE_FETCH_LIMIT]
+
+def skip_details(items):
+    """Mark listings whose detail fetch was skipped because the portal's circuit is open"""
+    for item in items:
+        item["description"] = "Not fetched (site unavailable)"
+    if items:
+        print(f"  🔌 Skipped {len(items)} detail pages — site keeps failing")
+
+def finalize_listings(site, listings):
+    for i in listings:
+        i.pop("fingerprint", None)
+
+    for i in listings:
+        i["source"] = site
+        i["published"] = "N/A"
+        i["category"] = categorize_listing(i["title"], i["link"])
+
+    return listings
+
+def process_site(site):
+    print(f"\n🔍 Processing: {site}")
+    
+    listings = scrape_search_page(site)
 
     print(f"  📋 Found {len(listings)} listings on search page")
 
+    batch = plan_detail_fetches(site, listings)
+
     print(f"  🔎 Fetching details (limit: {DESC_AND_IMAGE_FETCH_LIMIT})...")
     
-    with ThreadPoolExecutor(max_workers=8) as ex:
+    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as ex:
         futures = {
             ex.submit(extract_details_from_listing_page, item["link"]): item 
-            for item in listings[:DESC_AND_IMAGE_FETCH_LIMIT]
+            for item in batch
         }
         
+        skipped = []
         for fut in as_completed(futures):
             item = futures[fut]
             try:
-                details = fut.result()
-                item["description"] = details["description"]
-                item["image_urls"] = details["image_urls"]
-                item["address"] = details["address"]
-                item["agent"] = details["agent"]
-                item["bedrooms"] = details["bedrooms"]
-                item["bathrooms"] = details["bathrooms"]
-                item["city"] = details["city"]
-                
-                img_count = len(details["image_urls"])
-                desc_len = len(details["description"]) if details["description"] else 0
-                if img_count > 0:
-                    print(f"    ✅ {item['title'][:35]} - {img_count} images, {desc_len} chars, {details['bedrooms']}bd {details['bathrooms']}ba")
-                else:
-                    print(f"    ⚠ {item['title'][:35]} - No images, {desc_len} chars")
+                apply_details(site, item, fut.result())
+            except rate_limiter.CircuitOpen:
+                skipped.append(item)
             except Exception as e:
                 print(f"    ❌ Error: {e}")
 
-    for i in listings[DESC_AND_IMAGE_FETCH_LIMIT:]:
-        i["description"] = "Not fetched (limit reached)"
+    skip_details(skipped)
+    return finalize_listings(site, listings)
 
-    for i in listings:
-        i["source"] = site
-        i["published"] = "N/A"
-        i["category"] = categorize_listing(i["title"], i["link"])
+def scrape_sites_threaded(sites, max_threads=MAX_THREADS, on_result=None):
+    """
+    Original engine: one thread per site, each with its own detail executor.
+    `on_result(site, rows, error)` is called as each site finishes.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        futures = {executor.submit(process_site, site): site for site in sites}
+        for fut in as_completed(futures):
+            site = futures[fut]
+            try:
+                rows, error = fut.result(), None
+            except Exception as e:
+                rows, error = [], e
+            results[site] = rows
+            if on_result:
+                on_result(site, rows, error)
+    return results
 
-    return listings
+# ------------------------------- ASYNC ENGINE -------------------------------
+ASYNC_MAX_CONCURRENCY = 64  # Fetches in flight across all sites
+ASYNC_PER_DOMAIN = DETAIL_WORKERS  # Fetches in flight per domain
+
+class FetchBudget:
+    """
+    One global concurrency budget shared by every site, plus a semaphore per
+    domain so a slow portal can only ever hold its own share of the budget.
+    Blocking work (fetch + parse) runs on a single executor sized to the budget.
+    """
+
+    def __init__(self, max_concurrency=ASYNC_MAX_CONCURRENCY, per_domain=ASYNC_PER_DOMAIN):
+        self.per_domain = per_domain
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._domains = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def _domain_semaphore(self, url):
+        domain = urlparse(url).netloc.lower()
+        if domain not in self._domains:
+            self._domains[domain] = asyncio.Semaphore(self.per_domain)
+        return self._domains[domain]
+
+    async def run(self, url, func, *args):
+        # Domain slot first: tasks queued behind a slow domain don't sit on global slots
+        async with self._domain_semaphore(url):
+            if RATE_LIMITING:  # Wait for the domain's rate limit here, not on an executor thread
+                await asyncio.sleep(get_rate_limiter().delay(url))
+            async with self._global:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, func, *args)
 
-# ------------------------------- STREAMLIT UI -------------------------------
-st.set_page_config(page_title="UK Property Dashboard (Enhanced Descriptions)", layout="wide", page_icon="🏠")
-st.title("🏠 UK Property Dashboard — v12 (Enhanced Descriptions & Multiple Images)")
-st.caption("Now extracting comprehensive descriptions formatted as paragraphs + up to 5 high-quality images per property!")
+    def close(self):
+        self.executor.shutdown(wait=True)
 
-st.sidebar.subheader("Settings")
-HEADLESS = st.sidebar.checkbox("Run Selenium headless", value=True)
-max_threads = st.sidebar.slider("Max concurrent sites", 2, 15, MAX_THREADS)
-DESC_AND_IMAGE_FETCH_LIMIT = st.sidebar.slider("Details per site", 10, 50, 30)
-MAX_IMAGES_PER_PROPERTY = st.sidebar.slider("Images per property", 1, 10, 5)
+def apply_detail_results(site, listings, batch, details):
+    """Copy gathered detail results onto their listings (index writes included) and finalize the site"""
+    skipped = []
+    for item, result in zip(batch, details):
+        if isinstance(result, rate_limiter.CircuitOpen):
+            skipped.append(item)
+        elif isinstance(result, Exception):
+            print(f"    ❌ Error: {result}")
+        else:
+            apply_details(site, item, result)
+
+    skip_details(skipped)
+    return finalize_listings(site, listings)
+
+async def process_site_async(site, budget):
+    print(f"\n🔍 Processing: {site}")
+    loop = asyncio.get_running_loop()
 
-data = []
+    listings = await budget.run(site, scrape_search_page, site)
 
-with ThreadPoolExecutor(max_workers=max_threads) as executor:
-    futures = {executor.submit(process_site, site): site for site in AGENT_SITES}
-    for fut in as_completed(futures):
-        site = futures[fut]
+    print(f"  📋 Found {len(listings)} listings on search page")
+    # Index reads/writes are blocking SQLite calls, so they run off the event loop too
+    batch = await loop.run_in_executor(budget.executor, plan_detail_fetches, site, listings)
+    print(f"  🔎 Fetching details (limit: {DESC_AND_IMAGE_FETCH_LIMIT})...")
+
+    details = await asyncio.gather(
+        *(budget.run(item["link"], extract_details_from_listing_page, item["link"]) for item in batch),
+        return_exceptions=True,
+    )
+    return await loop.run_in_executor(budget.executor, apply_detail_results, site, listings, batch, details)
+
+async def _scrape_sites_async(sites, max_concurrency, per_domain, on_result):
+    budget = FetchBudget(max_concurrency, per_domain)
+    results = {}
+
+    async def run_site(site):
         try:
-            rows = fut.result()
-            if rows:
-                total_images = sum(len(r.get('image_urls', [])) for r in rows)
-                st.success(f"✅ {site} — {len(rows)} listings ({total_images} total images)")
-                data.extend(rows)
-            else:
-                st.warning(f"⚠ {site} — no listings found")
+            rows, error = await process_site_async(site, budget), None
         except Exception as e:
-            st.error(f"❌ {site} — error: {e}")
+            rows, error = [], e
+        results[site] = rows
+        if on_result:  # Writes the site's output files, so off the event loop
+            await asyncio.get_running_loop().run_in_executor(budget.executor, on_result, site, rows, error)
 
-if data:
-    df = pd.DataFrame(data)
-    
-    # Convert image_urls list to pipe-separated string for CSV compatibility
-    df['image_urls_str'] = df['image_urls'].apply(lambda x: '|'.join(x) if isinstance(x, list) else '')
-    
-    total = len(df)
-    with_images = sum(1 for urls in df['image_urls'] if isinstance(urls, list) and len(urls) > 0)
-    total_images = sum(len(urls) for urls in df['image_urls'] if isinstance(urls, list))
-    avg_images = total_images / with_images if with_images > 0 else 0
-    
-    st.info(f"📊 Stats: {with_images}/{total} properties have images | {total_images} total images | {avg_images:.1f} avg per property")
-    
-    # Display dataframe with string version of image URLs
-    display_df = df.drop('image_urls', axis=1)
-    
-    st.subheader("📋 All Listings")
-    st.dataframe(display_df, use_container_width=True)
+    try:
+        await asyncio.gather(*(run_site(site) for site in sites))
+    finally:
+        budget.close()
+    return results
 
-    st.subheader("🏠 For Sale Listings")
-    st.dataframe(display_df[display_df["category"] == "For Sale"], use_container_width=True)
+def scrape_sites_async(sites, max_concurrency=ASYNC_MAX_CONCURRENCY, per_domain=ASYNC_PER_DOMAIN, on_result=None):
+    """
+    Async engine: search and detail fetches from every site share one budget.
+    Same `on_result(site, rows, error)` contract as scrape_sites_threaded.
+    """
+    return asyncio.run(_scrape_sites_async(sites, max_concurrency, per_domain, on_result))
+
+# ------------------------------- RUN -------------------------------
+def run_scrape(sites=None, engine="threaded", output_format=output_sink.OUTPUT_FORMAT, on_result=None):
+    """
+    One full scrape of `sites` (default AGENT_SITES) with the "threaded" or
+    "async" engine. Each site's rows go to the output sink as soon as it
+    finishes; `on_result(site, rows, error)` is called after that. Returns
+    the run summary, which is also saved next to the output for the dashboard.
+    """
+    sites = list(sites or AGENT_SITES)
+    started = time.time()
+    sink = output_sink.ListingSink(output_format)
+    per_site = {}
 
-    st.subheader("🏡 For Rent Listings")
-    st.dataframe(display_df[display_df["category"] == "For Rent"], use_container_width=True)
+    # Fetch threads hand raw bodies to parser processes, so parsing isn't serialised on the GIL
+    parse_pool.configure(PARSE_WORKERS)
+    if RATE_LIMITING:
+        get_rate_limiter().reset_stats()
+    _structured_hits.reset()
 
-    # Save with pipe-separated image URLs
-    display_df.to_csv("property_listings_all.csv", index=False)
-    display_df[display_df["category"] == "For Sale"].to_csv("property_listings_sale.csv", index=False)
-    display_df[display_df["category"] == "For Rent"].to_csv("property_listings_rent.csv", index=False)
+    def report_site(site, rows, error):
+        if error:
+            print(f"❌ {site} — error: {error}")
+        elif rows:
+            total_images = sum(len(r.get('image_urls', [])) for r in rows)
+            print(f"✅ {site} — {len(rows)} listings ({total_images} total images)")
+            sink.write(rows)
+        else:
+            print(f"⚠ {site} — no listings found")
+        per_site[site] = {"listings": len(rows), "error": str(error) if error else None}
+        if on_result:
+            on_result(site, rows, error)
 
-    st.success(f"💾 Saved CSVs with comprehensive descriptions and multiple images per property (pipe-separated)!")
-else:
-    st.info("No property data retrieved yet.")
\ No newline at end of file
+    try:
+        if engine == "async":
+            http_session.configure(pool_connections=ASYNC_MAX_CONCURRENCY, pool_maxsize=ASYNC_PER_DOMAIN, headers=HEADERS)
+            scrape_sites_async(sites, on_result=report_site)
+        else:
+            # One keep-alive pool per host, sized to the concurrent sites and detail workers
+            http_session.configure(pool_connections=MAX_THREADS, pool_maxsize=DETAIL_WORKERS, headers=HEADERS)
+            scrape_sites_threaded(sites, max_threads=MAX_THREADS, on_result=report_site)
+    finally:
+        close_driver_pool()
+        sink.close()
+
+    summary = {
+        "started": started,
+        "finished": time.time(),
+        "engine": engine,
+        "format": output_format,
+        "paths": sink.paths(),
+        "stats": sink.stats,
+        "sites": per_site,
+        "http_cache": get_http_cache().summary() if HTTP_CACHE_ENABLED else None,
+        "changes": get_listing_index().site_counts if INCREMENTAL_SCRAPING else {},
+        "rate_limiter": get_rate_limiter().summary() if RATE_LIMITING else None,
+        "rate_limits": get_rate_limiter().domain_stats() if RATE_LIMITING else {},
+        "structured_data": _structured_hits.summary() if STRUCTURED_DATA else None,
+        "structured_hits": _structured_hits.domain_stats() if STRUCTURED_DATA else {},
+    }
+    output_sink.save_run_summary(summary, sink.prefix)
+    stats = sink.stats
+    print(f"📊 {stats['listings']} listings from {len(sites)} sites in {summary['finished'] - started:.0f}s "
+          f"({stats['with_images']} with images, {stats['images']} images) → {', '.join(sink.paths())}")
+    if summary["http_cache"]:
+        print(f"🗄 HTTP cache: {summary['http_cache']}")
+    if summary["rate_limiter"]:
+        print(f"🚦 Rate limiter: {summary['rate_limiter']}")
+    if summary["structured_data"]:
+        print(f"🧩 Structured data: {summary['structured_data']}")
+    return summary
+
+def run_every(minutes, **kwargs):
+    """run_scrape() every `minutes` (measured start to start) until interrupted"""
+    while True:
+        started = time.monotonic()
+        try:
+            run_scrape(**kwargs)
+        except Exception as e:  # A failed run shouldn't end the schedule
+            print(f"❌ Run failed: {e}")
+        wait = minutes * 60 - (time.monotonic() - started)
+        if wait > 0:
+            print(f"⏰ Next run in {wait / 60:.1f} min")
+            time.sleep(wait)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape UK property portals into the listing output files (view them with: streamlit run dashboard.py)")
+    parser.add_argument("mode", choices=["once", "every"], help="run once, or every N minutes until interrupted")
+    parser.add_argument("minutes", nargs="?", type=float, help="interval for 'every'")
+    parser.add_argument("--engine", choices=["threaded", "async"], default="threaded")
+    parser.add_argument("--format", choices=output_sink.formats(), default=output_sink.OUTPUT_FORMAT, help="output format")
+    parser.add_argument("--sites", nargs="+", help="portal URLs to scrape instead of AGENT_SITES")
+    parser.add_argument("--details", type=int, default=DESC_AND_IMAGE_FETCH_LIMIT, help="detail pages fetched per site")
+    parser.add_argument("--images", type=int, default=MAX_IMAGES_PER_PROPERTY, help="images kept per property")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS, help="parser processes (0 = parse on fetch threads)")
+    parser.add_argument("--no-http-cache", action="store_true", help="fetch every page in full")
+    parser.add_argument("--full", action="store_true", help="fetch details of unchanged listings too")
+    parser.add_argument("--no-structured-data", action="store_true", help="always use the DOM heuristics, ignoring embedded JSON")
+    parser.add_argument("--no-rate-limit", action="store_true", help="no per-domain rate limits or circuit breakers")
+    parser.add_argument("--show-browser", action="store_true", help="run Selenium with a visible window")
+    parser.add_argument("--record", metavar="ARCHIVE", help="also record every fetched page for offline replay (replay_archive.py)")
+    args = parser.parse_args()
+    if args.mode == "every" and not args.minutes:
+        parser.error("'every' needs the interval in minutes, e.g. every 60")
+
+    DESC_AND_IMAGE_FETCH_LIMIT = args.details
+    MAX_IMAGES_PER_PROPERTY = args.images
+    PARSE_WORKERS = args.parse_workers
+    HTTP_CACHE_ENABLED = not args.no_http_cache
+    INCREMENTAL_SCRAPING = not args.full
+    RATE_LIMITING = not args.no_rate_limit
+    STRUCTURED_DATA = not args.no_structured_data
+    HEADLESS = not args.show_browser
+    RECORD_ARCHIVE = args.record or RECORD_ARCHIVE
+
+    options = {"sites": args.sites, "engine": args.engine, "output_format": args.format}
+    try:
+        if args.mode == "every":
+            run_every(args.minutes, **options)
+        else:
+            run_scrape(**options)
+    except KeyboardInterrupt:
+        print("⏹ Stopped")
@@ -0,0 +1,270 @@
+import html
+import json
+import math
+import re
+import threading
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import orjson
+except ImportError:  # Optional: same results with the stdlib parser, just slower
+    orjson = None
+
+# ------------------------------- SETTINGS -------------------------------
+# JS globals some portals assign their page state to (window.X = {...})
+STATE_VARIABLES = ["PAGE_MODEL", "jsonModel", "__INITIAL_STATE__", "__PRELOADED_STATE__", "__APOLLO_STATE__"]
+# schema.org types that are a listing by themselves...
+LISTING_TYPES = {
+    "realestatelisting", "residence", "house", "apartment", "singlefamilyresidence",
+    "apartmentcomplex", "gatedresidencecommunity",
+}
+# ...and generic ones that sites also use for their shop, menu or offices: these
+# only count with a price plus an address or bedroom count, like untyped objects
+GENERIC_TYPES = {"accommodation", "product", "individualproduct", "offer", "place"}
+MAX_NODES = 50000  # JSON nodes walked per blob, so huge app states stay cheap
+
+# Keys each listing field is read from, in order of preference
+TITLE_KEYS = ["name", "title", "headline", "propertyTypeFullDescription", "displayTitle"]
+PRICE_KEYS = ["price", "displayPrice", "priceText", "formattedPrice", "lowPrice", "amount"]
+FREQUENCY_KEYS = ["frequency", "priceFrequency", "rentFrequency", "unitText"]
+LINK_KEYS = ["url", "propertyUrl", "detailUrl", "listingUrl", "link", "href"]
+DESCRIPTION_KEYS = ["description", "propertyDescription", "fullDescription", "summary", "text"]
+ADDRESS_KEYS = ["displayAddress", "address", "propertyAddress", "streetAddress"]
+AGENT_KEYS = ["agent", "offeredBy", "seller", "broker", "provider", "agency", "branch", "customer"]
+BEDROOM_KEYS = ["bedrooms", "numberOfBedrooms", "beds", "bedroomCount", "numBedrooms", "numberOfRooms"]
+BATHROOM_KEYS = ["bathrooms", "numberOfBathroomsTotal", "numberOfFullBathrooms", "baths", "bathroomCount", "numBathrooms"]
+IMAGE_KEYS = ["images", "image", "photos", "propertyImages", "photo", "media"]
+NESTED_KEYS = ["mainEntity", "itemOffered", "offers", "priceSpecification", "property", "listing"]
+
+_NAME_KEYS = ["name", "displayName", "branchDisplayName", "brandTradingName", "value", "text"]
+_IMAGE_URL_KEYS = ["url", "contentUrl", "srcUrl", "src", "original", "large", "href", "masterUrl"]
+_FREQUENCIES = {
+    "monthly": " pcm", "month": " pcm", "mon": " pcm", "pcm": " pcm", "per_month": " pcm",
+    "weekly": " pw", "week": " pw", "wk": " pw", "pw": " pw", "per_week": " pw",
+}
+
+_SCRIPT = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.S | re.I)
+_ASSIGNMENT = re.compile(r"\s*(?:window\.|var\s+|let\s+|const\s+)?([\w$]+)\s*=\s*")
+_TAG = re.compile(r"<[^>]+>")
+_MARKERS = ["ld+json", "__NEXT_DATA__", *STATE_VARIABLES]
+
+# ------------------------------- BLOBS -------------------------------
+def loads(text):
+    return orjson.loads(text) if orjson else json.loads(text)
+
+def find_blobs(page):
+    """
+    (kind, data) for every JSON blob embedded in the raw page: "json-ld"
+    scripts, Next.js "next-data" and "state" assignments to STATE_VARIABLES.
+    Works on the HTML string; no tree is built. Unparseable blobs are skipped.
+    """
+    if not any(marker in page for marker in _MARKERS):
+        return []
+    blobs = []
+    for match in _SCRIPT.finditer(page):
+        attrs, body = match.group(1), match.group(2)
+        try:
+            if "ld+json" in attrs:
+                blobs.append(("json-ld", loads(body)))
+            elif "__NEXT_DATA__" in attrs:
+                blobs.append(("next-data", loads(body)))
+            else:
+                assignment = _ASSIGNMENT.match(body)
+                if assignment and assignment.group(1) in STATE_VARIABLES:
+                    # The object is followed by more JS, so it is decoded up to its end only
+                    data, _ = json.JSONDecoder().raw_decode(body, assignment.end())
+                    blobs.append(("state", data))
+        except ValueError:
+            continue
+    return blobs
+
+# ------------------------------- FIELDS -------------------------------
+def _first(views, keys):
+    for view in views:
+        for key in keys:
+            value = view.get(key)
+            if value not in (None, "", [], {}):
+                return value
+    return None
+
+def _text(value):
+    """A plain string from a JSON value; objects give their name-like field"""
+    if isinstance(value, dict):
+        value = _first([value], _NAME_KEYS)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None or isinstance(value, (dict, list, bool)):
+        return ""
+    return html.unescape(_TAG.sub(" ", str(value))).strip()
+
+def _count(value):
+    if isinstance(value, dict):
+        value = value.get("value")
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError, OverflowError):  # OverflowError: "Infinity", "1e400"
+        return ""
+
+def _price(views):
+    value = _first(views, PRICE_KEYS)
+    frequency = _first(views, FREQUENCY_KEYS)
+    if isinstance(value, dict):  # e.g. {"amount": 1250, "frequency": "monthly", "displayPrices": [...]}
+        shown = value.get("displayPrices") or value.get("displayPrice")
+        if isinstance(shown, list) and shown:
+            shown = shown[0].get("displayPrice") if isinstance(shown[0], dict) else shown[0]
+        frequency = value.get("frequency") or frequency
+        value = shown or _first([value], ["amount", "value", "price"])
+    if isinstance(value, str) and "£" in value:
+        return " ".join(value.split())
+    try:
+        amount = float(str(value).replace(",", "").lstrip("£"))
+    except ValueError:
+        return ""
+    if not math.isfinite(amount):
+        return ""
+    return f"£{amount:,.0f}" + _FREQUENCIES.get(_text(frequency).lower(), "")
+
+def _address(views):
+    value = _first(views, ADDRESS_KEYS)
+    if isinstance(value, dict):
+        if value.get("displayAddress"):
+            return _text(value["displayAddress"]), _text(value.get("addressLocality") or value.get("town"))
+        parts = [_text(value.get(k)) for k in ("streetAddress", "addressLocality", "addressRegion", "postalCode")]
+        return ", ".join(p for p in parts if p), parts[1]
+    return _text(value), ""
+
+def _images(value, base_url):
+    if not isinstance(value, list):
+        value = [value]
+    urls = []
+    for item in value:
+        if isinstance(item, dict):
+            item = _first([item], _IMAGE_URL_KEYS)
+        if isinstance(item, str) and item.strip():
+            urls.append(urljoin(base_url, item.strip()))
+    return urls
+
+def _views(obj, depth=2):
+    """The object plus the entities it wraps (JSON-LD nests the residence, its offer and the offer's terms)"""
+    views = [obj]
+    if depth:
+        for key in NESTED_KEYS:
+            nested = obj.get(key)
+            if isinstance(nested, list):
+                nested = nested[0] if nested else None
+            if isinstance(nested, dict):
+                views.extend(_views(nested, depth - 1))
+    return views
+
+def _looks_like_listing(obj):
+    kind = obj.get("@type")
+    if kind is not None:
+        kinds = {str(k).lower() for k in (kind if isinstance(kind, list) else [kind])}
+        if kinds & LISTING_TYPES:
+            return True
+        if not kinds & GENERIC_TYPES:
+            return False
+    views = _views(obj)
+    return (_first(views, PRICE_KEYS) is not None
+            and (_first(views, BEDROOM_KEYS) is not None or _first(views, ADDRESS_KEYS) is not None))
+
+def to_record(obj, base_url):
+    """Map one listing object onto the scraper's field names ("" where the blob has nothing)"""
+    views = _views(obj)
+    address, locality = _address(views)
+    link = _text(_first(views, LINK_KEYS))
+    return {
+        "title": _text(_first(views, TITLE_KEYS)),
+        "price": _price(views),
+        "link": urljoin(base_url, link) if link else "",
+        "description": _text(_first(views, DESCRIPTION_KEYS)),
+        "address": address,
+        "locality": locality,
+        "agent": _text(_first(views, AGENT_KEYS))[:150],
+        "bedrooms": _count(_first(views, BEDROOM_KEYS)),
+        "bathrooms": _count(_first(views, BATHROOM_KEYS)),
+        "image_urls": _images(_first(views, IMAGE_KEYS), base_url),
+    }
+
+# ------------------------------- EXTRACTION -------------------------------
+def _listing_objects(data):
+    """Listing-like objects in a blob, outermost first; a listing's own children aren't searched"""
+    stack, walked = [data], 0
+    while stack and walked < MAX_NODES:
+        node = stack.pop()
+        walked += 1
+        if isinstance(node, dict):
+            if _looks_like_listing(node):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+def extract_records(page, base_url):
+    """
+    (kind, records) from the page's embedded blobs, where kind is the first
+    blob kind that held listings; (None, []) when none did. Records are
+    de-duplicated by link.
+    """
+    kind, records, seen = None, [], set()
+    for blob_kind, data in find_blobs(page):
+        for obj in _listing_objects(data):
+            record = to_record(obj, base_url)
+            key = record["link"] or id(obj)
+            if key in seen:
+                continue
+            seen.add(key)
+            records.append(record)
+            kind = kind or blob_kind
+    return kind, records
+
+def best_record(records, url):
+    """
+    The record describing `url` itself: the one linking to it, else the
+    fullest one without a link. None when every record links elsewhere
+    (e.g. only "similar properties"), so another listing's data is never taken.
+    """
+    path = urlsplit(url).path.rstrip("/")
+    for record in records:
+        if record["link"] and urlsplit(record["link"]).path.rstrip("/") == path:
+            return record
+    unlinked = [record for record in records if not record["link"]]
+    return max(unlinked, key=lambda r: sum(1 for v in r.values() if v), default=None)
+
+# ------------------------------- HIT RATE -------------------------------
+class HitCounter:
+    """Pages per domain whose records came from a blob (by kind) vs the DOM heuristics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._domains = {}
+
+    def count(self, url, kind):
+        host = urlsplit(url).netloc.lower()
+        domain = host[4:] if host.startswith("www.") else host
+        with self._lock:
+            counts = self._domains.setdefault(domain, {"pages": 0, "hits": 0})
+            counts["pages"] += 1
+            if kind != "dom":
+                counts["hits"] += 1
+                counts[kind] = counts.get(kind, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._domains = {}
+
+    def domain_stats(self):
+        with self._lock:
+            return {
+                domain: dict(counts, hit_rate=round(counts["hits"] / counts["pages"], 3))
+                for domain, counts in self._domains.items()
+            }
+
+    def summary(self):
+        stats = self.domain_stats()
+        pages = sum(s["pages"] for s in stats.values())
+        hits = sum(s["hits"] for s in stats.values())
+        with_blobs = sum(1 for s in stats.values() if s["hits"])
+        rate = hits / pages * 100 if pages else 0
+        return f"{hits}/{pages} pages from embedded data ({rate:.0f}%), {with_blobs}/{len(stats)} domains"
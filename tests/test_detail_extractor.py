@@ -0,0 +1,47 @@
+"""The single-pass detail extractor must match the reference extractor field for field."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import html_parsers
+import scraper
+from fixtures import detail_page
+
+URL = "https://www.example-portal.co.uk/property/1"
+
+# Pages that exercise the fallbacks the fixtures don't: meta/og descriptions,
+# feature lists, paragraph text, non-gallery images and address/agent spans
+EDGE_PAGES = [
+    "<html><head><meta name='description' content='" + "A bright two bedroom flat in Leeds with a garden. " * 2 + "'></head>"
+    "<body><span class='address'>Kew Road, Kew</span><img src='/photo.jpg'><img src='/logo.png'></body></html>",
+    "<html><head><meta property='og:description' content='" + "Three bedroom house to rent near Bath, 2 bathrooms. " * 2 + "'></head>"
+    "<body><div class='address-block'>Mill Lane</div><p class='agent'>Hunters</p></body></html>",
+    "<html><body><ul class='key-features'><li>Garden</li><li>Parking</li><li>3 bedrooms</li></ul>"
+    "<img class='property-photo' data-src='/a.jpg'><img class='property-photo' src='/b.jpg' srcset='/b-small.jpg 300w, /b-large.jpg 1200w'>"
+    "<span class='agent-name'>Foxtons</span></body></html>",
+    "<html><body>" + "<p>" + "Lovely period home in Brighton close to the sea front and the station. " * 3 + "</p>" * 3
+    + "<section class='gallery'><img src='/g1.jpg'><img src='/g2.jpg'></section></body></html>",
+    "<html><body><h1 class='listing-title'>1 bed studio</h1><div class='description'>Short.</div></body></html>",
+]
+
+
+def cases():
+    for backend in html_parsers.available_backends():
+        for i in range(40):
+            yield pytest.param(backend, detail_page(i), id=f"{backend}-fixture-{i}")
+        for n, page in enumerate(EDGE_PAGES):
+            yield pytest.param(backend, page, id=f"{backend}-edge-{n}")
+
+
+@pytest.mark.parametrize("backend,page", list(cases()))
+def test_compiled_matches_reference(backend, page):
+    reference = scraper.extract_details_from_soup(html_parsers.make_soup(page, backend), URL)
+    compiled = scraper.extract_details_compiled(html_parsers.make_soup(page, backend), URL)
+    assert compiled.keys() == reference.keys()
+    for field in reference:
+        assert compiled[field] == reference[field], field
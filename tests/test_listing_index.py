@@ -0,0 +1,78 @@
+"""Listing index: failed detail fetches and failed search pages must not be taken as final."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import listing_index
+import scraper
+
+SITE = "https://www.example-portal.co.uk/"
+
+
+def card(i, price="£1,000 pcm"):
+    return {"title": f"Flat {i}", "link": f"{SITE}property/{i}", "fingerprint": listing_index.fingerprint(f"Flat {i}", price)}
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = listing_index.ListingIndex(str(tmp_path / "index.sqlite3"))
+    monkeypatch.setattr(scraper, "_listing_index", index)
+    monkeypatch.setattr(scraper, "INCREMENTAL_SCRAPING", True)
+    yield index
+    index.close()
+
+
+def test_failed_detail_fetch_is_fetched_again(index, monkeypatch):
+    def fail(url, parse):
+        raise scraper.FetchFailed("HTTP 503")
+    monkeypatch.setattr(scraper, "fetch_record", fail)
+
+    item = card(1)
+    details = scraper.extract_details_from_listing_page(item["link"])
+    scraper.apply_details(SITE, item, details)
+    assert item["description"] == "No description available"
+
+    statuses, stored = index.diff(SITE, [card(1)])
+    assert statuses == {listing_index.normalize_link(item["link"]): "changed"}
+    assert stored == {}
+
+
+def test_fetched_details_are_reused(index, monkeypatch):
+    monkeypatch.setattr(scraper, "fetch_record", lambda url, parse: {"description": "Two bed flat", "city": "Leeds"})
+
+    item = card(1)
+    scraper.apply_details(SITE, item, scraper.extract_details_from_listing_page(item["link"]))
+
+    _, stored = index.diff(SITE, [card(1)])
+    assert stored[listing_index.normalize_link(item["link"])]["description"] == "Two bed flat"
+
+
+def test_failed_search_page_keeps_the_index(index, monkeypatch):
+    index.diff(SITE, [card(1), card(2)])
+    index.record(SITE, card(1), {"description": "Two bed flat"})
+    index.record(SITE, card(2), {"description": "Studio"})
+
+    def fail(url, parse):
+        raise scraper.FetchFailed("HTTP 500")
+    monkeypatch.setattr(scraper, "fetch_record", fail)
+    listings = scraper.fallback_scrape(SITE)
+    assert listings == []
+    assert scraper.plan_detail_fetches(SITE, listings) == []
+    index.diff(SITE, listings)
+    assert index.site_counts[SITE]["removed"] == 0
+
+    _, stored = index.diff(SITE, [card(1), card(2)])
+    assert len(stored) == 2
+
+
+def test_search_page_prunes_missing_listings(index):
+    index.record(SITE, card(1), {"description": "Two bed flat"})
+    index.record(SITE, card(2), {"description": "Studio"})
+
+    index.diff(SITE, [card(1)])
+    assert index.site_counts[SITE]["removed"] == 1
+    _, stored = index.diff(SITE, [card(1), card(2)])
+    assert list(stored) == [listing_index.normalize_link(card(1)["link"])]
@@ -0,0 +1,61 @@
+"""Post index: a rebuild only prunes posts once every page of posts was fetched."""
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import post_index
+import uploader
+
+
+def post(i, modified="2026-01-01T00:00:00"):
+    return {"id": i, "title": {"rendered": f"Flat {i}"}, "modified": modified, "acf": {"property_source_url": f"https://x/{i}"}}
+
+
+class Page:
+    def __init__(self, status_code, posts=(), pages=1):
+        self.status_code = status_code
+        self.posts = list(posts)
+        self.headers = {"X-WP-TotalPages": str(pages)}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+    def json(self):
+        return self.posts
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = post_index.PostIndex(str(tmp_path / "posts.sqlite3"))
+    index.rebuild(lambda since: [post(1), post(2), post(3, "2026-02-01T00:00:00")])
+    yield index
+    index.close()
+
+
+def test_failed_page_raises(monkeypatch):
+    pages = {1: Page(200, [post(1)], pages=2), 2: Page(500)}
+    monkeypatch.setattr(uploader, "wp_request", lambda method, url, params, timeout: pages[params["page"]])
+    with pytest.raises(requests.HTTPError):
+        list(uploader.fetch_modified_posts())
+
+
+def test_partial_rebuild_keeps_the_index(index):
+    def fetch_modified(since):
+        yield post(1)
+        raise requests.HTTPError("500 error")
+
+    with pytest.raises(requests.HTTPError):
+        index.rebuild(fetch_modified)
+    assert len(index) == 3
+    assert index.watermark() == "2026-02-01T00:00:00"
+
+
+def test_complete_rebuild_prunes(index):
+    assert sorted(index.rebuild(lambda since: [post(1), post(3)])) == [1, 3]
+    assert len(index) == 2
+    assert index.lookups()[0] == {"flat 1": 1, "flat 3": 3}
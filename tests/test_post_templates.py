@@ -0,0 +1,32 @@
+"""Post bodies and titles: listing text is always HTML-escaped."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import post_templates
+
+SCRIPT = "<script>alert(1)</script>"
+
+
+def test_title_is_escaped():
+    assert post_templates.title(f"Flat & {SCRIPT}") == "Flat &amp; &lt;script&gt;alert(1)&lt;/script&gt;"
+
+
+def test_body_fields_are_escaped():
+    html = post_templates.content(
+        price="£1,000", category="For Rent", city=SCRIPT, address=SCRIPT, bedrooms="2", bathrooms="1",
+        agent=SCRIPT, link='https://x/"><script>', source="https://www.example.co.uk/",
+        description_html=post_templates.description(f"One\n\n{SCRIPT}"),
+        financials_html=post_templates.financials("For Rent", "£1,000", "", "£12,000.00", "", SCRIPT, "", ""),
+        gallery_html=post_templates.gallery([{"url": "a"}, {"url": '"><script>'}]),
+    )
+    assert "<script>" not in html
+    assert "<p>One</p>\n<p>&lt;script&gt;" in html
+    assert "View on www.example.co.uk" in html
+
+
+def test_empty_sections():
+    assert post_templates.gallery([{"url": "a"}]) == ""
+    assert post_templates.financials("For Sale", "£1", "", "", "", "", "", "") == ""
+    assert post_templates.description("Pending") == "No description available for this property."
@@ -0,0 +1,84 @@
+"""Embedded listing data: what counts as a listing, and how detail pages fall back to the DOM."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper
+import structured_data
+
+URL = "https://www.example-portal.co.uk/property/1"
+
+
+def ld(*objects):
+    return "".join(f'<script type="application/ld+json">{json.dumps(obj)}</script>' for obj in objects)
+
+
+def test_site_wide_generic_types_are_not_listings():
+    page = ld(
+        {"@type": "Product", "name": "Premium listing upgrade", "offers": {"@type": "Offer", "price": "49.00"}},
+        {"@type": "Place", "name": "Our Leeds office", "address": "1 Park Row, Leeds"},
+        {"@type": "Organization", "name": "Example Estates", "address": "1 Park Row, Leeds"},
+    )
+    assert structured_data.extract_records(page, URL) == (None, [])
+
+
+def test_generic_types_with_listing_fields_are_listings():
+    page = ld({"@type": "Offer", "price": 1250, "priceCurrency": "GBP",
+               "itemOffered": {"@type": "Accommodation", "numberOfBedrooms": 2, "address": "Kew Road, Kew"}})
+    kind, records = structured_data.extract_records(page, URL)
+    assert kind == "json-ld"
+    assert [(r["price"], r["bedrooms"], r["address"]) for r in records] == [("£1,250", "2", "Kew Road, Kew")]
+
+
+def test_residence_types_are_listings():
+    _, records = structured_data.extract_records(ld({"@type": "House", "name": "3 bed semi"}), URL)
+    assert [r["title"] for r in records] == ["3 bed semi"]
+
+
+def test_description_only_blob_keeps_dom_fields():
+    description = "Bright two bedroom flat close to the station, with a private garden and parking. " * 2
+    page = (
+        "<html><body><h1>2 bed flat</h1><h2 class='property-address'>Kew Road, Kew</h2>"
+        "<ul class='property-gallery'><li><img src='https://media.example-cdn.co.uk/1/0.jpg'></li>"
+        "<li><img src='https://media.example-cdn.co.uk/1/1.jpg'></li></ul>"
+        "<div class='agent-panel'><p class='agent-name'>Foxtons Estate Agents</p></div>"
+        + ld({"@type": "RealEstateListing", "url": "/property/1", "description": description})
+        + "</body></html>"
+    )
+    result = scraper.parse_detail_page(page.encode("utf-8"), "utf-8", URL)
+    assert result["description"].startswith("Bright two bedroom flat")
+    assert result["image_urls"] == ["https://media.example-cdn.co.uk/1/0.jpg", "https://media.example-cdn.co.uk/1/1.jpg"]
+    assert result["address"] == "Kew Road, Kew"
+    assert result["agent"] == "Foxtons Estate Agents"
+    assert result["_extracted"] == "json-ld"
+
+
+def test_similar_listings_only_page_uses_the_dom():
+    similar = {"@type": "ItemList", "itemListElement": [
+        {"@type": "RealEstateListing", "url": "/property/99", "description": "Someone else's house. " * 5,
+         "offeredBy": {"name": "Other Agents"}, "image": ["https://media.example-cdn.co.uk/99/0.jpg"]},
+    ]}
+    page = (
+        "<html><body><h1>2 bed flat</h1><h2 class='property-address'>Kew Road, Kew</h2>"
+        "<div class='agent-panel'><p class='agent-name'>Foxtons Estate Agents</p></div>"
+        + ld(similar) + "</body></html>"
+    )
+    assert scraper.details_from_structured(page, URL) == (None, {})
+    result = scraper.parse_detail_page(page.encode("utf-8"), "utf-8", URL)
+    assert "_extracted" not in result
+    assert result["agent"] == "Foxtons Estate Agents"
+    assert "99" not in " ".join(result["image_urls"])
+
+
+def test_unlinked_record_is_the_page_listing():
+    records = structured_data.extract_records(ld({"@type": "House", "name": "3 bed semi", "description": "Semi"}), URL)[1]
+    assert structured_data.best_record(records, URL)["title"] == "3 bed semi"
+
+
+def test_out_of_range_numbers_are_blank():
+    cards = [{"@type": "Apartment", "url": f"/property/{i}", "name": f"Flat {i}", "price": price, "numberOfBedrooms": beds}
+             for i, (price, beds) in enumerate([("Infinity", "1e400"), ("NaN", "Infinity"), (950, 2)])]
+    _, records = structured_data.extract_records(ld({"@type": "ItemList", "itemListElement": cards}), URL)
+    assert [(r["price"], r["bedrooms"]) for r in records] == [("", ""), ("", ""), ("£950", "2")]
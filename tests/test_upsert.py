@@ -0,0 +1,74 @@
+"""Upsert mode: only the listing's own post is updated, and failed image uploads are retried."""
+import os
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import post_index as post_index_module
+import uploader
+
+ROW = {"title": "2 bed flat", "link": "https://x/property/1", "city": "", "bedrooms": "2", "bathrooms": "1", "image_urls_str": ""}
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    calls = []
+    monkeypatch.setattr(uploader, "UPSERT_MODE", True)
+    monkeypatch.setattr(uploader, "get_journal", lambda: None)
+    monkeypatch.setattr(uploader, "update_listing", lambda row, post_id, executor: calls.append(post_id) or ("updated", 0, 0))
+    return calls
+
+
+def test_link_match_is_updated(updates):
+    status, _, _ = uploader.publish_listing(ROW, 1, 1, {}, {"https://x/property/1": 7}, None)
+    assert (status, updates) == ("updated", [7])
+
+
+def test_title_only_match_is_skipped(updates):
+    status, _, _ = uploader.publish_listing(ROW, 1, 1, {"2 bed flat": 9}, {"https://x/property/2": 9}, None)
+    assert (status, updates) == ("skipped", [])
+
+
+class Response:
+    status_code = 200
+
+
+@pytest.fixture
+def post_index(tmp_path, monkeypatch):
+    index = post_index_module.PostIndex(str(tmp_path / "posts.sqlite3"))
+    monkeypatch.setattr(uploader, "_post_index", index)
+    monkeypatch.setattr(uploader, "get_journal", lambda: None)
+    monkeypatch.setattr(uploader, "wp_write", lambda method, url, payload: Response())
+    index.add(7, "2 bed flat", "https://x/property/1", hashes={"images": "old"})
+    yield index
+    index.close()
+
+
+def listing(images):
+    df = uploader.pd.DataFrame([dict(ROW, image_urls_str=images)])
+    return uploader.prepare_listings(df.reindex(columns=uploader.EXPECTED_COLUMNS, fill_value="N/A"))[0]
+
+
+def uploads(monkeypatch, ok):
+    def start(urls, executor):
+        futures = [Future() for _ in urls]
+        for k, fut in enumerate(futures):
+            fut.set_result({"id": k, "url": urls[k]} if ok else None)
+        return futures
+    monkeypatch.setattr(uploader, "start_image_uploads", start)
+
+
+def test_failed_images_are_retried(post_index, monkeypatch):
+    uploads(monkeypatch, ok=False)
+    assert uploader.update_listing(listing("https://x/a.jpg|https://x/b.jpg"), 7, None)[0] == "updated"
+    assert post_index.hashes(7)["images"] == "old"
+
+
+def test_uploaded_images_are_recorded(post_index, monkeypatch):
+    uploads(monkeypatch, ok=True)
+    row = listing("https://x/a.jpg|https://x/b.jpg")
+    uploader.update_listing(row, 7, None)
+    assert post_index.hashes(7)["images"] == uploader.listing_hashes(row)["images"]
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+# ------------------------------- SETTINGS -------------------------------
+JOURNAL_PATH = ".upload_journal.jsonl"
+
+# ------------------------------- JOURNAL -------------------------------
+class UploadJournal:
+    """
+    Append-only JSON-lines record of what an upload run did, written as it
+    happens so a crash loses at most the line being written:
+
+        run       a run started (or was resumed)
+        image     a media item was uploaded for a source image URL
+        created   a listing's post was created (with the media it references)
+        attached  more media was referenced by a listing's post (gallery, update)
+        done      a listing finished: success, updated, unchanged or skipped
+        failed    a listing failed, with the reason
+        deleted   an orphaned media item was deleted
+
+    Listings are keyed by source link. Only the last run is replayed for
+    resuming; orphan detection looks at every run in the file.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.run_id = None
+        self.rows = {}
+        self.media = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:  # Line cut short by a crash
+                    continue
+
+    def _row(self, key):
+        return self.rows.setdefault(key, {"post_id": None, "status": None, "reason": None})
+
+    def _apply(self, record):
+        event, key = record["event"], record.get("key")
+        if event == "image":
+            self.media[record["source"]] = {"id": record["media_id"], "url": record["media_url"]}
+        elif event in ("created", "attached"):
+            self._row(key)["post_id"] = record["post_id"]
+        elif event == "done":
+            self._row(key).update(status=record["status"], reason=None)
+        elif event == "failed":
+            self._row(key).update(status=None, reason=record["reason"])
+        elif event == "deleted":
+            self.media = {url: m for url, m in self.media.items() if m["id"] != record["media_id"]}
+
+    def start(self, resume=False, source=None):
+        """
+        Begin a new run, or with `resume` continue the last one: its
+        finished listings, created posts and uploaded media are loaded back.
+        Returns the number of listings the resumed run had finished.
+        """
+        with self._lock:
+            self.rows, self.media = {}, {}
+            records = list(self._records())
+            runs = [record["run"] for record in records if record["event"] == "run"]
+            resumed = bool(resume and runs)
+            self.run_id = runs[-1] if resumed else uuid.uuid4().hex[:12]
+            if resumed:
+                for record in records:
+                    if record["run"] == self.run_id or record["event"] == "deleted":
+                        self._apply(record)
+        self._write("run", resumed=resumed, source=source)
+        return sum(1 for row in self.rows.values() if row["status"])
+
+    def _write(self, event, **fields):
+        record = {"event": event, "run": self.run_id, "time": round(time.time(), 3), **fields}
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._apply(record)
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def row(self, key):
+        """{"post_id", "status", "reason"} recorded for a listing in this run, or None"""
+        with self._lock:
+            row = self.rows.get(key)
+            return dict(row) if row else None
+
+    def uploaded(self, source_url):
+        """Media uploaded in this run for a source image URL ({"id", "url"}), or None"""
+        with self._lock:
+            return self.media.get(source_url)
+
+    def image(self, source_url, media):
+        self._write("image", source=source_url, media_id=media["id"], media_url=media["url"])
+
+    def created(self, key, post_id, media_ids):
+        self._write("created", key=key, post_id=post_id, media=list(media_ids))
+
+    def attached(self, key, post_id, media_ids):
+        self._write("attached", key=key, post_id=post_id, media=list(media_ids))
+
+    def done(self, key, status):
+        self._write("done", key=key, status=status)
+
+    def failed(self, key, reason):
+        self._write("failed", key=key, reason=reason)
+
+    def deleted(self, media_id):
+        """Record a deleted orphan; needs no run, so cleanup can run on its own"""
+        self._write("deleted", media_id=media_id)
+
+    def orphans(self):
+        """IDs of media uploaded by any journaled run that no post references and that weren't deleted since"""
+        uploaded, referenced = {}, set()
+        for record in self._records():
+            if record["event"] == "image":
+                uploaded[record["media_id"]] = record["source"]
+            elif record["event"] in ("created", "attached"):
+                referenced.update(record.get("media", []))
+            elif record["event"] == "deleted":
+                uploaded.pop(record["media_id"], None)
+        return sorted(media_id for media_id in uploaded if media_id not in referenced)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
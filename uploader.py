@@ -3,8 +3,21 @@ import requests
 from requests.auth import HTTPBasicAuth
 from io import BytesIO
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from PIL import Image
 import json
+import hashlib
+import argparse
+import os
+
+import http_session
+import image_probe
+import image_transform
+import media_cache
+import post_index
+import post_templates
+import upload_journal
 
 # -------------------------------
 # CONFIGURATION
@@ -25,10 +38,31 @@ CSV_FILES = {
 CSV_FILE = CSV_FILES["sale"]  # Change to "sale" or "rent" as needed
 
 MAX_UPLOADS = 50
-SLEEP_BETWEEN = 2
+IMAGE_WORKERS = 8       # Images downloaded, validated and uploaded at once (across properties)
+POST_WORKERS = 4        # Properties in flight at once
+WP_RATE_LIMIT = 4       # Requests per second to the WordPress host (0 = unlimited)
+WP_MAX_CONCURRENT = 4   # Simultaneous requests to the WordPress host
+WP_MAX_RETRIES = 4      # Retries of a request answered with 429/502/503/504
+BATCH_MODE = True       # Group post creates/updates into /batch/v1 requests when the site allows it
+BATCH_SIZE = 25         # Requests per batch (WordPress' default maximum)
+BATCH_WAIT = 0.5        # Seconds a queued request waits for the batch to fill
+UPSERT_MODE = False     # Update existing posts whose listing changed instead of skipping them (--upsert)
+MEDIA_CACHE_ENABLED = True  # Reuse media already uploaded for the same image (media_cache.py)
+JOURNAL_ENABLED = True  # Record each listing's progress for --resume and orphan cleanup (upload_journal.py)
 MIN_IMAGE_SIZE = 5000
 MIN_IMAGE_WIDTH = 200
 MIN_IMAGE_HEIGHT = 150
+MAX_IMAGE_BYTES = 15 * 1024 * 1024  # Skip larger files without downloading them
+MAX_IMAGE_WIDTH = 10000
+MAX_IMAGE_HEIGHT = 10000
+
+# Optional resize/re-encode before upload (the gallery shows 200px tiles; see image_transform.py)
+TRANSFORM_IMAGES = False      # Off by default: originals are uploaded as-is (--transform-images)
+TRANSFORM_MAX_WIDTH = 1600
+TRANSFORM_MAX_HEIGHT = 1200
+TRANSFORM_FORMAT = "webp"       # "webp" or "jpeg"
+TRANSFORM_QUALITY = 80
+TRANSFORM_WORKERS = os.cpu_count() or 1  # Processes; 0 transforms on the image threads
 
 # ACF Field Mapping (customize these to match your ACF field names)
 ACF_FIELDS = {
@@ -55,23 +89,288 @@ ACF_FIELDS = {
 }
 
 # -------------------------------
-# LOAD DATA
+# WORDPRESS RATE LIMIT
+# -------------------------------
+BACKOFF_MIN_INTERVAL = 0.25  # First pause after the host pushes back (seconds between requests)
+BACKOFF_MAX_INTERVAL = 30.0
+RETRY_STATUSES = {429, 502, 503, 504}
+
+class HostRateLimit:
+    """
+    One budget for every request to the WordPress host: at most `concurrent`
+    in flight and `per_second` started per second, shared by all workers.
+    The rate adapts: a 429/5xx halves it and pauses everyone (for Retry-After
+    if given), and successes bring it back towards `per_second`.
+    """
+
+    def __init__(self, per_second, concurrent):
+        self.base_interval = 1.0 / per_second if per_second else 0.0
+        self.interval = self.base_interval
+        self._slots = threading.BoundedSemaphore(concurrent)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+
+    def backoff(self, retry_after=None):
+        with self._lock:
+            self.interval = min(max(self.interval * 2, BACKOFF_MIN_INTERVAL), BACKOFF_MAX_INTERVAL)
+            pause = retry_after if retry_after is not None else self.interval
+            self._next = max(self._next, time.monotonic() + pause)
+
+    def recover(self):
+        with self._lock:
+            if self.interval > self.base_interval:
+                self.interval *= 0.9
+                if self.interval < max(self.base_interval, BACKOFF_MIN_INTERVAL / 4):
+                    self.interval = self.base_interval
+
+_wp_limit = HostRateLimit(WP_RATE_LIMIT, WP_MAX_CONCURRENT)
+
+def configure_wp_limit():
+    """Rebuild the WordPress budget and the pooled session from the current settings"""
+    global _wp_limit
+    _wp_limit = HostRateLimit(WP_RATE_LIMIT, WP_MAX_CONCURRENT)
+    http_session.configure(pool_connections=POST_WORKERS + IMAGE_WORKERS, pool_maxsize=IMAGE_WORKERS + POST_WORKERS)
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+def wp_request(method, url, **kwargs):
+    """
+    Request to the WordPress REST API within the global rate limit. 429 and
+    gateway errors slow the whole budget down and are retried.
+    """
+    for attempt in range(WP_MAX_RETRIES + 1):
+        with _wp_limit:
+            r = http_session.get_session().request(method, url, auth=HTTPBasicAuth(USERNAME, APP_PASSWORD), **kwargs)
+        if r.status_code == 429 or r.status_code >= 500:
+            _wp_limit.backoff(_retry_after(r))
+            if r.status_code in RETRY_STATUSES and attempt < WP_MAX_RETRIES:
+                print(f"      ⏳ WordPress answered {r.status_code}, backing off ({_wp_limit.interval:.2f}s between requests)")
+                continue
+        else:
+            _wp_limit.recover()
+        return r
+
+# -------------------------------
+# BATCH REQUESTS
+# -------------------------------
+class ItemResponse:
+    """One sub-response of a /batch/v1 reply, with the parts of requests.Response the uploader reads"""
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    @property
+    def text(self):
+        return json.dumps(self.body)
+
+class PostBatcher:
+    """
+    Collects post creates/updates from the worker threads and sends them as
+    WordPress batch requests of up to `size` (or whatever has queued after
+    `wait` seconds). If the site has no batch route, or the post type does
+    not allow batching, every request is sent on its own instead.
+    """
+
+    def __init__(self, api_root, size=BATCH_SIZE, wait=BATCH_WAIT):
+        self.api_root = api_root
+        self.size = size
+        self.wait = wait
+        self.available = True
+        self.stats = {"batches": 0, "items": 0}
+        self._queue = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, method, url, payload):
+        """Queue a JSON request; returns a Future of its response"""
+        fut = Future()
+        with self._cond:
+            self._queue.append((method.upper(), url, payload, fut, time.monotonic()))
+            self._cond.notify()
+        return fut
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._queue and (len(self._queue) >= self.size or self._closed):
+                        break
+                    if self._queue:
+                        remaining = self._queue[0][4] + self.wait - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    elif self._closed:
+                        return
+                    else:
+                        self._cond.wait()
+                items, self._queue = self._queue[:self.size], self._queue[self.size:]
+            try:
+                self._send(items)
+            except Exception as e:
+                for *_, fut, _ in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    def _send_single(self, item):
+        method, url, payload, fut, _ = item
+        fut.set_result(wp_request(method.lower(), url, json=payload, timeout=30))
+
+    def _send(self, items):
+        if not self.available:
+            for item in items:
+                self._send_single(item)
+            return
+
+        requests_ = [
+            {"method": method, "path": url[len(self.api_root):], "body": payload}
+            for method, url, payload, _, _ in items
+        ]
+        r = wp_request("post", f"{self.api_root}/batch/v1", json={"requests": requests_, "validation": "normal"}, timeout=60)
+        if r.status_code in (404, 405) or (r.status_code == 400 and "rest_no_route" in r.text):
+            print("  ℹ Batch API not available, sending posts one by one")
+            self.available = False
+            for item in items:
+                self._send_single(item)
+            return
+        if r.status_code not in (200, 207):
+            for *_, fut, _ in items:
+                fut.set_result(ItemResponse(r.status_code, {"message": r.text[:200]}))
+            return
+
+        self.stats["batches"] += 1
+        responses = r.json().get("responses", [])
+        for item, sub in zip(items, responses):
+            body = sub.get("body")
+            if sub.get("status") == 400 and isinstance(body, dict) and body.get("code") == "rest_batch_not_allowed":
+                self.available = False
+                self._send_single(item)
+            else:
+                self.stats["items"] += 1
+                item[3].set_result(ItemResponse(sub.get("status"), body))
+        for item in items[len(responses):]:
+            item[3].set_result(ItemResponse(500, {"message": "missing from batch response"}))
+
+    def close(self):
+        """Send whatever is still queued and stop the sender thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+_batcher = None
+
+def wp_write(method, url, payload):
+    """Create/update a post: through the batcher when batching, else a direct request"""
+    batcher = _batcher
+    if batcher is not None and batcher.available:
+        return batcher.submit(method, url, payload).result()
+    return wp_request(method, url, json=payload, timeout=30)
+
+# -------------------------------
+# MEDIA CACHE
 # -------------------------------
-print("📂 Loading data from:", CSV_FILE)
-try:
-    df = pd.read_csv(CSV_FILE)
-except Exception as e:
-    print("❌ Failed to read CSV:", e)
-    exit()
+_media_cache = None
+_media_cache_lock = threading.Lock()
+_source_locks = {}
+
+def get_media_cache():
+    global _media_cache
+    with _media_cache_lock:
+        if _media_cache is None:
+            _media_cache = media_cache.MediaCache()
+    return _media_cache
 
-if df.empty:
-    print("⚠ No listings found in CSV.")
-    exit()
+def source_lock(image_url):
+    """One lock per image URL, so a photo shared by listings in flight is uploaded once"""
+    with _media_cache_lock:
+        return _source_locks.setdefault(image_url, threading.Lock())
 
-print(f"✅ Loaded {len(df)} listings from CSV")
+def media_exists(media_ids):
+    """IDs from `media_ids` that still exist in the WordPress media library"""
+    r = wp_request(
+        "get",
+        MEDIA_URL,
+        params={"include": ",".join(map(str, media_ids)), "per_page": len(media_ids), "_fields": "id"},
+        timeout=30
+    )
+    r.raise_for_status()
+    return [m["id"] for m in r.json()]
+
+def gc_media_cache():
+    """Forget cached media IDs that were deleted from WordPress"""
+    cache = get_media_cache()
+    print(f"🧹 Checking {len(cache.media_ids())} cached media IDs against WordPress...")
+    removed = cache.gc(media_exists)
+    print(f"✅ Removed {removed} stale entries")
+
+# -------------------------------
+# UPLOAD JOURNAL
+# -------------------------------
+_journal = None
+_journal_lock = threading.Lock()
+
+def get_journal():
+    """The upload journal, or None when JOURNAL_ENABLED is off"""
+    global _journal
+    if not JOURNAL_ENABLED:
+        return None
+    with _journal_lock:
+        if _journal is None:
+            _journal = upload_journal.UploadJournal()
+    return _journal
 
-# Ensure expected columns exist
-expected_cols = [
+def listing_key(row):
+    return (row["link"] or row["title"]).lower()
+
+def delete_orphan_media():
+    """Delete media a journaled run uploaded but never referenced from a post (e.g. after a crash)"""
+    journal = get_journal()
+    orphans = journal.orphans() if journal else []
+    print(f"🧹 {len(orphans)} uploaded media items are not used by any post")
+    deleted = []
+    for media_id in orphans:
+        try:
+            r = wp_request("delete", f"{MEDIA_URL}/{media_id}", params={"force": "true"}, timeout=30)
+        except Exception as e:
+            print(f"  ❌ {media_id}: {e}")
+            continue
+        if r.status_code in (200, 404, 410):  # Gone already counts as cleaned up
+            journal.deleted(media_id)
+            deleted.append(media_id)
+        else:
+            print(f"  ❌ {media_id}: delete failed ({r.status_code})")
+    if deleted and MEDIA_CACHE_ENABLED:
+        get_media_cache().remove(deleted)
+    print(f"✅ Deleted {len(deleted)} orphaned media items")
+
+# -------------------------------
+# LOAD DATA
+# -------------------------------
+EXPECTED_COLUMNS = [
     "title", "price", "link", "source", "published",
     "category", "image_urls_str", "description", "address", 
     "agent", "bedrooms", "bathrooms", "city",
@@ -80,93 +379,166 @@ expected_cols = [
     "annual_rental_income", "gross_rental_yield", "roi_percentage",
     "estimated_monthly_rent", "metric_status"
 ]
+NUMERIC_ACF_COLUMNS = ["price_numeric", "estimated_property_value", "annual_rental_income", "estimated_monthly_rent"]
+PERCENT_ACF_COLUMNS = ["gross_rental_yield", "roi_percentage"]  # Numeric once the % sign is dropped
+CURRENCY_COLUMNS = ["estimated_property_value", "annual_rental_income", "estimated_monthly_rent"]
+
+def load_listings(csv_file):
+    """Read the scraper CSV, fill missing columns and drop duplicate links"""
+    df = pd.read_csv(csv_file)
+    if df.empty:
+        return df
 
-for col in expected_cols:
-    if col not in df.columns:
-        df[col] = ""
+    print(f"✅ Loaded {len(df)} listings from CSV")
 
-# Clean up N/A and None values
-for col in expected_cols:
-    df[col] = df[col].fillna("N/A").astype(str)
+    # Ensure expected columns exist
+    for col in EXPECTED_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
 
-# Remove exact duplicates
-print(f"📊 Checking for duplicates in CSV...")
-df_before = len(df)
-df = df.drop_duplicates(subset=['link'], keep='first')
-df_after = len(df)
-if df_before > df_after:
-    print(f"⚠ Removed {df_before - df_after} duplicate rows from CSV")
-else:
-    print(f"✅ No duplicates found in CSV")
+    # Clean up N/A and None values
+    for col in EXPECTED_COLUMNS:
+        df[col] = df[col].fillna("N/A").astype(str)
+
+    # Remove exact duplicates
+    print(f"📊 Checking for duplicates in CSV...")
+    df_before = len(df)
+    df = df.drop_duplicates(subset=['link'], keep='first')
+    df_after = len(df)
+    if df_before > df_after:
+        print(f"⚠ Removed {df_before - df_after} duplicate rows from CSV")
+    else:
+        print(f"✅ No duplicates found in CSV")
+    return df
+
+def _text_column(column):
+    """clean_value for a whole column"""
+    stripped = column.fillna("N/A").astype(str).str.strip()
+    return stripped.mask(stripped.str.upper() == "N/A", "")
+
+def _acf_number_column(text, percent=False):
+    """build_acf_data's rule for a cleaned column: a float where the text parses as one, else the text"""
+    numbers = pd.to_numeric(text.str.replace("%", "", regex=False).str.strip() if percent else text, errors="coerce")
+    return text.astype(object).where(numbers.isna(), numbers.astype(float))
+
+def _currency_column(column):
+    """format_financial_value for a whole column"""
+    raw = column.fillna("N/A").astype(str)
+    stripped = raw.str.strip()
+    numbers = pd.to_numeric(raw.str.replace("%", "", regex=False).str.strip(), errors="coerce")
+    shown = raw.astype(object).where(numbers.isna(), numbers.map("£{:,.2f}".format, na_action="ignore"))
+    return shown.mask((stripped == "") | (stripped.str.upper() == "N/A"), "")
+
+def prepare_frame(df):
+    """
+    Vectorised clean-up of a load_listings frame: every expected column as
+    cleaned text, "acf.<field>" with the values build_acf_data sends and
+    "display.<column>" with the formatted currency amounts.
+    """
+    missing = pd.Series("N/A", index=df.index, dtype=object)
+    text = {col: _text_column(df[col] if col in df.columns else missing) for col in EXPECTED_COLUMNS}
+    prepared = dict(text)
+    for field, col in ACF_FIELDS.items():
+        if col in PERCENT_ACF_COLUMNS:
+            prepared[f"acf.{field}"] = _acf_number_column(text[col], percent=True)
+        elif col in NUMERIC_ACF_COLUMNS:
+            prepared[f"acf.{field}"] = _acf_number_column(text[col])
+        else:
+            prepared[f"acf.{field}"] = text[col]
+    for col in CURRENCY_COLUMNS:
+        prepared[f"display.{col}"] = _currency_column(df[col] if col in df.columns else missing)
+    return pd.DataFrame(prepared, index=df.index)
+
+def prepare_listings(df):
+    """prepare_frame as one dict per row; publishing a listing is then only key lookups"""
+    columns = {col: values.tolist() for col, values in prepare_frame(df).items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
 
 # -------------------------------
 # FETCH EXISTING POSTS
 # -------------------------------
-print("🔍 Fetching existing WordPress properties...")
-existing_posts = []
-page = 1
+_post_index = None
 
-while True:
-    try:
-        r = requests.get(
-            WP_URL,
-            params={"per_page": 100, "page": page},
-            auth=HTTPBasicAuth(USERNAME, APP_PASSWORD),
-            timeout=30
-        )
-        if r.status_code != 200:
-            break
+def get_post_index():
+    global _post_index
+    if _post_index is None:
+        _post_index = post_index.PostIndex()
+    return _post_index
+
+def fetch_modified_posts(modified_after=None):
+    """
+    Yield id/title/modified/source URL of properties modified after a
+    timestamp (all if None). A failed page raises instead of ending the
+    listing early, since a short listing would look like deleted posts.
+    """
+    params = {
+        "per_page": 100,
+        "orderby": "modified",
+        "order": "asc",
+        "_fields": "id,title,modified,acf.property_source_url",
+    }
+    if modified_after:
+        params["modified_after"] = modified_after
+    page = 1
+
+    while True:
+        r = wp_request("get", WP_URL, params=dict(params, page=page), timeout=30)
+        r.raise_for_status()
         data = r.json()
         if not data:
             break
-        existing_posts.extend(data)
+        yield from data
+        if page >= int(r.headers.get("X-WP-TotalPages") or page):
+            break
         page += 1
+
+def fetch_existing_posts(rebuild=False):
+    """Return (title -> id, source url -> id) lookups for posts already on WordPress"""
+    index = get_post_index()
+    if rebuild or not len(index):
+        print("🔍 Building local index of WordPress properties...")
+        sync = index.rebuild
+    else:
+        print(f"🔍 Syncing properties modified since {index.watermark()}...")
+        sync = index.sync
+
+    try:
+        fetched = sync(fetch_modified_posts)
+        print(f"  ↻ {len(fetched)} posts fetched")
     except Exception as e:
-        print(f"⚠ Error fetching existing posts: {e}")
-        break
-
-# Build lookup dictionaries for duplicate detection
-existing_titles = {p["title"]["rendered"].strip().lower(): p["id"] for p in existing_posts}
-existing_links = {}
-for p in existing_posts:
-    # Check ACF fields for source URL
-    acf = p.get("acf", {})
-    
-    # --- FIX ---
-    # Check if 'acf' is a dictionary before trying to .get() from it.
-    # The API might return an empty list [] instead of an object {}.
-    if isinstance(acf, dict):
-        source_url = acf.get("property_source_url", "")
-        if source_url:
-            existing_links[source_url.lower()] = p["id"]
-    # --- END FIX ---
+        print(f"⚠ Error fetching existing posts (using local index): {e}")
 
-print(f"📦 Found {len(existing_posts)} existing property posts.")
+    existing_titles, existing_links = index.lookups()
+    print(f"📦 Found {len(index)} existing property posts.")
+    return existing_titles, existing_links
 
 # -------------------------------
 # IMAGE VALIDATION & UPLOAD
 # -------------------------------
-def validate_image_quality(image_content):
-    """Validate image dimensions and quality"""
-    try:
-        img = Image.open(BytesIO(image_content))
-        width, height = img.size
-        
-        print(f"      📐 Dimensions: {width}x{height}px")
-        
-        if width < MIN_IMAGE_WIDTH or height < MIN_IMAGE_HEIGHT:
-            print(f"      ⚠ Too small: {width}x{height}px")
-            return False
-        
-        return True
-    except Exception as e:
-        print(f"      ⚠ Validation error (uploading anyway): {e}")
-        return True
+def validate_image_quality(width, height):
+    """Validate image dimensions"""
+    print(f"      📐 Dimensions: {width}x{height}px")
+    
+    if width < MIN_IMAGE_WIDTH or height < MIN_IMAGE_HEIGHT:
+        print(f"      ⚠ Too small: {width}x{height}px")
+        return False
+
+    if width > MAX_IMAGE_WIDTH or height > MAX_IMAGE_HEIGHT:
+        print(f"      ⚠ Too large: {width}x{height}px")
+        return False
+    
+    return True
 
 def upload_image(image_url, image_index=1):
     """Download and upload a single image to WordPress"""
     if not image_url or image_url.lower() == "n/a":
         return None
+
+    cache = get_media_cache() if MEDIA_CACHE_ENABLED else None
+    cached = cache.by_url(image_url) if cache else None
+    if cached:
+        print(f"    ♻ Image {image_index}: already in media library (ID: {cached['id']})")
+        return cached
     
     print(f"    📥 Image {image_index}: {image_url[:60]}...")
     
@@ -177,7 +549,7 @@ def upload_image(image_url, image_index=1):
             "Referer": image_url.split('/')[0] + '//' + image_url.split('/')[2] if len(image_url.split('/')) > 2 else ""
         }
         
-        img_response = requests.get(
+        img_response = http_session.fetch(
             image_url, 
             headers=headers, 
             allow_redirects=True, 
@@ -187,9 +559,35 @@ def upload_image(image_url, image_index=1):
 
         if img_response.status_code != 200:
             print(f"      ❌ Download failed ({img_response.status_code})")
+            img_response.close()
+            return None
+
+        # Everything that can be decided from headers is checked before reading the body
+        mime_type = img_response.headers.get("Content-Type", "image/jpeg")
+        
+        if not mime_type.startswith("image/"):
+            print(f"      ❌ Invalid MIME: {mime_type}")
+            img_response.close()
+            return None
+
+        declared_size = int(img_response.headers.get("Content-Length") or 0)
+        if declared_size > MAX_IMAGE_BYTES:
+            print(f"      ❌ Too large: {declared_size / (1024 * 1024):.1f} MB")
+            img_response.close()
             return None
 
-        image_content = img_response.content
+        # Then just enough of the body to read the dimensions from the image header
+        chunks, dimensions, stream = image_probe.read_head(img_response)
+        if dimensions and not validate_image_quality(*dimensions):
+            img_response.close()
+            return None
+
+        try:
+            image_content = image_probe.read_rest(chunks, stream, MAX_IMAGE_BYTES)
+        except image_probe.ImageTooLarge as e:
+            print(f"      ❌ Too large: {e}")
+            img_response.close()
+            return None
         
         if not image_content:
             print(f"      ❌ Empty content")
@@ -201,14 +599,33 @@ def upload_image(image_url, image_index=1):
         if image_size < MIN_IMAGE_SIZE:
             print(f"      ⚠ Small file, uploading anyway...")
 
-        if not validate_image_quality(image_content):
-            return None
+        if not dimensions:
+            # Header not recognised: fall back to PIL, which also only reads the header
+            try:
+                if not validate_image_quality(*Image.open(BytesIO(image_content)).size):
+                    return None
+            except Exception as e:
+                print(f"      ⚠ Validation error (uploading anyway): {e}")
 
-        mime_type = img_response.headers.get("Content-Type", "image/jpeg")
-        
-        if not mime_type.startswith("image/"):
-            print(f"      ❌ Invalid MIME: {mime_type}")
-            return None
+        if cache:
+            sha256 = media_cache.content_hash(image_content)
+            try:
+                phash = media_cache.perceptual_hash(image_content)
+            except Exception:
+                phash = None
+            cached = cache.by_content(image_url, sha256, phash)
+            if cached:
+                print(f"      ♻ Same image already in media library (ID: {cached['id']})")
+                return cached
+
+        if TRANSFORM_IMAGES:
+            try:
+                image_content, mime_type = image_transform.shrink(
+                    image_content, mime_type, TRANSFORM_MAX_WIDTH, TRANSFORM_MAX_HEIGHT,
+                    TRANSFORM_FORMAT, TRANSFORM_QUALITY
+                )
+            except Exception as e:
+                print(f"      ⚠ Transform failed (uploading original): {e}")
 
         file_name = image_url.split("/")[-1].split("?")[0] or f"property-image-{image_index}"
         
@@ -220,12 +637,12 @@ def upload_image(image_url, image_index=1):
         elif ("jpeg" in mime_type or "jpg" in mime_type) and not (file_name.endswith(".jpg") or file_name.endswith(".jpeg")):
             file_name = file_name.rsplit(".", 1)[0] + ".jpg"
 
-        files = {'file': (file_name, BytesIO(image_content), mime_type)}
-
-        response = requests.post(
+        # Raw-body upload: the bytes go out as they are, without a multipart copy
+        response = wp_request(
+            "post",
             MEDIA_URL,
-            files=files,
-            auth=HTTPBasicAuth(USERNAME, APP_PASSWORD),
+            data=image_content,
+            headers={"Content-Type": mime_type, "Content-Disposition": f'attachment; filename="{file_name}"'},
             timeout=30
         )
 
@@ -234,6 +651,11 @@ def upload_image(image_url, image_index=1):
             media_id = media_json.get("id")
             media_url = media_json.get("source_url")
             print(f"      ✅ Uploaded (ID: {media_id})")
+            journal = get_journal()
+            if journal:
+                journal.image(image_url, {"id": media_id, "url": media_url})
+            if cache:
+                cache.store(image_url, sha256, phash, {"id": media_id, "url": media_url})
             return {"id": media_id, "url": media_url}
         else:
             print(f"      ❌ Upload failed ({response.status_code}): {response.text[:100]}")
@@ -246,67 +668,42 @@ def upload_image(image_url, image_index=1):
         print(f"      ❌ Error: {e}")
         return None
 
-def upload_multiple_images(image_urls_str):
-    """Parse pipe-separated URLs and upload all images"""
+def split_image_urls(image_urls_str):
+    """Parse pipe-separated image URLs"""
     if not image_urls_str or image_urls_str.lower() == "n/a" or not image_urls_str.strip():
         return []
-    
-    # Split by pipe separator
-    image_urls = [url.strip() for url in image_urls_str.split('|') if url.strip()]
-    
-    if not image_urls:
-        return []
-    
-    print(f"  🖼 Found {len(image_urls)} images to upload")
-    
-    uploaded_images = []
-    for idx, url in enumerate(image_urls, 1):
-        result = upload_image(url, idx)
+    return [url.strip() for url in image_urls_str.split('|') if url.strip()]
+
+def upload_image_once(image_url, image_index=1):
+    with source_lock(image_url):
+        journal = get_journal()
+        uploaded = journal.uploaded(image_url) if journal else None
+        if uploaded:  # Uploaded earlier in this run, or before the crash a resumed run continues
+            print(f"    ♻ Image {image_index}: uploaded before (ID: {uploaded['id']})")
+            return uploaded
+        return upload_image(image_url, image_index)
+
+def start_image_uploads(image_urls, executor):
+    """Queue every image of a property on the shared image executor; futures keep the URL order"""
+    if image_urls:
+        print(f"  🖼 Found {len(image_urls)} images to upload")
+    return [executor.submit(upload_image_once, url, idx) for idx, url in enumerate(image_urls, 1)]
+
+def first_uploaded_image(futures):
+    """Wait only as far as the first image that uploads (the featured image)"""
+    for fut in futures:
+        result = fut.result()
         if result:
-            uploaded_images.append(result)
-        time.sleep(0.5)  # Small delay between images
-    
-    return uploaded_images
+            return result
+    return None
 
 def build_image_gallery_html(images):
     """Build HTML gallery for additional images (after featured image)"""
-    if len(images) <= 1:
-        return ""
-    
-    gallery_html = '<div class="property-gallery" style="margin: 20px 0;">\n'
-    gallery_html += '<h3>📸 Property Gallery</h3>\n'
-    gallery_html += '<div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(250px, 1fr)); gap: 15px; margin-top: 15px;">\n'
-    
-    # Skip first image (it's the featured image)
-    for img in images[1:]:
-        gallery_html += f'''
-        <div style="border: 1px solid #ddd; border-radius: 5px; overflow: hidden;">
-            <img src="{img["url"]}" alt="Property Image" style="width: 100%; height: 200px; object-fit: cover;" loading="lazy" />
-        </div>\n'''
-    
-    gallery_html += '</div>\n</div>\n'
-    return gallery_html
+    return post_templates.gallery(images)
 
 def format_description_for_display(description):
     """Format description with proper paragraph breaks"""
-    if not description or description.lower() in ["n/a", "no description available", "not fetched (limit reached)", "pending"]:
-        return "No description available for this property."
-    
-    description = str(description).strip()
-    
-    # If description already has paragraph breaks (from enhanced scraper), wrap in paragraph tags
-    if "\n\n" in description:
-        # Split into paragraphs and wrap each
-        paragraphs = description.split("\n\n")
-        formatted = ""
-        for para in paragraphs:
-            para = para.strip()
-            if para:
-                formatted += f"<p>{para}</p>\n"
-        return formatted
-    else:
-        # Single block - wrap in paragraph tag
-        return f"<p>{description}</p>"
+    return post_templates.description(description)
 
 def clean_value(value):
     """Clean N/A values and convert to proper format"""
@@ -333,310 +730,348 @@ def format_financial_value(value, is_percentage=False):
         return str(value)
 
 def build_acf_data(row):
-    """Build ACF fields data from CSV row"""
-    acf_data = {}
-    
-    for acf_field_name, csv_column in ACF_FIELDS.items():
-        value = row.get(csv_column, "")
-        
-        # Handle special formatting for specific fields
-        if csv_column in ["gross_rental_yield", "roi_percentage"]:
-            # These might already be formatted with %, extract numeric value
-            clean_val = clean_value(value)
-            if clean_val:
-                try:
-                    numeric_val = float(clean_val.replace("%", "").strip())
-                    acf_data[acf_field_name] = numeric_val
-                except:
-                    acf_data[acf_field_name] = clean_val
-            else:
-                acf_data[acf_field_name] = ""
-                
-        elif csv_column in ["price_numeric", "estimated_property_value", "annual_rental_income", "estimated_monthly_rent"]:
-            # Numeric financial fields
-            clean_val = clean_value(value)
-            if clean_val:
-                try:
-                    acf_data[acf_field_name] = float(clean_val)
-                except:
-                    acf_data[acf_field_name] = clean_val
-            else:
-                acf_data[acf_field_name] = ""
-        else:
-            # Regular text fields
-            acf_data[acf_field_name] = clean_value(value)
-    
-    return acf_data
+    """ACF fields for a listing prepared by prepare_listings"""
+    return {field: row[f"acf.{field}"] for field in ACF_FIELDS}
 
 def build_financial_metrics_html(row):
     """Build HTML section for financial metrics"""
-    category = row.get("category", "Unknown")
-    
-    # Extract values
-    price = clean_value(row.get("price", "N/A"))
-    estimated_value = format_financial_value(row.get("estimated_property_value"))
-    annual_rent = format_financial_value(row.get("annual_rental_income"))
-    rental_yield = clean_value(row.get("gross_rental_yield", "N/A"))
-    roi = clean_value(row.get("roi_percentage", "N/A"))
-    monthly_rent = format_financial_value(row.get("estimated_monthly_rent"))
-    metric_status = clean_value(row.get("metric_status", "N/A"))
-    
-    # Don't show section if no meaningful data
-    if not any([estimated_value, annual_rent, rental_yield, roi, monthly_rent]):
-        return ""
-    
-    html = '<div class="property-financials" style="background: #f9f9f9; padding: 20px; border-radius: 5px; margin: 20px 0;">\n'
-    html += '<h3>💰 Investment Metrics</h3>\n'
-    html += '<table style="width:100%; border-collapse: collapse;">\n'
-    
-    if category == "For Rent":
-        html += f'''
-        <tr style="border: 1px solid #ddd;">
-            <td style="padding: 8px; font-weight: bold; width: 40%;">Monthly Rent:</td>
-            <td style="padding: 8px;">{price}</td>
-        </tr>
-        '''
-        if annual_rent:
-            html += f'''
-            <tr style="border: 1px solid #ddd; background-color: #fff;">
-                <td style="padding: 8px; font-weight: bold;">Annual Rental Income:</td>
-                <td style="padding: 8px;">{annual_rent}</td>
-            </tr>
-            '''
-        if estimated_value:
-            html += f'''
-            <tr style="border: 1px solid #ddd;">
-                <td style="padding: 8px; font-weight: bold;">Estimated Property Value:</td>
-                <td style="padding: 8px;">{estimated_value}</td>
-            </tr>
-            '''
-    else:  # For Sale
-        html += f'''
-        <tr style="border: 1px solid #ddd;">
-            <td style="padding: 8px; font-weight: bold; width: 40%;">Asking Price:</td>
-            <td style="padding: 8px;">{price}</td>
-        </tr>
-        '''
-        if monthly_rent:
-            html += f'''
-            <tr style="border: 1px solid #ddd; background-color: #fff;">
-                <td style="padding: 8px; font-weight: bold;">Estimated Monthly Rent:</td>
-                <td style="padding: 8px;">{monthly_rent}</td>
-            </tr>
-            '''
-        if annual_rent:
-            html += f'''
-            <tr style="border: 1px solid #ddd;">
-                <td style="padding: 8px; font-weight: bold;">Estimated Annual Income:</td>
-                <td style="padding: 8px;">{annual_rent}</td>
-            </tr>
-            '''
-    
-    if rental_yield and rental_yield != "N/A":
-        html += f'''
-        <tr style="border: 1px solid #ddd; background-color: #fff;">
-            <td style="padding: 8px; font-weight: bold;">Gross Rental Yield:</td>
-            <td style="padding: 8px; color: #28a745; font-weight: bold;">{rental_yield}</td>
-        </tr>
-        '''
-    
-    if roi and roi != "N/A":
-        html += f'''
-        <tr style="border: 1px solid #ddd;">
-            <td style="padding: 8px; font-weight: bold;">ROI:</td>
-            <td style="padding: 8px; color: #28a745; font-weight: bold;">{roi}</td>
-        </tr>
-        '''
-    
-    if metric_status and metric_status != "N/A":
-        html += f'''
-        <tr style="border: 1px solid #ddd; background-color: #fff;">
-            <td style="padding: 8px; font-weight: bold;">Calculation Method:</td>
-            <td style="padding: 8px; font-size: 0.9em; color: #666;">{metric_status}</td>
-        </tr>
-        '''
-    
-    html += '</table>\n'
-    html += '<p style="margin-top: 15px; font-size: 0.85em; color: #666;"><em>💡 Note: Investment metrics are estimates based on market averages and should be verified independently.</em></p>\n'
-    html += '</div>\n'
-    
-    return html
+    return post_templates.financials(
+        category=row["category"],
+        price=row["price"],
+        estimated_value=row["display.estimated_property_value"],
+        annual_rent=row["display.annual_rental_income"],
+        monthly_rent=row["display.estimated_monthly_rent"],
+        rental_yield=row["gross_rental_yield"],
+        roi=row["roi_percentage"],
+        metric_status=row["metric_status"],
+    )
 
 # -------------------------------
 # POST LISTINGS TO WORDPRESS
 # -------------------------------
-success, skipped, failed = 0, 0, 0
-total_images_uploaded = 0
-total_images_failed = 0
-
-print("\n" + "="*70)
-print("🚀 STARTING WORDPRESS UPLOAD WITH ACF FIELDS")
-print("="*70 + "\n")
-
-for idx, row in df.head(MAX_UPLOADS).iterrows():
-    title = clean_value(row.get("title", ""))
-    price = clean_value(row.get("price", ""))
-    link = clean_value(row.get("link", ""))
-    source = clean_value(row.get("source", ""))
-    category = clean_value(row.get("category", "Unknown"))
-    image_urls_str = clean_value(row.get("image_urls_str", ""))
-    description = clean_value(row.get("description", "No description available"))
-    address = clean_value(row.get("address", ""))
-    agent = clean_value(row.get("agent", ""))
-    bedrooms = clean_value(row.get("bedrooms", ""))
-    bathrooms = clean_value(row.get("bathrooms", ""))
-    city = clean_value(row.get("city", ""))
-
-    print(f"\n{'='*70}")
-    print(f"[{idx + 1}/{min(MAX_UPLOADS, len(df))}] {title[:60]}")
-    print(f"{'='*70}")
+def build_content_html(row, uploaded_images):
+    """Full post body for a prepared listing; the gallery holds every image after the featured one"""
+    return post_templates.content(
+        price=row["price"],
+        category=row["category"],
+        city=row["city"],
+        address=row["address"],
+        bedrooms=row["bedrooms"],
+        bathrooms=row["bathrooms"],
+        agent=row["agent"],
+        link=row["link"],
+        source=row["source"],
+        description_html=format_description_for_display(row["description"]),
+        financials_html=build_financial_metrics_html(row),
+        gallery_html=build_image_gallery_html(uploaded_images),
+    )
+
+def publish_listing(row, position, total, existing_titles, existing_links, image_executor):
+    """
+    Upload one listing. Its images are queued on the shared image executor;
+    the post is created as soon as the featured image is in, and the
+    gallery is added once the remaining images finish. Progress goes to the
+    upload journal, so a resumed run skips finished listings and only adds
+    the gallery to posts created before a crash.
+
+    Returns (status, images_uploaded, images_failed) with status one of
+    "success", "updated", "unchanged", "skipped", "resumed" or "failed".
+    """
+    title = row["title"]
+    link = row["link"]
+    city = row["city"]
+    bedrooms = row["bedrooms"]
+    bathrooms = row["bathrooms"]
+    image_urls_str = row["image_urls_str"]
+
+    print(f"\n[{position}/{total}] {title[:60]}")
     
     if not title or not link:
         print("⚠ Missing title or link, skipping...")
-        skipped += 1
-        continue
-
-    # Skip duplicates
-    if title.lower() in existing_titles or link.lower() in existing_links:
-        print(f"⏭ Already exists, skipping")
-        skipped += 1
-        continue
-
-    # Upload all images
-    uploaded_images = []
-    if image_urls_str:
-        uploaded_images = upload_multiple_images(image_urls_str)
-        total_images_uploaded += len(uploaded_images)
-        
-        # Count how many failed
-        num_urls = len([u for u in image_urls_str.split('|') if u.strip()])
-        total_images_failed += (num_urls - len(uploaded_images))
-    else:
+        return "skipped", 0, 0
+
+    journal = get_journal()
+    key = listing_key(row)
+    journaled = journal.row(key) if journal else None
+    if journaled and journaled["status"]:
+        print(f"⏩ Done before the restart ({journaled['status']}), skipping")
+        return "resumed", 0, 0
+    prop_id = journaled["post_id"] if journaled else None
+
+    # Skip duplicates (or update them in upsert mode); a post this run created isn't one.
+    # Only a source-link match is this listing's post: titles like "2 bed flat" repeat
+    linked_id = None if prop_id else existing_links.get(link.lower())
+    existing_id = linked_id or (None if prop_id else existing_titles.get(title.lower()))
+    if existing_id:
+        if UPSERT_MODE and linked_id:
+            status, uploaded, failed = update_listing(row, existing_id, image_executor)
+        else:
+            print(f"⏭ Already exists, skipping")
+            status, uploaded, failed = "skipped", 0, 0
+        if journal:
+            if status == "failed":
+                journal.failed(key, f"update of post {existing_id} failed")
+            else:
+                journal.done(key, status)
+        return status, uploaded, failed
+
+    image_urls = split_image_urls(image_urls_str)
+    futures = start_image_uploads(image_urls, image_executor)
+    if not image_urls:
         print("  ℹ No images available")
 
-    # Set featured image (first uploaded image)
-    featured_media_id = None
-    if uploaded_images:
-        featured_media_id = uploaded_images[0]["id"]
-        print(f"  ⭐ Featured image set (ID: {featured_media_id})")
+    status = "failed"
+    reason = None
+    if prop_id:
+        print(f"  ⏩ Post created before the restart (ID: {prop_id}), finishing its gallery")
+        status = "success"
+    else:
+        # Set featured image (first uploaded image)
+        featured = first_uploaded_image(futures)
+        featured_media_id = featured["id"] if featured else None
+        if featured_media_id:
+            print(f"  ⭐ Featured image set (ID: {featured_media_id})")
 
-    # Build image gallery HTML (for images after the first one)
-    gallery_html = build_image_gallery_html(uploaded_images)
+        # Prepare post data
+        post_data = {
+            "title": post_templates.title(title),
+            "status": "publish",
+            "content": build_content_html(row, [featured] if featured else []),
+            "acf": build_acf_data(row)
+        }
 
-    # Format description properly
-    formatted_description = format_description_for_display(description)
-    
-    # Build financial metrics HTML
-    financial_html = build_financial_metrics_html(row)
-
-    # Build full content HTML
-    content_html = f"""
-        <div class="property-details">
-            <h3>📋 Property Information</h3>
-            <table style="width:100%; border-collapse: collapse;">
-                <tr style="border: 1px solid #ddd;">
-                    <td style="padding: 8px; font-weight: bold; width: 30%;">Price:</td>
-                    <td style="padding: 8px;">{price if price else 'Contact for price'}</td>
-                </tr>
-                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
-                    <td style="padding: 8px; font-weight: bold;">Category:</td>
-                    <td style="padding: 8px;"><span style="background: #007bff; color: white; padding: 3px 10px; border-radius: 3px;">{category}</span></td>
-                </tr>
-                <tr style="border: 1px solid #ddd;">
-                    <td style="padding: 8px; font-weight: bold;">Location:</td>
-                    <td style="padding: 8px;">{city if city else 'Not specified'}</td>
-                </tr>
-                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
-                    <td style="padding: 8px; font-weight: bold;">Address:</td>
-                    <td style="padding: 8px;">{address if address else 'Not available'}</td>
-                </tr>
-                <tr style="border: 1px solid #ddd;">
-                    <td style="padding: 8px; font-weight: bold;">Bedrooms:</td>
-                    <td style="padding: 8px;">{bedrooms if bedrooms else 'Not specified'}</td>
-                </tr>
-                <tr style="border: 1px solid #ddd; background-color: #f9f9f9;">
-                    <td style="padding: 8px; font-weight: bold;">Bathrooms:</td>
-                    <td style="padding: 8px;">{bathrooms if bathrooms else 'Not specified'}</td>
-                </tr>
-                <tr style="border: 1px solid #ddd;">
-                    <td style="padding: 8px; font-weight: bold;">Agent/Publisher:</td>
-                    <td style="padding: 8px;">{agent if agent else 'Not specified'}</td>
-                </tr>
-            </table>
-            
-            {financial_html}
-            
-            {gallery_html}
-            
-            <hr style="margin: 20px 0;">
-            
-            <h3>🏠 Property Description</h3>
-            {formatted_description}
-            
-            <hr style="margin: 20px 0;">
+        if featured_media_id:
+            post_data["featured_media"] = featured_media_id
+
+        try:
+            print(f"  📤 Publishing to WordPress with ACF fields...")
+            r = wp_write("post", WP_URL, post_data)
             
-            <p><strong>🔗 Original Listing:</strong> <a href="{link}" target="_blank" rel="noopener">View on {source.split('//')[1].split('/')[0] if '//' in source else source}</a></p>
-        </div>
-    """
+            if r.status_code == 201:
+                created = r.json()
+                prop_id = created.get("id")
+                if journal:
+                    journal.created(key, prop_id, [featured_media_id] if featured_media_id else [])
+                get_post_index().add(prop_id, title, link, created.get("modified"), listing_hashes(row))
+                status = "success"
+            elif r.status_code == 400 and "existing" in r.text.lower():
+                print(f"  ⚠ Duplicate detected by WordPress")
+                status = "skipped"
+            else:
+                print(f"  ❌ Failed ({r.status_code})")
+                print(f"     {r.text[:200]}")
+                reason = f"HTTP {r.status_code}: {r.text[:200]}"
+        except Exception as e:
+            print(f"  ❌ Error: {e}")
+            reason = str(e)
 
-    # Build ACF data
-    acf_data = build_acf_data(row)
+    # The rest of the images keep uploading while the post is created
+    uploaded_images = [img for img in (fut.result() for fut in futures) if img]
+
+    if prop_id and len(uploaded_images) > 1:
+        try:
+            r = wp_write("post", f"{WP_URL}/{prop_id}", {"content": build_content_html(row, uploaded_images)})
+            if r.status_code == 200:
+                if journal:
+                    journal.attached(key, prop_id, [img["id"] for img in uploaded_images])
+            else:
+                print(f"  ⚠ Gallery update failed ({r.status_code})")
+        except Exception as e:
+            print(f"  ⚠ Gallery update error: {e}")
+
+    if journal:
+        if status == "failed":
+            journal.failed(key, reason or "unknown error")
+        else:
+            journal.done(key, status)
+
+    if status == "success":
+        print(f"  ✅ SUCCESS! {title[:40]} (ID: {prop_id})")
+        print(f"     📍 {city if city else 'N/A'} | 🛏 {bedrooms if bedrooms else 'N/A'}bd | 🛁 {bathrooms if bathrooms else 'N/A'}ba | 🖼 {len(uploaded_images)} images")
+        print(f"     💰 Yield: {row['gross_rental_yield'] or 'N/A'} | ROI: {row['roi_percentage'] or 'N/A'}")
+
+    return status, len(uploaded_images), len(image_urls) - len(uploaded_images)
 
-    # Prepare post data
-    post_data = {
-        "title": title,
-        "status": "publish",
-        "content": content_html,
-        "acf": acf_data
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def listing_hashes(row):
+    """Hash of each part of a post built from a prepared listing: title, body, image list and every ACF field"""
+    hashes = {
+        "title": _digest(post_templates.title(row["title"])),
+        "content": _digest(build_content_html(row, [])),
+        "images": _digest(split_image_urls(row["image_urls_str"])),
     }
+    for field, value in build_acf_data(row).items():
+        hashes[f"acf.{field}"] = _digest(value)
+    return hashes
+
+def update_listing(row, post_id, image_executor):
+    """
+    Upsert path for a listing that already has a post: compare its hashes to
+    the ones stored when the post was last written and PATCH only the parts
+    that changed. Unchanged listings make no requests at all.
+    """
+    index = get_post_index()
+    hashes = listing_hashes(row)
+    stored = index.hashes(post_id) or {}
+    changed = {part for part, digest in hashes.items() if stored.get(part) != digest}
+    if not changed:
+        print(f"  ⏸ Unchanged (ID: {post_id})")
+        return "unchanged", 0, 0
 
-    if featured_media_id:
-        post_data["featured_media"] = featured_media_id
+    payload = {}
+    image_urls, uploaded_images = [], []
+    if "title" in changed:
+        payload["title"] = post_templates.title(row["title"])
+    if changed & {"content", "images"}:
+        # Images already uploaded come straight from the media cache
+        image_urls = split_image_urls(row["image_urls_str"])
+        uploaded_images = [img for img in (fut.result() for fut in start_image_uploads(image_urls, image_executor)) if img]
+        payload["content"] = build_content_html(row, uploaded_images)
+        if "images" in changed and uploaded_images:
+            payload["featured_media"] = uploaded_images[0]["id"]
+    acf_data = build_acf_data(row)
+    acf_changed = {part[4:]: acf_data[part[4:]] for part in changed if part.startswith("acf.")}
+    if acf_changed:
+        payload["acf"] = acf_changed
 
     try:
-        print(f"  📤 Publishing to WordPress with ACF fields...")
-        r = requests.post(
-            WP_URL, 
-            json=post_data, 
-            auth=HTTPBasicAuth(USERNAME, APP_PASSWORD),
-            timeout=30
-        )
-        
-        if r.status_code == 201:
-            prop_id = r.json().get("id")
-            print(f"  ✅ SUCCESS! (ID: {prop_id})")
-            print(f"     📍 {city if city else 'N/A'} | 🛏 {bedrooms if bedrooms else 'N/A'}bd | 🛁 {bathrooms if bathrooms else 'N/A'}ba | 🖼 {len(uploaded_images)} images")
-            print(f"     💰 Yield: {row.get('gross_rental_yield', 'N/A')} | ROI: {row.get('roi_percentage', 'N/A')}")
-            success += 1
-        elif r.status_code == 400 and "existing" in r.text.lower():
-            print(f"  ⚠ Duplicate detected by WordPress")
-            skipped += 1
-        else:
-            print(f"  ❌ Failed ({r.status_code})")
-            print(f"     {r.text[:200]}")
-            failed += 1
+        print(f"  🔄 Updating {', '.join(sorted(payload))} (ID: {post_id})...")
+        r = wp_write("patch", f"{WP_URL}/{post_id}", payload)
+        if r.status_code == 200:
+            if len(uploaded_images) < len(image_urls):
+                # Keep the old image hash, so the missing images are retried next run
+                hashes["images"] = stored.get("images")
+            index.set_hashes(post_id, hashes)
+            journal = get_journal()
+            if journal and uploaded_images:
+                journal.attached(listing_key(row), post_id, [img["id"] for img in uploaded_images])
+            return "updated", len(uploaded_images), len(image_urls) - len(uploaded_images)
+        print(f"  ❌ Update failed ({r.status_code})")
+        print(f"     {r.text[:200]}")
     except Exception as e:
         print(f"  ❌ Error: {e}")
-        failed += 1
+    return "failed", len(uploaded_images), len(image_urls) - len(uploaded_images)
+
+def upload_listings(df, existing_titles, existing_links, resume=False):
+    """
+    Publish the first MAX_UPLOADS rows: POST_WORKERS properties in flight,
+    IMAGE_WORKERS image transfers shared between them, and every WordPress
+    request inside the WP_RATE_LIMIT / WP_MAX_CONCURRENT budget. In batch
+    mode enough properties are kept in flight to fill a batch. With `resume`
+    the last journaled run is continued instead of starting a new one.
+    """
+    global _batcher
+    configure_wp_limit()
+    post_workers = POST_WORKERS
+    if BATCH_MODE:
+        _batcher = PostBatcher(WP_URL.split("/wp/v2/")[0])
+        post_workers = max(POST_WORKERS, BATCH_SIZE)
+    image_transform.configure(TRANSFORM_WORKERS if TRANSFORM_IMAGES else 0)
+    image_transform.reset_stats()
+    stats = {"success": 0, "updated": 0, "unchanged": 0, "skipped": 0, "resumed": 0, "failed": 0, "images_uploaded": 0, "images_failed": 0}
+    rows = prepare_listings(df.head(MAX_UPLOADS))
+    journal = get_journal()
+    if journal:
+        finished = journal.start(resume, source=CSV_FILE)
+        if resume:
+            print(f"⏩ Resuming run {journal.run_id}: {finished} listings already done")
 
-    time.sleep(SLEEP_BETWEEN)
+    try:
+        with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as image_executor, \
+                ThreadPoolExecutor(max_workers=post_workers) as post_executor:
+            futures = [
+                post_executor.submit(publish_listing, row, position, len(rows), existing_titles, existing_links, image_executor)
+                for position, row in enumerate(rows, 1)
+            ]
+            for fut in as_completed(futures):
+                status, uploaded, failed = fut.result()
+                stats[status] += 1
+                stats["images_uploaded"] += uploaded
+                stats["images_failed"] += failed
+    finally:
+        if _batcher is not None:
+            _batcher.close()
+            stats["batches"] = _batcher.stats["batches"]
+            _batcher = None
+        image_transform.shutdown()
+        if journal:
+            journal.close()
+    return stats
 
 # -------------------------------
 # SUMMARY
 # -------------------------------
-print("\n" + "="*70)
-print("📊 FINAL SUMMARY")
-print("="*70)
-print(f"✅ Successfully uploaded: {success} properties")
-print(f"🖼 Total images uploaded: {total_images_uploaded}")
-print(f"⚠ Images failed: {total_images_failed}")
-print(f"📊 Average images per property: {total_images_uploaded/success:.1f}" if success > 0 else "📊 No successful uploads")
-print(f"⏭ Skipped (duplicates): {skipped}")
-print(f"❌ Failed: {failed}")
-print("="*70)
-print("\n📋 ACF Fields Populated:")
-for acf_field in ACF_FIELDS.keys():
-    print(f"   ✓ {acf_field}")
-print("="*70)
-print("🏁 Upload complete!")
-print("="*70)
\ No newline at end of file
+def print_summary(stats):
+    success = stats["success"]
+    total_images_uploaded = stats["images_uploaded"]
+    print("\n" + "="*70)
+    print("📊 FINAL SUMMARY")
+    print("="*70)
+    print(f"✅ Successfully uploaded: {success} properties")
+    print(f"🖼 Total images uploaded: {total_images_uploaded}")
+    print(f"⚠ Images failed: {stats['images_failed']}")
+    print(f"📊 Average images per property: {total_images_uploaded/success:.1f}" if success > 0 else "📊 No successful uploads")
+    if UPSERT_MODE:
+        print(f"🔄 Updated: {stats['updated']} | ⏸ Unchanged: {stats['unchanged']}")
+    print(f"⏭ Skipped (duplicates): {stats['skipped']}")
+    if stats.get("resumed"):
+        print(f"⏩ Done before the restart: {stats['resumed']}")
+    print(f"❌ Failed: {stats['failed']}")
+    if stats.get("batches"):
+        print(f"📦 Sent in {stats['batches']} batch requests")
+    if MEDIA_CACHE_ENABLED:
+        print(f"♻ Media cache: {get_media_cache().summary()}")
+    if TRANSFORM_IMAGES:
+        print(f"🗜 Image transform: {image_transform.summary()}")
+    print("="*70)
+    print("\n📋 ACF Fields Populated:")
+    for acf_field in ACF_FIELDS.keys():
+        print(f"   ✓ {acf_field}")
+    print("="*70)
+    print("🏁 Upload complete!")
+    print("="*70)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload scraped listings to WordPress")
+    parser.add_argument("--gc-media-cache", action="store_true", help="drop cached media IDs deleted from WordPress, then exit")
+    parser.add_argument("--upsert", action="store_true", help="update existing posts whose listing changed instead of skipping them")
+    parser.add_argument("--rebuild-post-index", action="store_true", help="re-read every WordPress property into the duplicate index, then exit")
+    parser.add_argument("--resume", action="store_true", help="continue the last run from the upload journal, skipping listings it finished")
+    parser.add_argument("--clean-orphan-media", action="store_true", help="delete journaled media no post references, then exit")
+    parser.add_argument("--transform-images", action="store_true", help="downsize and re-encode images before upload (see TRANSFORM_*)")
+    args = parser.parse_args()
+    UPSERT_MODE = UPSERT_MODE or args.upsert
+    TRANSFORM_IMAGES = TRANSFORM_IMAGES or args.transform_images
+
+    if args.gc_media_cache:
+        gc_media_cache()
+        exit()
+
+    if args.rebuild_post_index:
+        fetch_existing_posts(rebuild=True)
+        exit()
+
+    if args.clean_orphan_media:
+        delete_orphan_media()
+        exit()
+
+    print("📂 Loading data from:", CSV_FILE)
+    try:
+        df = load_listings(CSV_FILE)
+    except Exception as e:
+        print("❌ Failed to read CSV:", e)
+        exit()
+
+    if df.empty:
+        print("⚠ No listings found in CSV.")
+        exit()
+
+    existing_titles, existing_links = fetch_existing_posts()
+
+    print("\n" + "="*70)
+    print("🚀 STARTING WORDPRESS UPLOAD WITH ACF FIELDS")
+    print("="*70 + "\n")
+
+    print_summary(upload_listings(df, existing_titles, existing_links, resume=args.resume))